@@ -1,27 +1,81 @@
 # Main Flask application
 
-from flask import Flask, render_template, request, redirect, send_from_directory, abort
+from flask import (
+    Flask,
+    render_template,
+    request,
+    redirect,
+    send_from_directory,
+    abort,
+    jsonify,
+    make_response,
+    Response,
+)
 import logging
+import os
+
+from markupsafe import Markup
 
 # Import our custom modules
 from config import config
 from models.data_access import data_access, DataAccessError
+from models.schema import schema_registry
 from services.data_service import DataProcessor, FilterParams
+from services.cache import result_cache, fragment_cache
 from utils.helpers import (
     setup_logging,
     handle_errors,
     get_request_params,
     validate_batch,
+    compute_etag,
+    not_modified,
+    set_cache_headers,
+    ResponseHelper,
 )
+from utils.compression import init_compression
+from utils.memory import freeze_heap, memory_usage
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(config)
 
+# Rendered rows are cached on disk, so tie them to the template they came from
+ROWS_TEMPLATE_VERSION = os.stat(
+    os.path.join(app.root_path, "templates", "components", "table_rows.html")
+).st_mtime_ns
+
 # Set up logging
 setup_logging(app)
 logger = logging.getLogger(__name__)
 
+# Compress HTML, CSS and API responses for clients that accept it
+init_compression(app)
+
+# Precompute sort orders and drop stale results whenever a batch is loaded
+data_access.add_load_hook(DataProcessor.prepare)
+data_access.add_load_hook(result_cache.invalidate)
+
+
+def preload() -> None:
+    """
+    Build everything workers share, then freeze the heap
+
+    Meant to run once in the gunicorn master (see gunicorn.conf.py) so
+    workers inherit the datasets and their indexes copy-on-write. Importing
+    the app loads nothing, so tools and tests that import it stay fast.
+    """
+    data_access.warm_cache()
+    if not data_access.supports_queries:
+        for batch in data_access.get_available_batches():
+            try:
+                data = data_access.load_data(batch)
+            except DataAccessError as e:
+                logger.warning(f"Could not preload batch {batch}: {e}")
+                continue
+            # Built lazily otherwise, which would happen once per worker
+            data.name_index
+    freeze_heap()
+
 
 @app.route("/")
 def root():
@@ -34,7 +88,10 @@ def root():
 def index():
     """Main page showing batch selection"""
     available_batches = data_access.get_available_batches()
-    return render_template("batch_select.html", batches=available_batches)
+    response = make_response(
+        render_template("batch_select.html", batches=available_batches)
+    )
+    return set_cache_headers(response, cache_control=config.CACHE_CONTROL_PAGES)
 
 
 @app.route("/test-buttons")
@@ -58,42 +115,113 @@ def batch_table(batch):
         abort(404)
 
     try:
-        # Load data
-        data = data_access.load_data(batch)
+        # Load batch metadata (the full dataset unless the backend queries itself)
+        data = data_access.get_batch_info(batch)
 
         # Get request parameters
         params = get_request_params()
 
         # Create filter parameters
-        filter_params = FilterParams(
-            search_query=params["search_query"],
-            selected_branches=params["selected_branches"],
-            sort_by=params["sort_by"],
-            order=params["order"],
+        filter_params = FilterParams.from_request_params(params)
+
+        # Columns, headers and sort options of this batch
+        schema = schema_registry.get(data)
+
+        # Answer revalidations before doing any processing or rendering. The
+        # rows only depend on the normalized query, but the page echoes the
+        # parameters as given (search text, order, branches), so they are
+        # part of its entity tag
+        rows_etag = compute_etag(
+            "table",
+            batch,
+            data.fingerprint,
+            schema,
+            filter_params.query_key(),
+            params["page"],
+            params["per_page"],
+            params["offset"],
+            params["after"],
+            params["rank_mode"],
+            params["rank_scope"],
         )
-
-        # Process data
-        processed_data = DataProcessor.process_data(data, batch, filter_params)
+        etag = compute_etag(
+            rows_etag,
+            filter_params.search_query,
+            tuple(filter_params.selected_branches or ()),
+            filter_params.sort_by,
+            filter_params.order,
+        )
+        cached_response = not_modified(etag, data.mtime, config.CACHE_CONTROL_PAGES)
+        if cached_response is not None:
+            return cached_response
+
+        # Only the requested page is ranked and rendered
+        per_branch = params["rank_scope"] == "branch"
+        if data_access.supports_queries:
+            # Filtering, sorting and paging run inside the database
+            page_data, pagination = DataProcessor.query_page(
+                data_access,
+                batch,
+                filter_params,
+                params["page"],
+                params["per_page"],
+                params["offset"],
+                params["rank_mode"],
+                per_branch,
+                params["after"],
+            )
+        else:
+            processed_data = DataProcessor.process_data(
+                data, batch, filter_params, params["rank_mode"], per_branch
+            )
+            page_data, pagination = DataProcessor.paginate(
+                processed_data,
+                params["page"],
+                params["per_page"],
+                params["offset"],
+                params["after"],
+            )
+
+        # Reuse the rendered rows when this exact page was rendered before
+        fragment_key = compute_etag("rows", rows_etag, ROWS_TEMPLATE_VERSION)
+        table_rows = fragment_cache.get(fragment_key)
+        if table_rows is None:
+            table_rows = render_template(
+                "components/table_rows.html", data=page_data, schema=schema
+            )
+            fragment_cache.put(fragment_key, table_rows)
 
         # Get available branches for filtering
         branches = data_access.get_branches(data)
 
         # Prepare template context
         context = {
-            "data": processed_data,
+            "data": page_data,
+            "table_rows": Markup(table_rows),
+            "total": pagination["total"],
+            "pagination": pagination,
+            "branch_key": schema.branch_key,
+            "schema": schema,
             "branches": branches,
             "selected_branches": filter_params.selected_branches or [],
             "sort_by": filter_params.sort_by,
             "order": filter_params.order,
             "search_query": filter_params.search_query,
+            "per_page": params["per_page"],
+            "rank_mode": params["rank_mode"],
+            "rank_scope": params["rank_scope"],
             "batch": batch,
             "show_navigation": True,
         }
 
         logger.info(
-            f"Rendering table for batch {batch} with {len(processed_data)} records"
+            f"Rendering page {pagination['page']} of batch {batch} "
+            f"({len(page_data)} of {pagination['total']} records)"
+        )
+        response = make_response(render_template("table.html", **context))
+        return set_cache_headers(
+            response, etag, data.mtime, config.CACHE_CONTROL_PAGES
         )
-        return render_template("table.html", **context)
 
     except DataAccessError as e:
         logger.error(f"Data access error for batch {batch}: {e}")
@@ -103,6 +231,150 @@ def batch_table(batch):
         abort(500)
 
 
+@app.route("/api/v1/batch/<batch>", methods=["GET"])
+@handle_errors
+def batch_api(batch):
+    """
+    Ranked results for a batch as streamed JSON or NDJSON
+
+    Accepts the same filter, sort and page parameters as the table, plus
+    ``fields`` (comma-separated projection), ``format=ndjson`` and
+    ``all=1`` to export every matching record in one response.
+
+    Args:
+        batch: The batch year (e.g., "2024", "2023", "2022")
+    """
+    if not validate_batch(batch, data_access.get_available_batches()):
+        return jsonify(ResponseHelper.error("Unknown batch", "INVALID_BATCH")), 404
+
+    # Query backends answer from the database without loading the batch
+    data = data_access.get_batch_info(batch)
+    params = get_request_params()
+    filter_params = FilterParams.from_request_params(params)
+
+    etag = compute_etag(
+        "api",
+        batch,
+        data.fingerprint,
+        schema_registry.get(data),
+        filter_params.query_key(),
+        params["page"],
+        params["per_page"],
+        params["offset"],
+        params["after"],
+        params["rank_mode"],
+        params["rank_scope"],
+        request.args.get("fields", ""),
+        request.args.get("format", ""),
+        request.args.get("all", ""),
+    )
+    cached_response = not_modified(etag, data.mtime, config.CACHE_CONTROL_API)
+    if cached_response is not None:
+        return cached_response
+
+    # Resolve the field projection
+    available_fields = DataProcessor.available_fields(data)
+    fields = [
+        field.strip()
+        for field in request.args.get("fields", "").split(",")
+        if field.strip()
+    ] or available_fields
+    unknown_fields = [field for field in fields if field not in available_fields]
+    if unknown_fields:
+        message = f"Unknown fields: {', '.join(unknown_fields)}"
+        return jsonify(ResponseHelper.error(message, "INVALID_FIELDS")), 400
+
+    per_branch = params["rank_scope"] == "branch"
+    export_all = request.args.get("all") in ("1", "true")
+    if data_access.supports_queries:
+        if export_all:
+            rows = data_access.query(
+                batch, filter_params, 0, None, params["rank_mode"], per_branch
+            )
+            total, page, per_page = len(rows), 1, max(len(rows), 1)
+            next_offset = next_cursor = None
+        else:
+            rows, pagination = DataProcessor.query_page(
+                data_access,
+                batch,
+                filter_params,
+                params["page"],
+                params["per_page"],
+                params["offset"],
+                params["rank_mode"],
+                per_branch,
+                params["after"],
+            )
+            total, page = pagination["total"], pagination["page"]
+            per_page, next_offset = pagination["per_page"], pagination["next_offset"]
+            next_cursor = pagination["next_cursor"]
+        records = DataProcessor.project_records(rows, fields)
+    else:
+        processed_data = DataProcessor.process_data(
+            data, batch, filter_params, params["rank_mode"], per_branch
+        )
+        total = len(processed_data)
+        if export_all:
+            page_data = processed_data
+            page, per_page = 1, max(total, 1)
+            next_offset = next_cursor = None
+        else:
+            page_data, pagination = DataProcessor.paginate(
+                processed_data,
+                params["page"],
+                params["per_page"],
+                params["offset"],
+                params["after"],
+            )
+            page, per_page = pagination["page"], pagination["per_page"]
+            next_offset = pagination["next_offset"]
+            next_cursor = pagination["next_cursor"]
+        # Records are serialized one at a time while the response is sent
+        records = DataProcessor.project(page_data, fields)
+
+    headers = {"X-Total-Count": str(total)}
+
+    if request.args.get("format") == "ndjson":
+        response = Response(
+            ResponseHelper.stream_ndjson(records),
+            mimetype="application/x-ndjson",
+            headers=headers,
+        )
+    else:
+        envelope = ResponseHelper.paginated([], page, per_page, total)
+        envelope["pagination"]["next_offset"] = next_offset
+        envelope["pagination"]["next_cursor"] = next_cursor
+        response = Response(
+            ResponseHelper.stream_json(envelope, records),
+            mimetype="application/json",
+            headers=headers,
+        )
+
+    return set_cache_headers(response, etag, data.mtime, config.CACHE_CONTROL_API)
+
+
+@app.route("/api/v1/batch/<batch>/suggest", methods=["GET"])
+@handle_errors
+def suggest_names(batch):
+    """
+    Suggest names for search-as-you-type
+
+    Args:
+        batch: The batch year (e.g., "2024", "2023", "2022")
+    """
+    if not validate_batch(batch, data_access.get_available_batches()):
+        return jsonify(ResponseHelper.error("Unknown batch", "INVALID_BATCH")), 404
+
+    limit = max(1, min(request.args.get("limit", 10, type=int), 50))
+    prefix = request.args.get("q", "")
+    if data_access.supports_queries:
+        names = data_access.suggest_names(batch, prefix, limit)
+    else:
+        data = data_access.load_data(batch)
+        names = DataProcessor.suggest_names(data, prefix, limit)
+    return jsonify(ResponseHelper.success(names))
+
+
 @app.route("/favicon.svg")
 def favicon_svg():
     """Serve SVG favicon"""
@@ -117,6 +389,23 @@ def favicon():
     )
 
 
+@app.route("/api/v1/stats")
+def cache_stats():
+    """Cache and worker memory statistics for monitoring (needs STATS_ENABLED)"""
+    if not config.STATS_ENABLED:
+        abort(404)
+    return jsonify(
+        ResponseHelper.success(
+            {
+                "datasets": data_access.cache_stats(),
+                "results": result_cache.get_stats(),
+                "fragments": fragment_cache.get_stats(),
+                "memory": memory_usage(),
+            }
+        )
+    )
+
+
 @app.route("/ping")
 def ping():
     """Health check endpoint"""
@@ -136,4 +425,8 @@ def internal_error(error):
 
 
 if __name__ == "__main__":
+    # Parse all batches once so the first requests hit a warm cache
+    data_access.warm_cache()
+    # Pick up re-scraped CSVs and new batch directories without restarting
+    data_access.start_watcher(config.RELOAD_INTERVAL)
     app.run(debug=config.DEBUG)
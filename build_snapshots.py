@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compile each batch CSV into a memory-mapped snapshot (data/<batch>/final.snap)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from models.data_access import CSVDataAccess, DataAccessError
+from models.dataset import is_numeric_column
+from models.schema import schema_registry
+from models.snapshot import snapshot_path, write_snapshot
+from services.data_service import DataProcessor
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "batches",
+        nargs="*",
+        help="batches to compile (default: every configured batch)",
+    )
+    args = parser.parse_args()
+
+    # Always start from the CSV, never from an existing snapshot
+    csv_access = CSVDataAccess()
+    csv_access.config.SNAPSHOTS_ENABLED = False
+    batches = args.batches or csv_access.get_available_batches()
+
+    for batch in batches:
+        started = time.perf_counter()
+        file_path = csv_access.config.CSV_FILES.get(batch)
+        if file_path is None:
+            print(f"❌ Unknown batch: {batch}")
+            sys.exit(1)
+
+        try:
+            stat = os.stat(file_path)
+            dataset = csv_access.load_data(batch)
+        except (OSError, DataAccessError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        sortable = ["Rank"] + [c for c in dataset.columns if is_numeric_column(c)]
+        sort_orders = {
+            (column, descending): DataProcessor.sort_order(
+                dataset, batch, column, descending
+            )
+            for column in sortable
+            for descending in (False, True)
+        }
+
+        path = snapshot_path(file_path)
+        write_snapshot(
+            str(path),
+            dataset,
+            sort_orders,
+            (stat.st_mtime_ns, stat.st_size),
+            schema_registry.get(dataset).rank_columns,
+        )
+        print(
+            f"📦 {batch}: {len(dataset)} records -> {path} "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+
+    print("\n✅ Snapshots complete!")
+
+
+if __name__ == "__main__":
+    main()
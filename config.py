@@ -5,6 +5,27 @@ from dataclasses import dataclass
 from typing import Dict
 
 
+def discover_csv_files(data_dir: str) -> Dict[str, str]:
+    """
+    Find the batch CSVs under the data directory
+
+    Args:
+        data_dir: Directory holding one <batch>/final.csv per batch
+
+    Returns:
+        Mapping of batch name to CSV path, newest batch first
+    """
+    try:
+        names = sorted(os.listdir(data_dir), reverse=True)
+    except OSError:
+        return {}
+    return {
+        name: f"{data_dir}/{name}/final.csv"
+        for name in names
+        if os.path.isfile(os.path.join(data_dir, name, "final.csv"))
+    }
+
+
 @dataclass
 class Config:
     """Application configuration settings"""
@@ -13,26 +34,76 @@ class Config:
     DATA_DIR: str = "data"
     CSV_FILES: Dict[str, str] = None
 
+    # Storage backend: "csv" reads data/<batch>/final.csv, "sqlite" reads the
+    # database built by import_sqlite.py
+    DATA_BACKEND: str = os.environ.get("DATA_BACKEND", "csv")
+    SQLITE_PATH: str = os.environ.get("SQLITE_PATH", "data/heritage.db")
+
+    # Use data/<batch>/final.snap (built by build_snapshots.py) instead of
+    # parsing the CSV when the snapshot matches it
+    SNAPSHOTS_ENABLED: bool = os.environ.get("SNAPSHOTS_ENABLED", "1") == "1"
+
+    # Seconds between checks for changed CSVs and new batch directories;
+    # 0 disables the watcher and changes are picked up on request instead
+    RELOAD_INTERVAL: float = float(os.environ.get("RELOAD_INTERVAL", "5"))
+
     # Flask settings
     DEBUG: bool = True
     SECRET_KEY: str = os.environ.get("SECRET_KEY", "dev-key-change-in-production")
 
+    # Serve cache and worker memory statistics at /api/v1/stats; off by
+    # default since they describe the server's processes
+    STATS_ENABLED: bool = os.environ.get("STATS_ENABLED", "0") == "1"
+
     # Pagination settings
     DEFAULT_PAGE_SIZE: int = 50
     MAX_PAGE_SIZE: int = 200
 
+    # Ranking: "position" numbers rows in the order shown; "ordinal",
+    # "competition" or "dense" show the student's rank by average YGPA
+    RANK_MODE: str = os.environ.get("RANK_MODE", "position")
+
     # Sorting settings
-    DEFAULT_SORT_COLUMN: str = "yGPA 1"
     DEFAULT_SORT_ORDER: str = "desc"
 
+    # HTTP caching settings
+    CACHE_CONTROL_PAGES: str = os.environ.get(
+        "CACHE_CONTROL_PAGES", "public, max-age=0, must-revalidate"
+    )
+    CACHE_CONTROL_API: str = os.environ.get(
+        "CACHE_CONTROL_API", "public, max-age=300, must-revalidate"
+    )
+    SEND_FILE_MAX_AGE_DEFAULT: int = int(
+        os.environ.get("SEND_FILE_MAX_AGE_DEFAULT", 7 * 24 * 3600)
+    )
+    # Bump on deploy to invalidate validators when templates or code change
+    ETAG_SALT: str = os.environ.get("ETAG_SALT", "")
+
+    # Response compression settings (brotli is used when installed)
+    COMPRESS_ENABLED: bool = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE: int = 500
+    COMPRESS_LEVEL: int = 6
+    COMPRESS_BROTLI_QUALITY: int = 5
+    COMPRESS_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # Query result cache settings
+    RESULT_CACHE_SIZE: int = 256
+    RESULT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+
+    # Rendered fragment cache settings; the directory is shared by all
+    # workers on a host, an empty value keeps fragments in memory only.
+    # Fragments are served unescaped, so the directory is created private
+    # (0700) and ignored if anyone else can write to it
+    FRAGMENT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    FRAGMENT_CACHE_MAX_DISK_BYTES: int = 64 * 1024 * 1024
+    FRAGMENT_CACHE_DIR: str = os.environ.get(
+        "FRAGMENT_CACHE_DIR", os.path.join("data", ".fragments")
+    )
+
     def __post_init__(self):
         """Initialize CSV files mapping after creation"""
         if self.CSV_FILES is None:
-            self.CSV_FILES = {
-                "2024": f"{self.DATA_DIR}/2024/final.csv",
-                "2023": f"{self.DATA_DIR}/2023/final.csv",
-                "2022": f"{self.DATA_DIR}/2022/final.csv",
-            }
+            self.CSV_FILES = discover_csv_files(self.DATA_DIR)
 
 
 # Create global config instance
@@ -0,0 +1,44 @@
+# Gunicorn configuration: preload batches in the master and fork workers from it
+#
+#   gunicorn app:app
+#
+# Workers inherit the loaded datasets copy-on-write. Compare the memory lines
+# logged after fork and at worker exit (or GET /api/v1/stats with
+# STATS_ENABLED=1) to see how much of each worker is still shared with the
+# master.
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+
+# Import the app once, before forking; when_ready then loads every batch
+preload_app = True
+
+
+def when_ready(server):
+    """Load every batch, build shared indexes and freeze the heap"""
+    from app import preload
+    from utils.memory import format_memory, memory_usage
+
+    preload()
+    server.log.info(f"Master memory after preload, {format_memory(memory_usage())}")
+
+
+def post_fork(server, worker):
+    """Log memory right after fork and start this worker's data watcher"""
+    from app import config, data_access
+    from utils.memory import format_memory, memory_usage
+
+    server.log.info(f"Worker memory after fork, {format_memory(memory_usage())}")
+    # Threads do not survive fork, so every worker watches for new data itself
+    data_access.start_watcher(config.RELOAD_INTERVAL)
+
+
+def worker_exit(server, worker):
+    """Log memory at exit to see how much the worker copied while serving"""
+    from utils.memory import format_memory, memory_usage
+
+    server.log.info(f"Worker memory at exit, {format_memory(memory_usage())}")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Import the batch CSVs into the SQLite database used by DATA_BACKEND=sqlite
+"""
+
+import argparse
+import sys
+import time
+
+from config import config
+from models.data_access import CSVDataAccess, DataAccessError
+from models.sqlite_access import import_batches
+from services.data_service import DataProcessor
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--db",
+        default=config.SQLITE_PATH,
+        help=f"database file to write (default: {config.SQLITE_PATH})",
+    )
+    parser.add_argument(
+        "batches",
+        nargs="*",
+        help="batches to import (default: every configured batch)",
+    )
+    args = parser.parse_args()
+
+    csv_access = CSVDataAccess()
+    batches = args.batches or csv_access.get_available_batches()
+
+    started = time.perf_counter()
+    datasets, rank_scores, ranks = [], {}, {}
+    for batch in batches:
+        try:
+            dataset = csv_access.load_data(batch)
+        except DataAccessError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        datasets.append(dataset)
+        rank_scores[batch] = DataProcessor.rank_scores(dataset, batch)
+        ranking = DataProcessor.ranking(dataset)
+        ranks[batch] = {
+            **ranking.overall,
+            **{f"{mode}_branch": r for mode, r in ranking.by_branch.items()},
+        }
+        print(f"📋 {batch}: {len(dataset)} records")
+
+    import_batches(args.db, datasets, rank_scores, ranks)
+    print(f"\n✅ Wrote {args.db} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 # Data access layer for CSV operations
 
 import csv
+from abc import ABC, abstractmethod
 import logging
-from typing import List, Dict, Optional, Any
+import os
+import threading
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Any, Tuple, Callable
 from pathlib import Path
 
-from config import config
+from config import config, discover_csv_files
+from models.dataset import Dataset
+from models.schema import schema_registry
+from models.snapshot import SnapshotError, read_snapshot, snapshot_path
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -17,11 +24,186 @@ class DataAccessError(Exception):
     pass
 
 
-class CSVDataAccess:
-    """Handles all CSV data operations"""
+@dataclass
+class CacheStats:
+    """Counters for the in-process batch cache"""
+
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+
+
+@dataclass
+class _CacheEntry:
+    """Parsed dataset together with the file signature it was read from"""
+
+    signature: Tuple[int, int]
+    dataset: Dataset
+
+    def is_current(self, signature: Tuple[int, int]) -> bool:
+        """
+        Check whether the dataset still matches its file and schema
+
+        Args:
+            signature: Current (mtime_ns, size) of the CSV file
+
+        Returns:
+            False if the file changed or schema.json moved the branch column
+        """
+        return (
+            self.signature == signature
+            and self.dataset.branch_key
+            == schema_registry.get(self.dataset).branch_key
+        )
+
+
+class DataAccess(ABC):
+    """
+    Interface shared by the storage backends
+
+    Backends hand out read-only Datasets. Those that can filter, sort and
+    paginate on their own set supports_queries and implement count/query, so
+    callers can fetch a single page without loading the whole batch.
+    """
+
+    supports_queries = False
 
     def __init__(self):
         self.config = config
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._load_hooks: List[Callable[[Dataset], None]] = []
+
+    def _next_version(self) -> int:
+        """Allocate a process-wide increasing dataset version"""
+        with self._version_lock:
+            self._version += 1
+            return self._version
+
+    def add_load_hook(self, hook: Callable[[Dataset], None]) -> None:
+        """
+        Register a callback run whenever a batch is (re)loaded from storage
+
+        Args:
+            hook: Callable receiving the freshly loaded dataset
+        """
+        self._load_hooks.append(hook)
+
+    def _run_load_hooks(self, dataset: Dataset) -> None:
+        """Notify registered hooks about a freshly loaded dataset"""
+        for hook in self._load_hooks:
+            hook(dataset)
+
+    @abstractmethod
+    def load_data(self, batch: str) -> Dataset:
+        """Load the full dataset for a batch"""
+
+    def get_batch_info(self, batch: str):
+        """
+        Get what a request needs to know about a batch without its rows
+
+        The result exposes batch, columns, branch_key, version, mtime and
+        fingerprint. Backends without a cheaper path return the dataset.
+
+        Args:
+            batch: The batch year
+
+        Returns:
+            Object describing the batch
+        """
+        return self.load_data(batch)
+
+    @abstractmethod
+    def get_branches(self, data) -> List[str]:
+        """List the distinct branches/departments of a batch"""
+
+    @abstractmethod
+    def get_available_batches(self) -> List[str]:
+        """List the batches this backend can serve"""
+
+    def validate_batch(self, batch: str) -> bool:
+        """
+        Validate if the given batch exists
+
+        Args:
+            batch: The batch year to validate
+
+        Returns:
+            True if batch exists, False otherwise
+        """
+        return batch in self.get_available_batches()
+
+    def count(
+        self, batch: str, filter_params, after: Optional[Tuple[float, int]] = None
+    ) -> int:
+        """Count the records matching the filters (query backends only)"""
+        raise NotImplementedError
+
+    def query(
+        self,
+        batch: str,
+        filter_params,
+        offset: int,
+        limit: Optional[int],
+        rank_mode: str = "position",
+        per_branch: bool = False,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch one ranked, filtered and sorted page (query backends only)"""
+        raise NotImplementedError
+
+    def rank_keys(
+        self,
+        batch: str,
+        filter_params,
+        offset: int,
+        limit: Optional[int],
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[float, int]]:
+        """Get the keyset cursors of a page's records (query backends only)"""
+        raise NotImplementedError
+
+    def suggest_names(self, batch: str, prefix: str, limit: int = 10) -> List[str]:
+        """Suggest names with a word starting with a prefix (query backends only)"""
+        raise NotImplementedError
+
+    def warm_cache(self) -> None:
+        """Load every batch ahead of the first request"""
+        for batch in self.get_available_batches():
+            try:
+                self.load_data(batch)
+            except DataAccessError as e:
+                logger.warning(f"Could not warm cache for batch {batch}: {e}")
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Get backend cache counters"""
+        return {}
+
+    def start_watcher(self, interval: float) -> None:
+        """
+        Start watching storage for changed or new batches
+
+        Backends that notice changes on every request ignore this.
+
+        Args:
+            interval: Seconds between checks; 0 disables watching
+        """
+        pass
+
+
+class CSVDataAccess(DataAccess):
+    """Handles all CSV data operations"""
+
+    def __init__(self):
+        super().__init__()
+        self._cache: Dict[str, _CacheEntry] = {}
+        self._cache_lock = threading.Lock()
+        self._batch_locks: Dict[str, threading.Lock] = {}
+        self.stats = CacheStats()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._reload_lock = threading.Lock()
+        self._pending: Dict[str, Tuple[int, int]] = {}
         self._validate_csv_files()
 
     def _validate_csv_files(self) -> None:
@@ -30,7 +212,7 @@ class CSVDataAccess:
             if not Path(file_path).exists():
                 logger.warning(f"CSV file for batch {batch} not found: {file_path}")
 
-    def load_data(self, batch: str) -> List[Dict[str, Any]]:
+    def load_data(self, batch: str) -> Dataset:
         """
         Load data from CSV file for the specified batch
 
@@ -38,24 +220,24 @@ class CSVDataAccess:
             batch: The batch year (e.g., "2024", "2023", "2022")
 
         Returns:
-            List of dictionaries containing student data
+            Read-only dataset of student records, shared between requests
 
         Raises:
             DataAccessError: If the file cannot be read or batch is invalid
         """
+        csv_files = self.config.CSV_FILES
+        if not csv_files:
+            raise DataAccessError(f"No batches found in {self.config.DATA_DIR}")
+        # Unknown batches fall back to the newest one
+        file_path = csv_files.get(batch) or next(iter(csv_files.values()))
         try:
-            file_path = self.config.CSV_FILES.get(batch, self.config.CSV_FILES["2024"])
-
             if not Path(file_path).exists():
                 raise DataAccessError(f"CSV file not found: {file_path}")
 
-            with open(file_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                data = list(reader)
-
-            logger.info(f"Loaded {len(data)} records from {file_path}")
-            return data
+            return self._get_cached_dataset(batch, file_path)
 
+        except DataAccessError:
+            raise
         except (IOError, OSError) as e:
             logger.error(f"Error reading CSV file {file_path}: {e}")
             raise DataAccessError(f"Failed to load data for batch {batch}: {e}")
@@ -63,29 +245,276 @@ class CSVDataAccess:
             logger.error(f"Unexpected error loading data for batch {batch}: {e}")
             raise DataAccessError(f"Unexpected error loading data: {e}")
 
-    def get_branches(self, data: List[Dict[str, Any]]) -> List[str]:
+    def _get_cached_dataset(self, batch: str, file_path: str) -> Dataset:
+        """
+        Return the parsed dataset for a batch, re-reading the file only if it changed
+
+        While the watcher runs it is the only one reloading changed files, so
+        requests just take the current version. A batch is parsed under its
+        own lock, so requests for other batches are not held up meanwhile.
+
+        Args:
+            batch: The batch year used as cache key
+            file_path: Path of the CSV file backing the batch
+
+        Returns:
+            Cached dataset for the batch
+        """
+        with self._cache_lock:
+            entry = self._cache.get(batch)
+            if entry is not None and self._watching():
+                self.stats.hits += 1
+                return entry.dataset
+
+        with self._batch_lock(batch):
+            # Another request may have loaded the batch while this one waited
+            with self._cache_lock:
+                entry = self._cache.get(batch)
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if entry is not None and entry.is_current(signature):
+                with self._cache_lock:
+                    self.stats.hits += 1
+                return entry.dataset
+
+            dataset = self._build_dataset(batch, file_path, stat, entry is not None)
+            with self._cache_lock:
+                self._cache[batch] = _CacheEntry(signature=signature, dataset=dataset)
+
+        return dataset
+
+    def _batch_lock(self, batch: str) -> threading.Lock:
+        """Get the lock serializing loads of one batch"""
+        with self._cache_lock:
+            return self._batch_locks.setdefault(batch, threading.Lock())
+
+    def _build_dataset(
+        self, batch: str, file_path: str, stat: os.stat_result, reload: bool
+    ) -> Dataset:
+        """
+        Read a batch from its snapshot or CSV and run the load hooks
+
+        Args:
+            batch: The batch year
+            file_path: Path of the CSV file backing the batch
+            stat: Result of os.stat on the CSV file
+            reload: Whether an older version of the batch is already loaded
+
+        Returns:
+            New dataset with a fresh version
+        """
+        with self._cache_lock:
+            if reload:
+                self.stats.reloads += 1
+            else:
+                self.stats.misses += 1
+        if reload:
+            logger.info(f"CSV file for batch {batch} changed, reloading")
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        version = self._next_version()
+        fingerprint = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        dataset = self._read_snapshot(
+            file_path, signature, version, stat.st_mtime, fingerprint
+        )
+        if dataset is None:
+            with open(file_path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                data = list(reader)
+
+            schema = schema_registry.for_columns(batch, reader.fieldnames or ())
+            dataset = Dataset(
+                batch,
+                data,
+                version=version,
+                mtime=stat.st_mtime,
+                fingerprint=fingerprint,
+                branch_key=schema.branch_key,
+            )
+            logger.info(f"Loaded {len(dataset)} records from {file_path}")
+
+        # Indexes and sort orders are built before the dataset is published
+        self._run_load_hooks(dataset)
+        return dataset
+
+    def _read_snapshot(
+        self,
+        file_path: str,
+        signature: Tuple[int, int],
+        version: int,
+        mtime: float,
+        fingerprint: str,
+    ) -> Optional[Dataset]:
+        """
+        Map the compiled snapshot of a CSV if it is present and up to date
+
+        Args:
+            file_path: Path of the CSV file backing the batch
+            signature: (mtime_ns, size) of the CSV file
+            version: Dataset version to assign
+            mtime: Modification time of the CSV file
+            fingerprint: Identifier of the CSV file contents
+
+        Returns:
+            Snapshot-backed dataset, or None to fall back to parsing the CSV
+        """
+        if not self.config.SNAPSHOTS_ENABLED:
+            return None
+
+        path = snapshot_path(file_path)
+        if not path.exists():
+            return None
+
+        try:
+            dataset = read_snapshot(str(path), signature, version, mtime, fingerprint)
+        except SnapshotError as e:
+            logger.warning(f"Ignoring snapshot: {e}")
+            return None
+
+        # The branch index is built on one column; schema.json may name another
+        branch_key = schema_registry.get(dataset).branch_key
+        if dataset.branch_key != branch_key:
+            logger.warning(
+                f"Ignoring snapshot {path}: built for branch column "
+                f"{dataset.branch_key!r}, schema says {branch_key!r}"
+            )
+            return None
+
+        logger.info(f"Mapped {len(dataset)} records from {path}")
+        return dataset
+
+    def _watching(self) -> bool:
+        """Check whether the watcher thread runs in this process"""
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def discover_batches(self) -> List[str]:
+        """
+        Pick up batch directories added under DATA_DIR since startup
+
+        Returns:
+            Newly discovered batches
+        """
+        found = discover_csv_files(self.config.DATA_DIR)
+        new = [batch for batch in found if batch not in self.config.CSV_FILES]
+        if new:
+            merged = dict(self.config.CSV_FILES)
+            merged.update((batch, found[batch]) for batch in new)
+            # Swap the whole mapping so readers never see it half-updated
+            self.config.CSV_FILES = dict(sorted(merged.items(), reverse=True))
+            logger.info(f"Discovered new batches: {', '.join(new)}")
+        return new
+
+    def reload_changed(self) -> List[str]:
+        """
+        Reload every batch whose CSV changed, off the request path
+
+        A change is only picked up once the file has kept the same size and
+        mtime for two checks, so files still being written are skipped. The
+        new dataset is fully built before it replaces the old one; requests
+        already holding the old version finish with it.
+
+        Returns:
+            Batches that were (re)loaded
+        """
+        reloaded = []
+        with self._reload_lock:
+            self.discover_batches()
+            for batch, file_path in list(self.config.CSV_FILES.items()):
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+
+                entry = self._cache.get(batch)
+                if entry is not None and entry.is_current(signature):
+                    self._pending.pop(batch, None)
+                    continue
+                if self._pending.get(batch) != signature:
+                    self._pending[batch] = signature
+                    continue
+                del self._pending[batch]
+
+                try:
+                    with self._batch_lock(batch):
+                        dataset = self._build_dataset(
+                            batch, file_path, stat, entry is not None
+                        )
+                        with self._cache_lock:
+                            self._cache[batch] = _CacheEntry(signature, dataset)
+                except Exception as e:
+                    logger.error(f"Keeping current data for batch {batch}: {e}")
+                    continue
+
+                reloaded.append(batch)
+                logger.info(f"Swapped in version {dataset.version} of batch {batch}")
+        return reloaded
+
+    def start_watcher(self, interval: float) -> None:
+        """
+        Poll the CSV files in a background thread and hot-swap changed batches
+
+        Threads do not survive fork, so pre-fork servers call this in each
+        worker.
+
+        Args:
+            interval: Seconds between checks; 0 disables watching
+        """
+        if interval <= 0 or self._watching():
+            return
+
+        def watch() -> None:
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_changed()
+                except Exception as e:
+                    logger.error(f"Data watcher check failed: {e}")
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=watch, name="data-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.config.DATA_DIR} every {interval}s")
+
+    def stop_watcher(self) -> None:
+        """Stop the background watcher, if running"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def clear_cache(self) -> None:
+        """Drop all cached datasets"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit, miss and reload counts
+        """
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "reloads": self.stats.reloads,
+            "batches": len(self._cache),
+        }
+
+    def get_branches(self, data: Dataset) -> List[str]:
         """
         Extract unique branches/departments from the data
 
         Args:
-            data: List of student records
+            data: Dataset of student records
 
         Returns:
             Sorted list of unique branches/departments
         """
-        if not data:
+        if not data or data.branch_index is None:
             return []
 
-        # Determine the correct key (Branch vs Department)
-        key = "Branch" if "Branch" in data[0] else "Department"
-
-        branches = set()
-        for row in data:
-            branch = row.get(key)
-            if branch and branch.strip():
-                branches.add(branch.strip())
-
-        return sorted(branches)
+        return list(data.branch_index.branches)
 
     def get_available_batches(self) -> List[str]:
         """
@@ -109,5 +538,19 @@ class CSVDataAccess:
         return batch in self.config.CSV_FILES
 
 
+def create_data_access() -> DataAccess:
+    """
+    Create the storage backend selected by config.DATA_BACKEND
+
+    Returns:
+        Data access instance
+    """
+    if config.DATA_BACKEND == "sqlite":
+        from models.sqlite_access import SQLiteDataAccess
+
+        return SQLiteDataAccess(config.SQLITE_PATH)
+    return CSVDataAccess()
+
+
 # Create global data access instance
-data_access = CSVDataAccess()
+data_access = create_data_access()
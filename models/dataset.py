@@ -0,0 +1,462 @@
+# Read-only, column-oriented dataset types shared between requests
+
+import math
+import threading
+from array import array
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Marker used in the CSVs for results that are not available
+MISSING_VALUE = "N/A"
+
+
+def is_numeric_column(name: str) -> bool:
+    """
+    Check whether a column holds grade points
+
+    Args:
+        name: Column header
+
+    Returns:
+        True for CGPA/YGPA/GPA columns
+    """
+    return "GPA" in name.upper()
+
+
+def default_branch_key(columns: Sequence[str]) -> str:
+    """
+    Guess the column holding the branch/department name from a header
+
+    Args:
+        columns: Column headers
+
+    Returns:
+        "Branch" if the header has it, otherwise "Department"
+    """
+    return "Branch" if "Branch" in columns else "Department"
+
+
+class TextColumn:
+    """Column of free-form strings such as names and roll numbers"""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Sequence[str]):
+        self.values: Sequence[str] = tuple(values)
+
+    @classmethod
+    def from_sequence(cls, values: Sequence[str]) -> "TextColumn":
+        """Wrap an existing read-only sequence without copying it"""
+        column = cls.__new__(cls)
+        column.values = values
+        return column
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> str:
+        return self.values[index]
+
+
+class CategoricalColumn:
+    """Column of repeated strings stored as codes into a table of categories"""
+
+    __slots__ = ("codes", "categories", "_lookup")
+
+    def __init__(self, values: Sequence[str]):
+        lookup: Dict[str, int] = {}
+        codes = array("H")
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            codes.append(code)
+        self.codes = codes
+        self.categories: Tuple[str, ...] = tuple(lookup)
+        self._lookup = lookup
+
+    @classmethod
+    def from_codes(
+        cls, codes: Sequence[int], categories: Sequence[str]
+    ) -> "CategoricalColumn":
+        """Build a column from stored codes and categories without re-encoding"""
+        column = cls.__new__(cls)
+        column.codes = codes
+        column.categories = tuple(categories)
+        column._lookup = {value: code for code, value in enumerate(column.categories)}
+        return column
+
+    def code_of(self, value: str) -> Optional[int]:
+        """Get the code for a category, or None if it never occurs"""
+        return self._lookup.get(value)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str:
+        return self.categories[self.codes[index]]
+
+
+class FloatColumn:
+    """
+    Numeric column stored as a float array with NaN for missing values
+
+    The original text is kept as categorical labels so values render exactly
+    as they appear in the CSV (e.g. "7.10" rather than "7.1").
+    """
+
+    __slots__ = ("floats", "labels")
+
+    def __init__(self, values: Sequence[str]):
+        self.labels = CategoricalColumn(values)
+        parsed = []
+        for label in self.labels.categories:
+            try:
+                parsed.append(float(label))
+            except (ValueError, TypeError):
+                parsed.append(math.nan)
+        self.floats = array("d", (parsed[code] for code in self.labels.codes))
+
+    @classmethod
+    def from_arrays(cls, floats: Sequence[float], labels: CategoricalColumn):
+        """Build a column from stored floats and labels without re-parsing"""
+        column = cls.__new__(cls)
+        column.floats = floats
+        column.labels = labels
+        return column
+
+    def __len__(self) -> int:
+        return len(self.floats)
+
+    def __getitem__(self, index: int) -> str:
+        return self.labels[index]
+
+
+class BranchIndex:
+    """Inverted index from branch/department to the sorted ids of its rows"""
+
+    __slots__ = ("postings", "branches")
+
+    def __init__(self, column: CategoricalColumn):
+        ids: List[array] = [array("I") for _ in column.categories]
+        for row_id, code in enumerate(column.codes):
+            ids[code].append(row_id)
+        self._set_postings(dict(zip(column.categories, ids)))
+
+    @classmethod
+    def from_postings(cls, postings: Dict[str, Sequence[int]]) -> "BranchIndex":
+        """Build an index from stored per-branch row ids"""
+        index = cls.__new__(cls)
+        index._set_postings(postings)
+        return index
+
+    def _set_postings(self, postings: Dict[str, Sequence[int]]) -> None:
+        self.postings = postings
+
+        # Distinct, display-ready branch names for the filter dropdown
+        self.branches: List[str] = sorted(
+            {branch.strip() for branch in postings if branch and branch.strip()}
+        )
+
+    def lookup(self, branches: Sequence[str]) -> List[int]:
+        """
+        Get the ids of rows belonging to any of the given branches
+
+        Args:
+            branches: Branch names to match exactly
+
+        Returns:
+            Sorted list of row ids
+        """
+        matches = [self.postings[b] for b in set(branches) if b in self.postings]
+        if len(matches) == 1:
+            return list(matches[0])
+        return sorted(id_ for ids in matches for id_ in ids)
+
+
+class NameIndex:
+    """
+    Trigram index over lower-cased names
+
+    Substring queries intersect trigram postings to get candidate rows and
+    only verify those; prefix queries binary-search a sorted list of word
+    suffixes so any word of a name can be completed.
+    """
+
+    __slots__ = ("names", "trigrams", "_suffixes", "_suffix_ids")
+
+    def __init__(self, column: TextColumn):
+        self.names: Tuple[str, ...] = tuple(name.lower() for name in column.values)
+
+        trigrams: Dict[str, array] = {}
+        suffixes = []
+        for row_id, name in enumerate(self.names):
+            for gram in {name[i : i + 3] for i in range(len(name) - 2)}:
+                ids = trigrams.get(gram)
+                if ids is None:
+                    ids = trigrams[gram] = array("I")
+                ids.append(row_id)
+            for start in range(len(name)):
+                if name[start] != " " and (start == 0 or name[start - 1] == " "):
+                    suffixes.append((name[start:], row_id))
+        self.trigrams = trigrams
+
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._suffix_ids = array("I", (row_id for _, row_id in suffixes))
+
+    def search(self, term: str) -> List[int]:
+        """
+        Get the ids of rows whose name contains a term
+
+        Args:
+            term: Lower-cased search term
+
+        Returns:
+            Sorted list of row ids
+        """
+        names = self.names
+        if len(term) < 3:
+            # Too short to index; a scan of the pre-lowered names is cheap
+            return [i for i, name in enumerate(names) if term in name]
+
+        postings = []
+        for gram in {term[i : i + 3] for i in range(len(term) - 2)}:
+            ids = self.trigrams.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return []
+
+        return sorted(i for i in candidates if term in names[i])
+
+    def prefix(self, term: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Get the ids of rows with a name word starting with a term
+
+        Args:
+            term: Lower-cased prefix
+            limit: Maximum number of ids to return
+
+        Returns:
+            Row ids ordered by the matching name, without duplicates
+        """
+        suffixes = self._suffixes
+        position = bisect_left(suffixes, term)
+        seen = set()
+        matches = []
+        while position < len(suffixes) and suffixes[position].startswith(term):
+            row_id = self._suffix_ids[position]
+            if row_id not in seen:
+                seen.add(row_id)
+                matches.append(row_id)
+                if limit is not None and len(matches) >= limit:
+                    break
+            position += 1
+        return matches
+
+
+class Row(Mapping):
+    """Read-only mapping view of a single row in a dataset"""
+
+    __slots__ = ("_dataset", "_index")
+
+    def __init__(self, dataset: "Dataset", index: int):
+        self._dataset = dataset
+        self._index = index
+
+    def __getitem__(self, key: str) -> str:
+        return self._dataset.column(key)[self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._dataset.columns)
+
+    def __len__(self) -> int:
+        return len(self._dataset.columns)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._dataset._columns
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+
+class Dataset:
+    """Immutable, column-oriented collection of student records for a single batch"""
+
+    def __init__(
+        self,
+        batch: str,
+        rows: List[Dict[str, Any]],
+        version: int = 0,
+        mtime: Optional[float] = None,
+        fingerprint: str = "",
+        branch_key: Optional[str] = None,
+    ):
+        self.batch = batch
+        self.version = version
+        # Identify the source file contents identically in every worker
+        self.mtime = mtime
+        self.fingerprint = fingerprint
+        self.columns: Tuple[str, ...] = tuple(rows[0].keys()) if rows else ()
+        # Column holding the branch/department name, normally from the schema
+        self.branch_key = branch_key or default_branch_key(self.columns)
+        self._length = len(rows)
+        self._derived: Dict[Hashable, Any] = {}
+        self._derived_lock = threading.RLock()
+        # Sort orders shipped with the data, keyed by (column, descending)
+        self.sort_orders: Dict[Tuple[str, bool], Sequence[int]] = {}
+        # Rank columns the shipped "Rank" orders were computed from
+        self.rank_columns: Optional[Tuple[str, ...]] = None
+
+        branch_key = self.branch_key
+        self._columns: Dict[str, Any] = {}
+        for name in self.columns:
+            values = [row.get(name) or "" for row in rows]
+            if is_numeric_column(name):
+                self._columns[name] = FloatColumn(values)
+            elif name == branch_key:
+                self._columns[name] = CategoricalColumn(values)
+            else:
+                self._columns[name] = TextColumn(values)
+
+        # Built once here so filters never scan the rows
+        branch_column = self._columns.get(branch_key)
+        self.branch_index: Optional[BranchIndex] = (
+            BranchIndex(branch_column) if branch_column is not None else None
+        )
+
+    @classmethod
+    def from_columns(
+        cls,
+        batch: str,
+        columns: Dict[str, Any],
+        length: int,
+        branch_index: Optional[BranchIndex] = None,
+        sort_orders: Optional[Dict[Tuple[str, bool], Sequence[int]]] = None,
+        rank_columns: Optional[Sequence[str]] = None,
+        version: int = 0,
+        mtime: Optional[float] = None,
+        fingerprint: str = "",
+        branch_key: Optional[str] = None,
+    ) -> "Dataset":
+        """
+        Assemble a dataset from prebuilt columns, e.g. read from a snapshot
+
+        Args:
+            batch: Batch year
+            columns: Column objects in display order
+            length: Number of rows
+            branch_index: Prebuilt branch index, if any
+            sort_orders: Precomputed sort orders keyed by (column, descending)
+            rank_columns: Rank columns the stored "Rank" orders were built from
+            version: Dataset version
+            mtime: Modification time of the source file
+            fingerprint: Identifier of the source file contents
+            branch_key: Column the branch index was built on
+
+        Returns:
+            The dataset
+        """
+        dataset = cls(
+            batch,
+            [],
+            version=version,
+            mtime=mtime,
+            fingerprint=fingerprint,
+            branch_key=branch_key,
+        )
+        dataset.columns = tuple(columns)
+        dataset.branch_key = branch_key or default_branch_key(dataset.columns)
+        dataset._columns = dict(columns)
+        dataset._length = length
+        dataset.branch_index = branch_index
+        dataset.sort_orders = dict(sort_orders or {})
+        dataset.rank_columns = tuple(rank_columns) if rank_columns is not None else None
+        return dataset
+
+    @property
+    def name_index(self) -> Optional[NameIndex]:
+        """Trigram index over the Name column, built on first use"""
+        name_column = self._columns.get("Name")
+        if not isinstance(name_column, TextColumn):
+            return None
+        return self.derived("name_index", lambda: NameIndex(name_column))
+
+    def column(self, name: str):
+        """Get a column by name, raising KeyError if it does not exist"""
+        return self._columns[name]
+
+    def floats(self, name: str, default: Optional[float] = None) -> array:
+        """
+        Get the float array for a numeric column
+
+        Args:
+            name: Column name
+            default: Fill value used if the column is missing; if None the
+                missing column raises KeyError
+
+        Returns:
+            Array of floats with NaN for missing values
+        """
+        column = self._columns.get(name)
+        if isinstance(column, FloatColumn):
+            return column.floats
+        if column is None and default is not None:
+            return array("d", [default]) * self._length
+        raise KeyError(name)
+
+    def derived(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get a structure derived from this dataset, building it on first use
+
+        Derived structures (sort orders, indexes) live as long as the dataset,
+        so a reload automatically discards them.
+
+        Args:
+            key: Identifier of the derived structure
+            factory: Callable building the structure
+
+        Returns:
+            The cached structure
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = factory()
+            return self._derived[key]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Row:
+        if not -self._length <= index < self._length:
+            raise IndexError("dataset index out of range")
+        return Row(self, index % self._length)
+
+    def __iter__(self) -> Iterator[Row]:
+        for index in range(self._length):
+            yield Row(self, index)
+
+    def __repr__(self) -> str:
+        return f"Dataset(batch={self.batch!r}, rows={len(self)}, version={self.version})"
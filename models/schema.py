@@ -0,0 +1,313 @@
+# Per-batch schemas: columns, grouping, branch key and rank formula
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+from config import config
+from models.dataset import MISSING_VALUE, default_branch_key, is_numeric_column
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Grade columns are named "<kind> <n>", e.g. "GPA Sem 1", "CGPA 3", "YGPA 2"
+GRADE_COLUMN = re.compile(r"^(GPA Sem|CGPA|YGPA)\s*(\d+)$", re.IGNORECASE)
+
+# Header shown above each kind of grade column, in display order
+GROUP_LABELS = {"gpa sem": "SGPA", "cgpa": "CGPA", "ygpa": "YGPA"}
+
+# Optional per-batch overrides, e.g. {"rank_columns": ["YGPA 1", "YGPA 2"]}
+SCHEMA_FILE = "schema.json"
+
+
+def ordinal(number: int) -> str:
+    """
+    Format a semester/year number for column headers
+
+    Args:
+        number: Positive integer
+
+    Returns:
+        "1st", "2nd", "3rd", "4th", ...
+    """
+    if 10 <= number % 100 <= 20:
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+@dataclass(frozen=True)
+class ColumnGroup:
+    """Columns shown under one grouped table header"""
+
+    label: str
+    columns: Tuple[str, ...]
+    headers: Tuple[str, ...]
+    average: bool = False
+
+    @property
+    def span(self) -> int:
+        """Number of table cells under the header"""
+        return len(self.columns) + (1 if self.average else 0)
+
+
+@dataclass(frozen=True)
+class BatchSchema:
+    """Everything that differs between batches, resolved once per header"""
+
+    batch: str
+    columns: Tuple[str, ...]
+    numeric_columns: Tuple[str, ...]
+    branch_key: str
+    rank_columns: Tuple[str, ...]
+    rank_label: str
+    groups: Tuple[ColumnGroup, ...]
+    sort_options: Tuple[Tuple[str, str], ...]
+
+    @property
+    def grade_columns(self) -> Tuple[str, ...]:
+        """Grade columns in display order"""
+        return tuple(column for group in self.groups for column in group.columns)
+
+    @cached_property
+    def rank_function(self) -> Callable[[Sequence[Sequence[float]]], array]:
+        """
+        The batch's rank formula compiled into a single column-wise function
+
+        Returns:
+            Function mapping the rank columns' float arrays to the average
+            for every row (NaN where any value is missing)
+        """
+        count = len(self.rank_columns)
+        if count == 0:
+            return lambda arrays: array("d")
+        if count == 1:
+            return lambda arrays: array("d", arrays[0])
+        if count == 2:
+            return lambda arrays: array(
+                "d", ((a + b) / 2 for a, b in zip(arrays[0], arrays[1]))
+            )
+        return lambda arrays: array(
+            "d", (sum(values) / count for values in zip(*arrays))
+        )
+
+    def rank_scores(self, data) -> array:
+        """
+        Compute the rank score of every row of a dataset in one pass
+
+        Args:
+            data: Dataset of the batch
+
+        Returns:
+            Array of average YGPA values indexed by row id, NaN if unavailable
+        """
+        if not self.rank_columns:
+            return array("d", [float("nan")]) * len(data)
+        arrays = [data.floats(column, default=0.0) for column in self.rank_columns]
+        return self.rank_function(arrays)
+
+    def format_average(self, row: Mapping[str, Any]) -> str:
+        """
+        Format a record's average YGPA for display
+
+        Args:
+            row: Student record
+
+        Returns:
+            Average with two decimals, or N/A if any year is missing or zero
+        """
+        values = []
+        for column in self.rank_columns:
+            try:
+                value = float(row.get(column, 0))
+            except (ValueError, TypeError):
+                return MISSING_VALUE
+            if not value or value != value:
+                return MISSING_VALUE
+            values.append(value)
+        if not values:
+            return MISSING_VALUE
+        return "%.2f" % (sum(values) / len(values))
+
+
+def infer_schema(
+    batch: str, columns: Sequence[str], declared: Optional[Dict[str, Any]] = None
+) -> BatchSchema:
+    """
+    Work out a batch's schema from its CSV header
+
+    Args:
+        batch: Batch year
+        columns: CSV header
+        declared: Overrides for branch_key, rank_columns and rank_label
+
+    Returns:
+        The batch schema
+    """
+    declared = declared or {}
+    columns = tuple(columns)
+    numeric_columns = tuple(c for c in columns if is_numeric_column(c))
+
+    # Group grade columns by kind, ordered by their number
+    grouped: Dict[str, list] = {}
+    others = []
+    for column in numeric_columns:
+        match = GRADE_COLUMN.match(column)
+        if match:
+            kind = match.group(1).lower()
+            grouped.setdefault(kind, []).append((int(match.group(2)), column))
+        else:
+            others.append(column)
+
+    rank_columns = tuple(
+        declared.get("rank_columns")
+        or [column for _, column in sorted(grouped.get("ygpa", []))]
+    )
+    missing = [column for column in rank_columns if column not in columns]
+    if missing:
+        logger.warning(f"Rank columns missing from batch {batch}: {missing}")
+
+    groups = []
+    for kind, label in GROUP_LABELS.items():
+        if kind not in grouped:
+            continue
+        numbered = sorted(grouped[kind])
+        group_columns = tuple(column for _, column in numbered)
+        # The averaged rank score gets its own cell after the columns it uses
+        average = len(rank_columns) > 1 and set(group_columns) >= set(rank_columns)
+        groups.append(
+            ColumnGroup(
+                label=label,
+                columns=group_columns,
+                headers=tuple(ordinal(number) for number, _ in numbered),
+                average=average,
+            )
+        )
+    for column in others:
+        groups.append(ColumnGroup(label=column, columns=(column,), headers=("",)))
+
+    if "rank_label" in declared:
+        rank_label = declared["rank_label"]
+    elif len(rank_columns) == 1:
+        rank_label = rank_columns[0].rsplit(" ", 1)[0]
+    else:
+        rank_label = "Avg YGPA"
+
+    # Rank first, then the columns the rank is built from, then the rest
+    rank_groups = [g for g in groups if set(g.columns) & set(rank_columns)]
+    ordered = rank_groups + [g for g in groups if g not in rank_groups]
+    sort_options = [("Rank", f"Rank ({rank_label})")] + [
+        (column, column) for group in ordered for column in group.columns
+    ]
+
+    return BatchSchema(
+        batch=batch,
+        columns=columns,
+        numeric_columns=numeric_columns,
+        branch_key=declared.get("branch_key") or default_branch_key(columns),
+        rank_columns=rank_columns,
+        rank_label=rank_label,
+        groups=tuple(groups),
+        sort_options=tuple(sort_options),
+    )
+
+
+@dataclass
+class _SchemaEntry:
+    """A resolved schema and what it was resolved from"""
+
+    columns: Tuple[str, ...]
+    mtime: Optional[int]
+    checked: float
+    schema: BatchSchema
+
+
+class SchemaRegistry:
+    """
+    Resolves and caches the schema of every batch
+
+    Schemas are inferred from the CSV header, optionally refined by a
+    data/<batch>/schema.json file, and rebuilt when either changes. The file
+    is checked at most every check_interval seconds and only parsed again
+    when its mtime changes, so lookups are normally just a dictionary hit.
+    """
+
+    def __init__(self, data_dir: str, check_interval: float = 1.0):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._schemas: Dict[str, _SchemaEntry] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, batch: str) -> str:
+        return os.path.join(self.data_dir, batch, SCHEMA_FILE)
+
+    def _mtime(self, batch: str) -> Optional[int]:
+        """Get the mtime of a batch's schema file, None if it has none"""
+        try:
+            return os.stat(self._path(batch)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _declared(self, batch: str) -> Dict[str, Any]:
+        """Read a batch's schema file"""
+        path = self._path(batch)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring invalid schema file {path}: {e}")
+            return {}
+
+    def get(self, data) -> BatchSchema:
+        """
+        Get the schema of a batch
+
+        Args:
+            data: Dataset or batch info exposing batch and columns
+
+        Returns:
+            The batch schema
+        """
+        return self.for_columns(data.batch, data.columns)
+
+    def for_columns(self, batch: str, columns: Sequence[str]) -> BatchSchema:
+        """
+        Get the schema of a batch with the given header
+
+        Args:
+            batch: Batch year
+            columns: CSV header
+
+        Returns:
+            The batch schema
+        """
+        now = time.monotonic()
+        entry = self._schemas.get(batch)
+        if entry is not None and (
+            entry.columns is columns or entry.columns == tuple(columns)
+        ):
+            if now - entry.checked < self.check_interval:
+                return entry.schema
+            if self._mtime(batch) == entry.mtime:
+                entry.checked = now
+                return entry.schema
+
+        mtime = self._mtime(batch)
+        schema = infer_schema(batch, columns, self._declared(batch))
+        with self._lock:
+            self._schemas[batch] = _SchemaEntry(tuple(columns), mtime, now, schema)
+        return schema
+
+
+# Create global schema registry instance
+schema_registry = SchemaRegistry(config.DATA_DIR)
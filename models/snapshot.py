@@ -0,0 +1,345 @@
+# Memory-mapped binary snapshots of parsed batches
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from models.dataset import (
+    BranchIndex,
+    CategoricalColumn,
+    Dataset,
+    FloatColumn,
+    TextColumn,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HDBSNAP\0"
+FORMAT_VERSION = 1
+
+# magic, format version, TOC length, body length, CRC-32 of TOC + body, reserved
+HEADER = struct.Struct("<8sIIQII")
+
+# Sections start on 8-byte boundaries so float columns are aligned
+ALIGNMENT = 8
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, stale or corrupt"""
+
+    pass
+
+
+def snapshot_path(csv_path: str) -> Path:
+    """
+    Get the snapshot file belonging to a batch CSV
+
+    Args:
+        csv_path: Path of the source CSV
+
+    Returns:
+        Path of the snapshot next to it
+    """
+    return Path(csv_path).with_suffix(".snap")
+
+
+class StringTable(Sequence):
+    """
+    Read-only sequence of strings stored as UTF-8 bytes plus an offset array
+
+    String i occupies data[offsets[i]:offsets[i + 1]] and is decoded on access.
+    """
+
+    __slots__ = ("_offsets", "_data")
+
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return str(self._data[start:end], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        offsets, data = self._offsets, self._data
+        for index in range(len(self)):
+            yield str(data[offsets[index] : offsets[index + 1]], "utf-8")
+
+
+class _Writer:
+    """Accumulates aligned sections of a snapshot body"""
+
+    def __init__(self):
+        self.body = bytearray()
+
+    def add(self, values: array) -> list:
+        """Append an array and return its [offset, count, typecode] reference"""
+        if sys.byteorder != "little" and values.itemsize > 1:
+            values = array(values.typecode, values)
+            values.byteswap()
+        self.body.extend(b"\0" * (-len(self.body) % ALIGNMENT))
+        offset = len(self.body)
+        self.body.extend(values.tobytes())
+        return [offset, len(values), values.typecode]
+
+    def add_strings(self, strings: Sequence[str]) -> Dict[str, list]:
+        """Append an offset-indexed string table"""
+        offsets = array("I", [0])
+        data = bytearray()
+        for string in strings:
+            data.extend(string.encode("utf-8"))
+            offsets.append(len(data))
+        return {"offsets": self.add(offsets), "data": self.add(array("B", data))}
+
+
+def write_snapshot(
+    path: str,
+    dataset: Dataset,
+    sort_orders: Dict[Tuple[str, bool], Sequence[int]],
+    source_signature: Tuple[int, int],
+    rank_columns: Sequence[str] = (),
+) -> None:
+    """
+    Compile a dataset into a snapshot file
+
+    The file is written to a temporary name and renamed into place, so
+    readers never see a partial snapshot.
+
+    Args:
+        path: Snapshot file to write
+        dataset: Parsed dataset
+        sort_orders: Sort orders to store, keyed by (column, descending)
+        source_signature: (mtime_ns, size) of the CSV the dataset came from
+        rank_columns: Rank columns the "Rank" sort orders were computed from
+    """
+    if array("I").itemsize != 4:
+        raise SnapshotError("Snapshots need 4-byte unsigned integers")
+
+    writer = _Writer()
+    columns = []
+    for name in dataset.columns:
+        column = dataset.column(name)
+        if isinstance(column, FloatColumn):
+            columns.append(
+                {
+                    "name": name,
+                    "kind": "float",
+                    "floats": writer.add(array("d", column.floats)),
+                    "codes": writer.add(array("H", column.labels.codes)),
+                    "categories": writer.add_strings(column.labels.categories),
+                }
+            )
+        elif isinstance(column, CategoricalColumn):
+            columns.append(
+                {
+                    "name": name,
+                    "kind": "category",
+                    "codes": writer.add(array("H", column.codes)),
+                    "categories": writer.add_strings(column.categories),
+                }
+            )
+        else:
+            columns.append(
+                {
+                    "name": name,
+                    "kind": "text",
+                    "strings": writer.add_strings(column.values),
+                }
+            )
+
+    branch_index = None
+    if dataset.branch_index is not None:
+        branches = list(dataset.branch_index.postings)
+        offsets = array("I", [0])
+        ids = array("I")
+        for branch in branches:
+            ids.extend(dataset.branch_index.postings[branch])
+            offsets.append(len(ids))
+        branch_index = {
+            "branches": writer.add_strings(branches),
+            "offsets": writer.add(offsets),
+            "ids": writer.add(ids),
+        }
+
+    orders = [
+        {"column": column, "descending": descending, "ids": writer.add(array("I", ids))}
+        for (column, descending), ids in sorted(sort_orders.items())
+    ]
+
+    toc = json.dumps(
+        {
+            "batch": dataset.batch,
+            "rows": len(dataset),
+            "branch_key": dataset.branch_key,
+            "source": list(source_signature),
+            "columns": columns,
+            "branch_index": branch_index,
+            "sort_orders": orders,
+            "rank_columns": list(rank_columns),
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    toc += b" " * (-(HEADER.size + len(toc)) % ALIGNMENT)
+
+    checksum = zlib.crc32(writer.body, zlib.crc32(toc))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(toc), len(writer.body), checksum, 0)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(toc)
+            f.write(writer.body)
+        # Workers may run as a different user than the build step
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    size = HEADER.size + len(toc) + len(writer.body)
+    logger.info(f"Wrote snapshot {path} ({size} bytes)")
+
+
+def read_snapshot(
+    path: str,
+    source_signature: Optional[Tuple[int, int]] = None,
+    version: int = 0,
+    mtime: Optional[float] = None,
+    fingerprint: str = "",
+) -> Dataset:
+    """
+    Open a snapshot as a dataset backed by a read-only memory map
+
+    Columns, the branch index and sort orders are views into the mapped file,
+    so every process opening the same snapshot shares one page-cache copy.
+
+    Args:
+        path: Snapshot file
+        source_signature: Expected (mtime_ns, size) of the source CSV; a
+            snapshot built from a different file is rejected
+        version: Dataset version to assign
+        mtime: Modification time of the source file
+        fingerprint: Identifier of the source file contents
+
+    Returns:
+        Dataset reading directly from the snapshot
+
+    Raises:
+        SnapshotError: If the file is missing, stale, corrupt or incompatible
+    """
+    if sys.byteorder != "little":
+        raise SnapshotError("Snapshots can only be mapped on little-endian hosts")
+
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Cannot map snapshot {path}: {e}")
+
+    view = memoryview(mapped)
+    try:
+        if len(mapped) < HEADER.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        magic, format_version, toc_length, body_length, checksum, _ = (
+            HEADER.unpack_from(mapped)
+        )
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a snapshot")
+        if format_version != FORMAT_VERSION:
+            raise SnapshotError(
+                f"Snapshot {path} has format {format_version}, "
+                f"expected {FORMAT_VERSION}"
+            )
+        if len(mapped) != HEADER.size + toc_length + body_length:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+
+        if zlib.crc32(view[HEADER.size :]) != checksum:
+            raise SnapshotError(f"Snapshot {path} failed its checksum")
+
+        toc = json.loads(bytes(view[HEADER.size : HEADER.size + toc_length]))
+        if source_signature is not None and tuple(toc["source"]) != tuple(
+            source_signature
+        ):
+            raise SnapshotError(f"Snapshot {path} is older than its CSV")
+    except SnapshotError:
+        # Unmap rejected files now rather than whenever they are collected
+        view.release()
+        mapped.close()
+        raise
+
+    body = view[HEADER.size + toc_length :]
+
+    def section(ref: list) -> memoryview:
+        offset, count, typecode = ref
+        itemsize = array(typecode).itemsize
+        return body[offset : offset + count * itemsize].cast(typecode)
+
+    def strings(ref: Dict[str, Any]) -> StringTable:
+        return StringTable(section(ref["offsets"]), section(ref["data"]))
+
+    columns = {}
+    for spec in toc["columns"]:
+        if spec["kind"] == "float":
+            labels = CategoricalColumn.from_codes(
+                section(spec["codes"]), strings(spec["categories"])
+            )
+            columns[spec["name"]] = FloatColumn.from_arrays(
+                section(spec["floats"]), labels
+            )
+        elif spec["kind"] == "category":
+            columns[spec["name"]] = CategoricalColumn.from_codes(
+                section(spec["codes"]), strings(spec["categories"])
+            )
+        else:
+            columns[spec["name"]] = TextColumn.from_sequence(strings(spec["strings"]))
+
+    branch_index = None
+    if toc["branch_index"] is not None:
+        spec = toc["branch_index"]
+        offsets = section(spec["offsets"])
+        ids = section(spec["ids"])
+        branch_index = BranchIndex.from_postings(
+            {
+                branch: ids[offsets[i] : offsets[i + 1]]
+                for i, branch in enumerate(strings(spec["branches"]))
+            }
+        )
+
+    sort_orders = {
+        (order["column"], order["descending"]): section(order["ids"])
+        for order in toc["sort_orders"]
+    }
+
+    return Dataset.from_columns(
+        toc["batch"],
+        columns,
+        toc["rows"],
+        branch_index=branch_index,
+        sort_orders=sort_orders,
+        # Older snapshots did not record it, so their rank orders are rebuilt
+        rank_columns=toc.get("rank_columns"),
+        branch_key=toc.get("branch_key"),
+        version=version,
+        mtime=mtime,
+        fingerprint=fingerprint,
+    )
@@ -0,0 +1,759 @@
+# SQLite-backed data access layer
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.data_access import DataAccess, DataAccessError
+from models.dataset import Dataset, FloatColumn, is_numeric_column
+from models.schema import schema_registry
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Columns that are imported but never selected for display
+HIDDEN_COLUMNS = ("Autonomy Roll",)
+
+# Precomputed rank modes stored as rank_<mode> and rank_<mode>_branch
+RANK_COLUMNS = ("ordinal", "competition", "dense")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    branch_key TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    mtime REAL,
+    fingerprint TEXT NOT NULL,
+    rank_columns TEXT
+);
+CREATE TABLE IF NOT EXISTS batch_columns (
+    batch TEXT NOT NULL REFERENCES batches(batch) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    sql_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (batch, position)
+);
+CREATE TABLE IF NOT EXISTS branches (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+"""
+
+
+@dataclass
+class BatchInfo:
+    """Metadata describing an imported batch, read without touching its rows"""
+
+    batch: str
+    columns: Tuple[str, ...]
+    branch_key: str
+    row_count: int
+    mtime: Optional[float]
+    fingerprint: str
+    version: int
+    sql_names: Dict[str, str]
+    kinds: Dict[str, str]
+    # Rank formula the stored rank_score and rank columns were computed with
+    rank_columns: Optional[Tuple[str, ...]]
+
+
+def _numeric_key(value: str) -> Optional[float]:
+    """Parse a text value for sorting, None if it is not a number"""
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return None if number != number else number
+
+
+def _table_suffix(batch: str) -> str:
+    """Turn a batch key into a safe SQL identifier suffix"""
+    suffix = re.sub(r"[^0-9A-Za-z_]", "_", batch)
+    if not suffix:
+        raise DataAccessError(f"Invalid batch name: {batch!r}")
+    return suffix
+
+
+def import_batches(
+    db_path: str,
+    datasets: Sequence[Dataset],
+    rank_scores: Dict[str, array],
+    ranks: Dict[str, Dict[str, Sequence[int]]],
+) -> None:
+    """
+    Load parsed batches into a SQLite database, replacing earlier imports
+
+    Every batch gets a results table with REAL grade columns, a reference to
+    the shared branches table, rank_score and precomputed rank columns, an
+    index per grade column and an FTS5 trigram index over names. The rank
+    columns of the batch schema the scores were computed with are recorded
+    so a later schema.json override can be detected.
+
+    Args:
+        db_path: Database file to create or update
+        datasets: Parsed datasets; batches already in the database are kept
+        rank_scores: Average-YGPA rank score per batch, indexed by row id
+        ranks: Per batch, rank arrays keyed by rank column (e.g. "dense" or
+            "dense_branch"), indexed by row id with 0 for unranked rows
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.executescript(SCHEMA)
+        # Databases imported before the rank formula was recorded
+        fields = [row[1] for row in connection.execute("PRAGMA table_info(batches)")]
+        if "rank_columns" not in fields:
+            connection.execute("ALTER TABLE batches ADD COLUMN rank_columns TEXT")
+        with connection:
+            for dataset in datasets:
+                batch = dataset.batch
+                _import_batch(connection, dataset, rank_scores[batch], ranks[batch])
+            # Newest batch first, like the CSV directory listing, whichever
+            # batches this import covered
+            connection.execute(
+                "UPDATE batches SET position = (SELECT COUNT(*) FROM batches AS newer "
+                "WHERE newer.batch > batches.batch)"
+            )
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+
+
+def _import_batch(
+    connection: sqlite3.Connection,
+    dataset: Dataset,
+    scores: array,
+    ranks: Dict[str, Sequence[int]],
+) -> None:
+    """Write one batch and its indexes inside the caller's transaction"""
+    suffix = _table_suffix(dataset.batch)
+    table = f"results_{suffix}"
+    fts_table = f"names_{suffix}"
+    words_table = f"words_{suffix}"
+    branch_key = dataset.branch_key
+
+    connection.execute(f"DROP TABLE IF EXISTS {words_table}")
+    connection.execute(f"DROP TABLE IF EXISTS {fts_table}")
+    connection.execute(f"DROP TABLE IF EXISTS {table}")
+    connection.execute("DELETE FROM batch_columns WHERE batch = ?", (dataset.batch,))
+    connection.execute("DELETE FROM batches WHERE batch = ?", (dataset.batch,))
+
+    # Map CSV headers to SQL columns
+    rank_columns = [f"rank_{name}" for name in ranks]
+    definitions = ["row_id INTEGER PRIMARY KEY", "rank_score REAL"] + [
+        f"{column} INTEGER" for column in rank_columns
+    ]
+    columns = []
+    for index, name in enumerate(dataset.columns):
+        if name == "Name":
+            sql_name, kind = "name", "name"
+            definitions += ["name TEXT NOT NULL", "name_lower TEXT NOT NULL"]
+        elif name == branch_key:
+            sql_name, kind = "branch_id", "branch"
+            definitions.append("branch_id INTEGER REFERENCES branches(id)")
+        elif is_numeric_column(name):
+            sql_name, kind = f"c{index}", "real"
+            definitions += [f"{sql_name} REAL", f"{sql_name}_label TEXT"]
+        else:
+            sql_name, kind = f"c{index}", "text"
+            definitions += [f"{sql_name} TEXT", f"{sql_name}_key REAL"]
+        columns.append((name, sql_name, kind))
+
+    connection.execute(f"CREATE TABLE {table} ({', '.join(definitions)})")
+    connection.execute(
+        "INSERT INTO batches VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            dataset.batch,
+            0,
+            branch_key,
+            len(dataset),
+            dataset.mtime,
+            dataset.fingerprint,
+            json.dumps(schema_registry.get(dataset).rank_columns),
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO batch_columns VALUES (?, ?, ?, ?, ?)",
+        [
+            (dataset.batch, index, name, sql_name, kind)
+            for index, (name, sql_name, kind) in enumerate(columns)
+        ],
+    )
+
+    # Normalize branch names into the shared table
+    branch_ids: Dict[str, int] = {}
+    if branch_key in dataset.columns:
+        for branch in dataset.column(branch_key).categories:
+            connection.execute(
+                "INSERT OR IGNORE INTO branches (name) VALUES (?)", (branch,)
+            )
+            branch_ids[branch] = connection.execute(
+                "SELECT id FROM branches WHERE name = ?", (branch,)
+            ).fetchone()[0]
+
+    # Insert rows column-wise so numeric values come straight from the arrays
+    sql_columns = ["row_id", "rank_score"] + rank_columns
+    rank_arrays = list(ranks.values())
+    getters = []
+    for name, sql_name, kind in columns:
+        column = dataset.column(name)
+        if kind == "real":
+            sql_columns += [sql_name, f"{sql_name}_label"]
+            getters.append(
+                lambda i, c=column: (
+                    None if c.floats[i] != c.floats[i] else c.floats[i],
+                    c[i],
+                )
+            )
+        elif kind == "branch":
+            sql_columns.append(sql_name)
+            getters.append(lambda i, c=column: (branch_ids[c[i]],))
+        elif kind == "name":
+            sql_columns += [sql_name, "name_lower"]
+            getters.append(lambda i, c=column: (c[i], c[i].lower()))
+        else:
+            # Text columns such as roll numbers still sort numerically
+            sql_columns += [sql_name, f"{sql_name}_key"]
+            getters.append(lambda i, c=column: (c[i], _numeric_key(c[i])))
+
+    def rows():
+        for i in range(len(dataset)):
+            score = scores[i]
+            values = [i, None if score != score else score]
+            values.extend(ranks[i] or None for ranks in rank_arrays)
+            for getter in getters:
+                values.extend(getter(i))
+            yield values
+
+    placeholders = ", ".join("?" for _ in sql_columns)
+    connection.executemany(
+        f"INSERT INTO {table} ({', '.join(sql_columns)}) VALUES ({placeholders})",
+        rows(),
+    )
+
+    # Indexes for every filter and sort the app issues
+    connection.execute(f"CREATE INDEX ix_{suffix}_rank ON {table} (rank_score)")
+    if branch_ids:
+        connection.execute(f"CREATE INDEX ix_{suffix}_branch ON {table} (branch_id)")
+    for _, sql_name, kind in columns:
+        if kind == "real":
+            connection.execute(
+                f"CREATE INDEX ix_{suffix}_{sql_name} ON {table} ({sql_name})"
+            )
+    if "Name" in dataset.columns:
+        connection.execute(
+            f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+            f"name_lower, content='{table}', content_rowid='row_id', "
+            f"tokenize='trigram')"
+        )
+        connection.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+        # Every word of every name and the rest of the name after it, so
+        # prefix suggestions are a range scan (see NameIndex.prefix)
+        connection.execute(
+            f"CREATE TABLE {words_table} (word TEXT NOT NULL, row_id INTEGER NOT NULL, "
+            f"PRIMARY KEY (word, row_id)) WITHOUT ROWID"
+        )
+        names = dataset.column("Name")
+
+        def words():
+            for row_id in range(len(dataset)):
+                name = names[row_id].lower()
+                for start in range(len(name)):
+                    if name[start] != " " and (start == 0 or name[start - 1] == " "):
+                        yield name[start:], row_id
+
+        connection.executemany(
+            f"INSERT OR IGNORE INTO {words_table} VALUES (?, ?)", words()
+        )
+
+    logger.info(f"Imported {len(dataset)} records for batch {dataset.batch}")
+
+
+class SQLiteDataAccess(DataAccess):
+    """Serves batches from a SQLite database, pushing queries down into SQL"""
+
+    supports_queries = True
+
+    def __init__(self, db_path: str):
+        super().__init__()
+        self.db_path = db_path
+        self._local = threading.local()
+        self._datasets: Dict[str, Dataset] = {}
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+        if not Path(db_path).exists():
+            logger.warning(f"SQLite database not found: {db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's read-only connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            try:
+                connection = sqlite3.connect(
+                    f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+                )
+            except sqlite3.Error as e:
+                raise DataAccessError(f"Cannot open database {self.db_path}: {e}")
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple]:
+        """Run a query, translating SQLite errors into DataAccessError"""
+        try:
+            return self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"SQLite query failed: {e}")
+            raise DataAccessError(f"Database query failed: {e}")
+
+    def get_available_batches(self) -> List[str]:
+        """
+        Get list of imported batch years
+
+        Returns:
+            List of batch years in display order
+        """
+        try:
+            rows = self._execute("SELECT batch FROM batches ORDER BY position")
+        except DataAccessError:
+            return []
+        return [row[0] for row in rows]
+
+    def warm_cache(self) -> None:
+        """Check the database is readable; rows are only loaded on demand"""
+        batches = self.get_available_batches()
+        logger.info(f"SQLite database {self.db_path} holds batches: {batches}")
+
+    def get_batch_info(self, batch: str) -> BatchInfo:
+        """
+        Read a batch's metadata without loading its rows
+
+        Args:
+            batch: The batch year
+
+        Returns:
+            BatchInfo for the batch
+
+        Raises:
+            DataAccessError: If the batch has not been imported
+        """
+        meta = self._execute(
+            "SELECT branch_key, row_count, mtime, fingerprint, rank_columns "
+            "FROM batches WHERE batch = ?",
+            (batch,),
+        )
+        if not meta:
+            raise DataAccessError(f"Batch {batch} not found in {self.db_path}")
+        branch_key, row_count, mtime, fingerprint, rank_columns = meta[0]
+
+        columns = self._execute(
+            "SELECT name, sql_name, kind FROM batch_columns WHERE batch = ? "
+            "ORDER BY position",
+            (batch,),
+        )
+
+        with self._lock:
+            key = (batch, fingerprint)
+            if key not in self._versions:
+                self._versions[key] = self._next_version()
+            version = self._versions[key]
+
+        return BatchInfo(
+            batch=batch,
+            columns=tuple(name for name, _, _ in columns),
+            branch_key=branch_key,
+            row_count=row_count,
+            mtime=mtime,
+            fingerprint=fingerprint,
+            version=version,
+            sql_names={name: sql_name for name, sql_name, _ in columns},
+            kinds={name: kind for name, _, kind in columns},
+            rank_columns=tuple(json.loads(rank_columns)) if rank_columns else None,
+        )
+
+    def _select_list(self, info: BatchInfo) -> Tuple[List[str], List[str]]:
+        """Build the SELECT expressions returning display values"""
+        names, expressions = [], []
+        for name in info.columns:
+            sql_name, kind = info.sql_names[name], info.kinds[name]
+            if kind == "real":
+                expressions.append(f"r.{sql_name}_label")
+            elif kind == "branch":
+                expressions.append("b.name")
+            else:
+                expressions.append(f"r.{sql_name}")
+            names.append(name)
+        return names, expressions
+
+    def load_data(self, batch: str) -> Dataset:
+        """
+        Load the full dataset for a batch from the database
+
+        Args:
+            batch: The batch year
+
+        Returns:
+            Read-only dataset, rebuilt only when the import changes
+        """
+        info = self.get_batch_info(batch)
+        with self._lock:
+            dataset = self._datasets.get(batch)
+            if dataset is not None and dataset.fingerprint == info.fingerprint:
+                return dataset
+
+        names, expressions = self._select_list(info)
+        rows = self._execute(
+            f"SELECT {', '.join(expressions)} FROM results_{_table_suffix(batch)} r "
+            f"LEFT JOIN branches b ON b.id = r.branch_id ORDER BY r.row_id"
+        )
+        dataset = Dataset(
+            batch,
+            [dict(zip(names, row)) for row in rows],
+            version=info.version,
+            mtime=info.mtime,
+            fingerprint=info.fingerprint,
+            branch_key=info.branch_key,
+        )
+        with self._lock:
+            self._datasets[batch] = dataset
+
+        logger.info(f"Loaded {len(dataset)} records for batch {batch} from SQLite")
+        self._run_load_hooks(dataset)
+        return dataset
+
+    def get_branches(self, data) -> List[str]:
+        """
+        List the distinct branches/departments of a batch
+
+        Args:
+            data: BatchInfo or Dataset for the batch
+
+        Returns:
+            Sorted list of unique branches/departments
+        """
+        if isinstance(data, Dataset) and data.branch_index is not None:
+            return list(data.branch_index.branches)
+
+        rows = self._execute(
+            f"SELECT DISTINCT b.name FROM results_{_table_suffix(data.batch)} r "
+            f"JOIN branches b ON b.id = r.branch_id"
+        )
+        return sorted({row[0].strip() for row in rows if row[0] and row[0].strip()})
+
+    def _where(self, info: BatchInfo, filter_params) -> Tuple[str, List[Any]]:
+        """Translate filter parameters into a WHERE clause"""
+        clauses, params = [], []
+        branches, search, _, _ = filter_params.query_key()
+
+        if branches:
+            placeholders = ", ".join("?" for _ in branches)
+            clauses.append(
+                f"r.branch_id IN "
+                f"(SELECT id FROM branches WHERE name IN ({placeholders}))"
+            )
+            params += branches
+
+        if search:
+            if "Name" not in info.sql_names:
+                return "WHERE 0", []
+            if len(search) >= 3:
+                # Trigram index narrows candidates; instr() keeps exact semantics
+                fts_table = f"names_{_table_suffix(info.batch)}"
+                clauses.append(
+                    f"r.row_id IN (SELECT rowid FROM {fts_table} "
+                    f"WHERE {fts_table} MATCH ?)"
+                )
+                params.append('"' + search.replace('"', '""') + '"')
+            clauses.append("instr(r.name_lower, ?) > 0")
+            params.append(search)
+
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _ranking(self, info: BatchInfo) -> Tuple[str, str]:
+        """
+        Find the rank_score and rank columns for the batch's current schema
+
+        The import stores them for the rank formula schema.json declared at
+        the time. If the schema now declares other rank columns, the same
+        values are computed from the grade columns with window functions,
+        matching DataProcessor.rank_scores and compute_ranking.
+
+        Returns:
+            A join to add to the query (empty when the stored values apply)
+            and the alias the rank columns are read from
+        """
+        rank_columns = schema_registry.get(info).rank_columns
+        if info.rank_columns == rank_columns:
+            return "", "r"
+
+        terms = []
+        for column in rank_columns:
+            kind = info.kinds.get(column)
+            if kind is None:
+                # Like Dataset.floats(default=0.0) for a missing column
+                terms.append("0.0")
+            elif kind == "real":
+                terms.append(info.sql_names[column])
+            else:
+                raise DataAccessError(
+                    f"Rank column {column} of batch {info.batch} is not numeric"
+                )
+        score = f"({' + '.join(terms)}) / {len(terms)}.0" if terms else "NULL"
+
+        has_branch = "branch" in info.kinds.values()
+        windows = []
+        for per_branch in (False, True):
+            partition = "PARTITION BY branch_id " if per_branch and has_branch else ""
+            for mode, function, tiebreak in (
+                ("ordinal", "ROW_NUMBER", ", row_id"),
+                ("competition", "RANK", ""),
+                ("dense", "DENSE_RANK", ""),
+            ):
+                # Missing scores sort last, so they never shift the others
+                name = f"rank_{mode}{'_branch' if per_branch else ''}"
+                windows.append(
+                    f"CASE WHEN score IS NULL THEN NULL ELSE {function}() OVER "
+                    f"({partition}ORDER BY score DESC{tiebreak}) END AS {name}"
+                )
+
+        source = "row_id, branch_id" if has_branch else "row_id"
+        table = f"results_{_table_suffix(info.batch)}"
+        join = (
+            f"JOIN (SELECT row_id, score AS rank_score, {', '.join(windows)} "
+            f"FROM (SELECT {source}, {score} AS score FROM {table})) k "
+            f"ON k.row_id = r.row_id"
+        )
+        return join, "k"
+
+    def _order_by(self, info: BatchInfo, filter_params, ranked: str = "r") -> str:
+        """
+        Translate sort parameters into an ORDER BY clause
+
+        Mirrors DataProcessor.sort_data: missing values sort last (except
+        ascending rank, which keeps them first) and ties keep file order.
+        Unknown columns keep file order.
+        """
+        _, _, sort_by, order = filter_params.query_key()
+        if sort_by == "Rank":
+            nulls = "DESC" if order == "asc" else "ASC"
+            score = f"{ranked}.rank_score"
+            return f"ORDER BY ({score} IS NULL) {nulls}, {score} DESC, r.row_id"
+        kind = info.kinds.get(sort_by)
+        if kind == "real":
+            column = f"r.{info.sql_names[sort_by]}"
+        elif kind == "text":
+            column = f"r.{info.sql_names[sort_by]}_key"
+        else:
+            # Names and branches never parse as numbers, so file order applies
+            return "ORDER BY r.row_id"
+        direction = "DESC" if order == "desc" else "ASC"
+        return f"ORDER BY ({column} IS NULL), {column} {direction}, r.row_id"
+
+    def _seek(
+        self, filter_params, after: Tuple[float, int], ranked: str
+    ) -> Tuple[str, List[Any]]:
+        """
+        Translate a keyset cursor into a condition on the Rank order
+
+        Selects the records _order_by puts after the cursor, so the rank_score
+        index finds the page instead of skipping the records before it.
+        """
+        _, _, _, order = filter_params.query_key()
+        score, row_id = after
+        column = f"{ranked}.rank_score"
+        if score != score:
+            # Unranked records come last, or first in ascending order
+            if order == "asc":
+                return f"({column} IS NOT NULL OR r.row_id > ?)", [row_id]
+            return f"({column} IS NULL AND r.row_id > ?)", [row_id]
+        condition = f"{column} < ? OR ({column} = ? AND r.row_id > ?)"
+        if order == "desc":
+            condition = f"{column} IS NULL OR {condition}"
+        return f"({condition})", [score, score, row_id]
+
+    def _page(
+        self,
+        info: BatchInfo,
+        filter_params,
+        ranking: Tuple[str, str],
+        expressions: List[str],
+        offset: int,
+        limit: Optional[int],
+        after: Optional[Tuple[float, int]],
+    ) -> List[Tuple]:
+        """Select expressions for a page of the filtered, sorted result"""
+        where, params = self._where(info, filter_params)
+        join, ranked = ranking
+        order_by = self._order_by(info, filter_params, ranked)
+        if after is not None and filter_params.query_key()[2] == "Rank":
+            seek, seek_params = self._seek(filter_params, after, ranked)
+            where = f"{where} AND {seek}" if where else f"WHERE {seek}"
+            params, offset = params + seek_params, 0
+
+        return self._execute(
+            f"SELECT {', '.join(expressions)} "
+            f"FROM results_{_table_suffix(info.batch)} r {join} "
+            f"LEFT JOIN branches b ON b.id = r.branch_id "
+            f"{where} {order_by} LIMIT ? OFFSET ?",
+            params + [limit if limit is not None else -1, offset],
+        )
+
+    def count(
+        self, batch: str, filter_params, after: Optional[Tuple[float, int]] = None
+    ) -> int:
+        """
+        Count the records matching the filters
+
+        Args:
+            batch: The batch year
+            filter_params: Filter parameters
+            after: Only count records after this keyset cursor of a
+                Rank-sorted result
+
+        Returns:
+            Number of matching records
+        """
+        info = self.get_batch_info(batch)
+        where, params = self._where(info, filter_params)
+        join = ""
+        if after is not None and filter_params.query_key()[2] == "Rank":
+            join, ranked = self._ranking(info)
+            seek, seek_params = self._seek(filter_params, after, ranked)
+            where = f"{where} AND {seek}" if where else f"WHERE {seek}"
+            params = params + seek_params
+        rows = self._execute(
+            f"SELECT COUNT(*) FROM results_{_table_suffix(batch)} r {join} {where}",
+            params,
+        )
+        return rows[0][0]
+
+    def query(
+        self,
+        batch: str,
+        filter_params,
+        offset: int,
+        limit: Optional[int],
+        rank_mode: str = "position",
+        per_branch: bool = False,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch one ranked, filtered and sorted page
+
+        Args:
+            batch: The batch year
+            filter_params: Filter parameters
+            offset: Position of the first record in the result, skipped to
+                unless after is given and used to number positions
+            limit: Maximum number of records to return, None for all
+            rank_mode: "position" to number rows in result order, otherwise
+                the precomputed rank column to return
+            per_branch: Return ranks within each branch
+            after: Keyset cursor of the record before offset in a
+                Rank-sorted result, seeked to instead of skipping records
+
+        Returns:
+            Records with display values and their Rank, sensitive fields removed
+        """
+        info = self.get_batch_info(batch)
+        names, expressions = self._select_list(info)
+        visible = [
+            (name, expression)
+            for name, expression in zip(names, expressions)
+            if name not in HIDDEN_COLUMNS
+        ]
+        ranking = self._ranking(info)
+
+        expressions = [expression for _, expression in visible]
+        if rank_mode != "position":
+            if rank_mode not in RANK_COLUMNS:
+                raise DataAccessError(f"Unknown rank mode: {rank_mode}")
+            suffix = "_branch" if per_branch else ""
+            expressions.append(f"{ranking[1]}.rank_{rank_mode}{suffix}")
+
+        rows = self._page(
+            info, filter_params, ranking, expressions, offset, limit, after
+        )
+
+        records = []
+        for rank, row in enumerate(rows, offset + 1):
+            record = dict(zip((name for name, _ in visible), row))
+            record["Rank"] = rank if rank_mode == "position" else row[-1]
+            records.append(record)
+        return records
+
+    def rank_keys(
+        self,
+        batch: str,
+        filter_params,
+        offset: int,
+        limit: Optional[int],
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[float, int]]:
+        """
+        Get the keyset cursors of the records query returns
+
+        Args:
+            batch: The batch year
+            filter_params: Filter parameters of a Rank-sorted result
+            offset: As for query
+            limit: As for query
+            after: As for query
+
+        Returns:
+            Rank score (NaN if missing) and row id of every record
+        """
+        info = self.get_batch_info(batch)
+        ranking = self._ranking(info)
+        rows = self._page(
+            info,
+            filter_params,
+            ranking,
+            [f"{ranking[1]}.rank_score", "r.row_id"],
+            offset,
+            limit,
+            after,
+        )
+        return [
+            (float("nan") if score is None else score, row_id)
+            for score, row_id in rows
+        ]
+
+    def suggest_names(self, batch: str, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Suggest student names with a word starting with the given prefix
+
+        Same results and order as DataProcessor.suggest_names.
+
+        Args:
+            batch: The batch year
+            prefix: Partial search input
+            limit: Maximum number of suggestions
+
+        Returns:
+            Matching names in alphabetical order of the matched word
+        """
+        term = (prefix or "").strip().lower()
+        if not term:
+            return []
+        info = self.get_batch_info(batch)
+        if "Name" not in info.sql_names:
+            return []
+        suffix = _table_suffix(batch)
+        rows = self._execute(
+            f"SELECT r.name FROM (SELECT row_id, MIN(word) AS word "
+            f"FROM words_{suffix} WHERE word >= ? AND word < ? "
+            f"GROUP BY row_id ORDER BY word, row_id LIMIT ?) m "
+            f"JOIN results_{suffix} r ON r.row_id = m.row_id "
+            f"ORDER BY m.word, m.row_id",
+            (term, term + "\U0010ffff", limit),
+        )
+        return [row[0] for row in rows]
@@ -0,0 +1,363 @@
+# Caches for processed query results and rendered page fragments
+
+import logging
+import os
+import stat
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from config import config
+from models.dataset import Dataset
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResultCacheStats:
+    """Counters for the query result cache"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class ResultCache:
+    """
+    LRU cache of processed row orders keyed on batch, dataset version and query
+
+    Only row ids are stored, so an entry costs four bytes per matching row.
+    The cache is bounded both by number of entries and by total bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = ResultCacheStats()
+        self._entries: "OrderedDict[Tuple, Tuple[Sequence[int], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size_of(indices: Sequence[int]) -> int:
+        """Approximate memory used by a stored row order"""
+        if isinstance(indices, array):
+            return indices.itemsize * len(indices)
+        # Ranges and memory-mapped orders take no memory of their own
+        return 0
+
+    def get(self, dataset: Dataset, query_key: Hashable) -> Optional[Sequence[int]]:
+        """
+        Look up the row order for a query
+
+        Args:
+            dataset: Dataset the query ran against
+            query_key: Normalized query parameters
+
+        Returns:
+            Stored row ids, or None on a miss
+        """
+        key = (dataset.batch, dataset.version, query_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def put(
+        self, dataset: Dataset, query_key: Hashable, indices: Sequence[int]
+    ) -> Sequence[int]:
+        """
+        Store the row order for a query
+
+        Args:
+            dataset: Dataset the query ran against
+            query_key: Normalized query parameters
+            indices: Row ids in result order
+
+        Returns:
+            The stored (compacted) row ids
+        """
+        if not isinstance(indices, (array, range, memoryview)):
+            indices = array("I", indices)
+        size = self._size_of(indices)
+        if size > self.max_bytes:
+            return indices
+
+        key = (dataset.batch, dataset.version, query_key)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (indices, size)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats.evictions += 1
+
+        return indices
+
+    def invalidate(self, dataset: Dataset) -> None:
+        """
+        Drop entries for older versions of a batch
+
+        Meant to be registered as a data access load hook.
+
+        Args:
+            dataset: Freshly loaded dataset
+        """
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if key[0] == dataset.batch and key[1] != dataset.version
+            ]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self.stats.invalidations += len(stale)
+
+        if stale:
+            logger.info(f"Dropped {len(stale)} cached results for batch {dataset.batch}")
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit/miss counts, hit rate and current size
+        """
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.stats.evictions,
+            "invalidations": self.stats.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+@dataclass
+class FragmentCacheStats:
+    """Counters for the rendered fragment cache"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class FragmentCache:
+    """
+    Byte-bounded cache of rendered HTML fragments
+
+    Fragments are kept in a per-process LRU and, if a directory is configured,
+    written to a local on-disk store so other workers on the same host can
+    reuse them. Pages insert fragments unescaped, so the store is only used
+    if it is a private directory of this user. Keys must already identify the
+    dataset version and query.
+    """
+
+    def __init__(
+        self, max_bytes: int, directory: Optional[str] = None, max_disk_bytes: int = 0
+    ):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory else None
+        self.stats = FragmentCacheStats()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        # Bytes on disk as of the last scan plus what this process wrote since
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        if self.directory is not None:
+            try:
+                self._open_directory()
+            except OSError as e:
+                logger.warning(f"Fragment cache directory unavailable: {e}")
+                self.directory = None
+            else:
+                self._trim_disk()
+
+    def _open_directory(self) -> None:
+        """Create the store private to this user, or refuse a shared one"""
+        self.directory.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.directory.mkdir(mode=0o700)
+        except FileExistsError:
+            pass
+        info = os.lstat(self.directory)
+        if not stat.S_ISDIR(info.st_mode):
+            raise OSError(f"{self.directory} is not a directory")
+        if info.st_uid != os.geteuid() or info.st_mode & 0o077:
+            raise OSError(
+                f"{self.directory} must be owned by this user and private (0700)"
+            )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.html"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendered fragment
+
+        Args:
+            key: Fragment key (hex digest)
+
+        Returns:
+            The fragment HTML, or None on a miss
+        """
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.stats.memory_hits += 1
+                return fragment
+
+        if self.directory is not None:
+            try:
+                fragment = self._path(key).read_text(encoding="utf-8")
+            except OSError:
+                fragment = None
+            if fragment is not None:
+                self._remember(key, fragment)
+                with self._lock:
+                    self.stats.disk_hits += 1
+                return fragment
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, key: str, fragment: str) -> None:
+        """
+        Store a rendered fragment in memory and on disk
+
+        Args:
+            key: Fragment key (hex digest)
+            fragment: Rendered HTML
+        """
+        self._remember(key, fragment)
+        if self.directory is not None:
+            self._write(key, fragment)
+
+    def _remember(self, key: str, fragment: str) -> None:
+        """Add a fragment to the in-memory LRU, evicting to stay under budget"""
+        size = len(fragment)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = fragment
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats.evictions += 1
+
+    def _write(self, key: str, fragment: str) -> None:
+        """Atomically write a fragment to disk, trimming the store when full"""
+        data = fragment.encode("utf-8")
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write fragment {key}: {e}")
+            return
+
+        with self._lock:
+            self._disk_bytes += len(data)
+            full = self._disk_bytes > self.max_disk_bytes
+        if full:
+            self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """
+        Measure the store and remove the least recently written fragments
+
+        Only runs when the running size says the store is over budget. Other
+        workers write to it too, so it trims to three quarters of the budget
+        to leave room before the next scan.
+        """
+        try:
+            files = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(".html")
+            ]
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in files)
+        if total > self.max_disk_bytes:
+            target = self.max_disk_bytes * 3 // 4
+            for _, size, path in sorted(files):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self) -> None:
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit/miss counts and current memory size
+        """
+        lookups = self.stats.memory_hits + self.stats.disk_hits + self.stats.misses
+        hits = self.stats.memory_hits + self.stats.disk_hits
+        return {
+            "memory_hits": self.stats.memory_hits,
+            "disk_hits": self.stats.disk_hits,
+            "misses": self.stats.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.stats.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+# Create global cache instances
+result_cache = ResultCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_MAX_BYTES)
+fragment_cache = FragmentCache(
+    config.FRAGMENT_CACHE_MAX_BYTES,
+    config.FRAGMENT_CACHE_DIR,
+    config.FRAGMENT_CACHE_MAX_DISK_BYTES,
+)
@@ -1,12 +1,33 @@
 # Business logic for data processing and filtering
 
 import logging
-from typing import List, Dict, Any, Optional, Callable
+from array import array
+from bisect import bisect_right
+from typing import (
+    List,
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    Tuple,
+)
 from dataclasses import dataclass
 
+from models.dataset import Dataset, is_numeric_column
+from models.schema import schema_registry
+from services.cache import result_cache
+from services.ranking import Ranking, compute_ranking, format_cursor
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Fields never exposed to the templates
+SENSITIVE_FIELDS = ("Autonomy Roll",)
+
 
 @dataclass
 class FilterParams:
@@ -17,6 +38,130 @@ class FilterParams:
     sort_by: Optional[str] = None
     order: str = "desc"
 
+    @classmethod
+    def from_request_params(cls, params: Dict[str, Any]) -> "FilterParams":
+        """
+        Build filter parameters from parsed request parameters
+
+        Args:
+            params: Dictionary returned by get_request_params
+
+        Returns:
+            FilterParams instance
+        """
+        return cls(
+            search_query=params["search_query"],
+            selected_branches=params["selected_branches"],
+            sort_by=params["sort_by"],
+            order=params["order"],
+        )
+
+    def query_key(self) -> Tuple:
+        """
+        Normalize the parameters into a hashable key
+
+        Parameters that produce the same result map to the same key.
+
+        Returns:
+            Tuple of branches, search term, sort column and order
+        """
+        branches = tuple(
+            sorted(
+                {
+                    branch
+                    for branch in (self.selected_branches or [])
+                    if branch and branch.strip()
+                }
+            )
+        )
+        search = (self.search_query or "").strip().lower()
+        sort_by = self.sort_by or "Rank"
+        order = "desc" if self.order == "desc" else "asc"
+        return (branches, search, sort_by, order)
+
+
+class RecordView(Mapping):
+    """Read-only view of a student record with its rank and without sensitive fields"""
+
+    __slots__ = ("_row", "_rank")
+
+    def __init__(self, row: Mapping[str, Any], rank: int):
+        self._row = row
+        self._rank = rank
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "Rank":
+            return self._rank
+        if key in SENSITIVE_FIELDS:
+            raise KeyError(key)
+        return self._row[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._row:
+            if key not in SENSITIVE_FIELDS:
+                yield key
+        yield "Rank"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"RecordView({dict(self)!r})"
+
+
+class ResultView(Sequence):
+    """
+    Per-request view over a shared dataset
+
+    Holds only the row order for the request; records are never copied or
+    modified. They are ranked by their position, or by precomputed ranks
+    when given (0 there means unranked). Views sorted by Rank carry the
+    sort order, so keyset cursors can be resolved against them.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        indices: Sequence[int],
+        start: int = 1,
+        ranks: Optional[Sequence[int]] = None,
+        rank_order: Optional[str] = None,
+    ):
+        self.dataset = dataset
+        self.indices = indices
+        self.start = start
+        self.ranks = ranks
+        self.rank_order = rank_order
+
+    def rank_of(self, position: int, row_id: int) -> Optional[int]:
+        """Get the rank of the row at a 0-based position of this view"""
+        if self.ranks is None:
+            return self.start + position
+        return self.ranks[row_id] or None
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            offset = range(len(self.indices))[index]
+            return ResultView(
+                self.dataset,
+                self.indices[index],
+                self.start + (offset.start if len(offset) else 0),
+                self.ranks,
+                self.rank_order,
+            )
+        if index < 0:
+            index += len(self.indices)
+        row_id = self.indices[index]
+        return RecordView(self.dataset[row_id], self.rank_of(index, row_id))
+
+    def __iter__(self) -> Iterator[RecordView]:
+        dataset = self.dataset
+        for position, row_id in enumerate(self.indices):
+            yield RecordView(dataset[row_id], self.rank_of(position, row_id))
+
 
 class DataProcessor:
     """Handles data processing, filtering, and sorting operations"""
@@ -43,7 +188,7 @@ class DataProcessor:
         row: Dict[str, Any], batch: str, reverse: bool = False
     ) -> float:
         """
-        Calculate average YGPA based on batch year
+        Calculate average YGPA using the batch's rank columns
 
         Args:
             row: Student record
@@ -53,65 +198,173 @@ class DataProcessor:
         Returns:
             Average YGPA value
         """
+        schema = schema_registry.for_columns(batch, tuple(row))
         try:
-            if batch == "2023":
-                # 2023: 4 CGPAs, 2 YGPAs
-                ygpa1 = float(row.get("YGPA 1", 0))
-                ygpa2 = float(row.get("YGPA 2", 0))
-                return (ygpa1 + ygpa2) / 2
-            elif batch == "2022":
-                # 2022: 6 CGPAs, 3 YGPAs
-                ygpa1 = float(row.get("YGPA 1", 0))
-                ygpa2 = float(row.get("YGPA 2", 0))
-                ygpa3 = float(row.get("YGPA 3", 0))
-                return (ygpa1 + ygpa2 + ygpa3) / 3
-            else:
-                # Default for 2024 and other batches
-                return float(row.get("yGPA 1", 0))
-        except (ValueError, TypeError):
+            values = [float(row.get(column, 0)) for column in schema.rank_columns]
+            return sum(values) / len(values)
+        except (ValueError, TypeError, ZeroDivisionError):
             return float("-inf") if reverse else float("inf")
 
+    @staticmethod
+    def sort_keys(values: array, reverse: bool = False) -> array:
+        """
+        Replace missing values so they sort last, mirroring safe_float
+
+        Args:
+            values: Float column with NaN for missing values
+            reverse: Whether sorting is in reverse order
+
+        Returns:
+            Array of sort keys indexed by row id
+        """
+        fallback = float("-inf") if reverse else float("inf")
+        return array("d", (fallback if v != v else v for v in values))
+
+    @staticmethod
+    def row_mask(data: Dataset, indices: Sequence[int]) -> bytearray:
+        """
+        Build a membership mask over all rows of a dataset
+
+        Args:
+            data: Dataset of student records
+            indices: Row ids to mark
+
+        Returns:
+            Bytearray with 1 at every selected row id
+        """
+        mask = bytearray(len(data))
+        for i in indices:
+            mask[i] = 1
+        return mask
+
+    @classmethod
+    def average_ygpa_scores(cls, data: Dataset, batch: str) -> array:
+        """
+        Calculate average YGPA for every row of a batch in one pass
+
+        The formula comes from the batch schema and is compiled once, so no
+        per-row dispatch on the batch happens here.
+
+        Args:
+            data: Dataset of student records
+            batch: Batch year
+
+        Returns:
+            Array of average YGPA values indexed by row id, NaN if unavailable
+        """
+        return schema_registry.for_columns(batch, data.columns).rank_scores(data)
+
+    @classmethod
+    def rank_scores(cls, data: Dataset, batch: str) -> array:
+        """
+        Get the average YGPA of every row, computed once per dataset
+
+        Args:
+            data: Dataset of student records
+            batch: Batch year
+
+        Returns:
+            Array of average YGPA values indexed by row id, NaN if unavailable
+        """
+        # Keyed on the formula too, so editing schema.json takes effect live
+        rank_columns = schema_registry.for_columns(batch, data.columns).rank_columns
+        return data.derived(
+            ("rank_scores", batch, rank_columns),
+            lambda: cls.average_ygpa_scores(data, batch),
+        )
+
+    @classmethod
+    def ranking(cls, data: Dataset) -> Ranking:
+        """
+        Get the tie-aware overall and per-branch ranks of a dataset
+
+        Computed once per dataset and rank formula from the descending Rank
+        order.
+
+        Args:
+            data: Dataset of student records
+
+        Returns:
+            Ranking of every row
+        """
+
+        def build() -> Ranking:
+            branch_codes = None
+            if data.branch_index is not None:
+                branch_codes = data.column(data.branch_key).codes
+            return compute_ranking(
+                cls.rank_scores(data, data.batch),
+                cls.sort_order(data, data.batch, "Rank", True),
+                branch_codes,
+            )
+
+        rank_columns = schema_registry.get(data).rank_columns
+        return data.derived(("ranking", rank_columns), build)
+
     @classmethod
     def filter_by_search(
-        cls, data: List[Dict[str, Any]], search_query: str
-    ) -> List[Dict[str, Any]]:
+        cls, data: Dataset, indices: Sequence[int], search_query: str
+    ) -> Sequence[int]:
         """
         Filter data by search query in student names
 
         Args:
-            data: List of student records
+            data: Dataset of student records
+            indices: Row ids to filter
             search_query: Search string
 
         Returns:
-            Filtered list of student records
+            Row ids of matching student records
         """
         if not search_query or not search_query.strip():
-            return data
+            return indices
+
+        if data.name_index is None:
+            return []
 
         search_term = search_query.strip().lower()
-        filtered_data = []
+        filtered = data.name_index.search(search_term)
+        if len(indices) != len(data):
+            mask = cls.row_mask(data, indices)
+            filtered = [i for i in filtered if mask[i]]
+
+        logger.info(f"Search '{search_query}' returned {len(filtered)} results")
+        return filtered
+
+    @classmethod
+    def suggest_names(cls, data: Dataset, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Suggest student names with a word starting with the given prefix
+
+        Args:
+            data: Dataset of student records
+            prefix: Partial search input
+            limit: Maximum number of suggestions
 
-        for row in data:
-            name = row.get("Name", "").lower()
-            if search_term in name:
-                filtered_data.append(row)
+        Returns:
+            Matching names in alphabetical order of the matched word
+        """
+        if data.name_index is None or not prefix or not prefix.strip():
+            return []
 
-        logger.info(f"Search '{search_query}' returned {len(filtered_data)} results")
-        return filtered_data
+        names = data.column("Name")
+        row_ids = data.name_index.prefix(prefix.strip().lower(), limit)
+        return [names[i] for i in row_ids]
 
     @classmethod
     def filter_by_branches(
-        cls, data: List[Dict[str, Any]], selected_branches: List[str]
-    ) -> List[Dict[str, Any]]:
+        cls, data: Dataset, indices: Sequence[int], selected_branches: List[str]
+    ) -> Sequence[int]:
         """
         Filter data by selected branches/departments
 
         Args:
-            data: List of student records
+            data: Dataset of student records
+            indices: Row ids to filter
             selected_branches: List of selected branch names
 
         Returns:
-            Filtered list of student records
+            Row ids of matching student records
         """
         # Filter out empty strings and None values
         valid_branches = [
@@ -120,126 +373,445 @@ class DataProcessor:
 
         if not valid_branches:
             logger.info("No branch filter applied - showing all records")
-            return data
+            return indices
 
-        if not data:
-            return data
+        if not indices:
+            return indices
 
-        # Determine the correct key (Branch vs Department)
-        key = "Branch" if "Branch" in data[0] else "Department"
+        if data.branch_index is None:
+            return []
 
-        filtered_data = []
-        for row in data:
-            if row.get(key) in valid_branches:
-                filtered_data.append(row)
+        # Union of the precomputed per-branch row ids
+        filtered = data.branch_index.lookup(valid_branches)
+        if len(indices) != len(data):
+            mask = cls.row_mask(data, indices)
+            filtered = [i for i in filtered if mask[i]]
 
         logger.info(
-            f"Branch filter '{', '.join(valid_branches)}' returned {len(filtered_data)} results"
+            f"Branch filter '{', '.join(valid_branches)}' returned {len(filtered)} results"
         )
-        return filtered_data
+        return filtered
 
     @classmethod
     def sort_data(
         cls,
-        data: List[Dict[str, Any]],
+        data: Dataset,
+        indices: Sequence[int],
         batch: str,
         sort_by: Optional[str] = None,
         order: str = "desc",
-    ) -> List[Dict[str, Any]]:
+    ) -> Sequence[int]:
         """
         Sort data based on specified column and order
 
         Args:
-            data: List of student records
+            data: Dataset of student records
+            indices: Row ids to sort
             batch: Batch year for determining sort logic
             sort_by: Column to sort by
             order: Sort order ("asc" or "desc")
 
         Returns:
-            Sorted list of student records
+            Sorted row ids
         """
-        if not data:
-            return data
+        if not indices:
+            return indices
 
         reverse = order == "desc"
 
         # Default sorting logic based on batch
         if not sort_by or sort_by == "Rank":
             # Sort by average YGPA for ranking
-            sort_key = lambda row: cls.calculate_average_ygpa(row, batch, reverse)
-            data.sort(key=sort_key, reverse=True)  # Always descending for ranking
-        elif sort_by in data[0]:
-            # Sort by specified column
-            sort_key = lambda row: cls.safe_float(row.get(sort_by, "N/A"), reverse)
-            data.sort(key=sort_key, reverse=reverse)
+            sort_column = "Rank"
+        elif sort_by in data.columns:
+            sort_column = sort_by
         else:
             logger.warning(f"Sort column '{sort_by}' not found in data")
+            return indices
+
+        permutation = cls.sort_order(data, batch, sort_column, reverse)
+
+        # Unfiltered requests use the stored order as-is
+        if len(indices) == len(data):
+            return permutation
+
+        # Otherwise walk the stored order, keeping only the filtered rows
+        mask = cls.row_mask(data, indices)
+        return array("I", (i for i in permutation if mask[i]))
+
+    @classmethod
+    def sort_order(
+        cls, data: Dataset, batch: str, sort_column: str, reverse: bool
+    ) -> Sequence[int]:
+        """
+        Get the full sort permutation of a dataset for a column
+
+        Permutations are computed once per dataset and reused by every request,
+        or taken from the dataset when it was loaded with them (snapshots).
+        Stored Rank orders are only used if they were built from the batch's
+        current rank columns. Missing values always sort last, and ties keep
+        file order.
+
+        Args:
+            data: Dataset of student records
+            batch: Batch year for determining rank logic
+            sort_column: Column to sort by, or "Rank" for average YGPA
+            reverse: Whether sorting is in descending order
 
-        return data
+        Returns:
+            Row ids in sorted order
+        """
+
+        rank_columns = None
+        if sort_column == "Rank":
+            rank_columns = schema_registry.for_columns(batch, data.columns).rank_columns
+
+        def build() -> Sequence[int]:
+            stored = data.sort_orders.get((sort_column, reverse))
+            if stored is not None and (
+                rank_columns is None or data.rank_columns == rank_columns
+            ):
+                return stored
+            if sort_column == "Rank":
+                # Ranking is always descending
+                keys = cls.sort_keys(cls.rank_scores(data, batch), reverse)
+                descending = True
+            else:
+                try:
+                    keys = cls.sort_keys(data.floats(sort_column), reverse)
+                except KeyError:
+                    # Non-grade columns (e.g. roll numbers) are parsed on demand
+                    column = data.column(sort_column)
+                    keys = array(
+                        "d",
+                        (cls.safe_float(column[i], reverse) for i in range(len(data))),
+                    )
+                descending = reverse
+            return array(
+                "I", sorted(range(len(data)), key=keys.__getitem__, reverse=descending)
+            )
+
+        return data.derived(
+            ("sort_order", batch, sort_column, reverse, rank_columns), build
+        )
 
     @classmethod
-    def add_ranking(cls, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def prepare(cls, data: Dataset) -> None:
+        """
+        Precompute the sort orders and ranks of a dataset
+
+        Args:
+            data: Freshly loaded dataset
+        """
+        sortable = ["Rank"] + [
+            column for column in data.columns if is_numeric_column(column)
+        ]
+        for sort_column in sortable:
+            for reverse in (False, True):
+                cls.sort_order(data, data.batch, sort_column, reverse)
+        cls.ranking(data)
+
+    @staticmethod
+    def available_fields(data) -> List[str]:
+        """
+        List the fields that can be exposed for a batch
+
+        Args:
+            data: Dataset or batch info exposing columns
+
+        Returns:
+            Rank followed by every non-sensitive column
+        """
+        return ["Rank"] + [c for c in data.columns if c not in SENSITIVE_FIELDS]
+
+    @classmethod
+    def project(
+        cls, view: ResultView, fields: Sequence[str]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily turn a ranked view into plain records for the API
+
+        Grade columns are emitted as numbers, with None for unavailable
+        results.
+
+        Args:
+            view: Ranked view to serialize
+            fields: Fields to include, as returned by available_fields
+
+        Yields:
+            One dictionary per record
+        """
+        data = view.dataset
+        getters = []
+        for field in fields:
+            if field == "Rank":
+                getters.append((field, False, None))
+            elif is_numeric_column(field):
+                getters.append((field, True, data.floats(field)))
+            else:
+                getters.append((field, False, data.column(field)))
+
+        for position, row_id in enumerate(view.indices):
+            record = {}
+            for field, numeric, values in getters:
+                if values is None:
+                    record[field] = view.rank_of(position, row_id)
+                elif numeric:
+                    value = values[row_id]
+                    record[field] = None if value != value else value
+                else:
+                    record[field] = values[row_id]
+            yield record
+
+    @staticmethod
+    def project_records(
+        records: Iterable[Mapping[str, Any]], fields: Sequence[str]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Turn records fetched by a query backend into plain records for the API
+
+        Matches project: grade columns are emitted as numbers, with None for
+        unavailable results.
+
+        Args:
+            records: Records with display values and their Rank
+            fields: Fields to include, as returned by available_fields
+
+        Yields:
+            One dictionary per record
+        """
+        numeric = [field for field in fields if is_numeric_column(field)]
+        for row in records:
+            record = {field: row[field] for field in fields}
+            for field in numeric:
+                try:
+                    value = float(record[field])
+                except (ValueError, TypeError):
+                    value = None
+                record[field] = None if value != value else value
+            yield record
+
+    @staticmethod
+    def page_window(
+        total: int, page: int, per_page: int, offset: Optional[int] = None
+    ) -> Tuple[int, Dict[str, Any]]:
         """
-        Add ranking to the data based on current order
+        Work out which slice of a ranked result a page covers
+
+        Pages are plain offsets into the current result, so a reload between
+        requests can shift records across page boundaries.
+
+        Args:
+            total: Number of records in the full result
+            page: 1-based page number, used when no offset is given
+            per_page: Number of records per page
+            offset: Number of records to skip, overriding page
+
+        Returns:
+            Tuple of the offset of the first record and pagination metadata
+        """
+        pages = (total + per_page - 1) // per_page
+        if offset is not None:
+            offset = min(offset, total)
+            page = offset // per_page + 1
+        else:
+            # Out-of-range pages show the last page instead of an empty table
+            page = min(page, max(pages, 1))
+            offset = (page - 1) * per_page
+
+        end = min(offset + per_page, total)
+        pagination = {
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "pages": pages,
+            "first_rank": offset + 1 if end > offset else None,
+            "last_rank": end if end > offset else None,
+            "next_offset": end if end < total else None,
+            "next_cursor": None,
+        }
+        return offset, pagination
+
+    @staticmethod
+    def rank_sort_key(
+        view: ResultView,
+    ) -> Optional[Callable[[float, int], Tuple[float, int]]]:
+        """
+        Get the key a Rank-sorted view's row ids ascend by
+
+        Rank orders list scores from high to low with ties in file order and
+        missing scores last (first when ascending), see sort_order.
 
         Args:
-            data: List of student records
+            view: Ranked view of a result
 
         Returns:
-            Data with ranking added
+            Function of a rank score and row id, None if the view is not
+            sorted by Rank
         """
-        for i, row in enumerate(data, 1):
-            row["Rank"] = i
+        if view.rank_order is None:
+            return None
+        missing = float("-inf") if view.rank_order == "desc" else float("inf")
 
-        return data
+        def key(score: float, row_id: int) -> Tuple[float, int]:
+            return (-(missing if score != score else score), row_id)
+
+        return key
 
     @classmethod
-    def clean_sensitive_data(cls, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def seek(cls, view: ResultView, after: Tuple[float, int]) -> Optional[int]:
         """
-        Remove sensitive data from the records
+        Find where a keyset cursor continues a Rank-sorted view
+
+        Binary-searches the sorted row ids for the first record after the
+        cursor, which stays put when records before it come and go.
 
         Args:
-            data: List of student records
+            view: Ranked view of the full result
+            after: Rank score and row id of the last record already seen
 
         Returns:
-            Data with sensitive fields removed
+            Offset of the first record after the cursor, None if the view is
+            not sorted by Rank
+        """
+        key = cls.rank_sort_key(view)
+        if key is None:
+            return None
+        scores = cls.rank_scores(view.dataset, view.dataset.batch)
+        return bisect_right(
+            view.indices, key(*after), key=lambda row_id: key(scores[row_id], row_id)
+        )
+
+    @classmethod
+    def paginate(
+        cls,
+        view: ResultView,
+        page: int,
+        per_page: int,
+        offset: Optional[int] = None,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> Tuple[ResultView, Dict[str, Any]]:
         """
-        sensitive_fields = ["Autonomy Roll"]
+        Slice a ranked view down to a single page
 
-        for row in data:
-            for field in sensitive_fields:
-                if field in row:
-                    del row[field]
+        Args:
+            view: Ranked view of the full result
+            page: 1-based page number, used when no offset is given
+            per_page: Number of records per page
+            offset: Number of records to skip, overriding page
+            after: Keyset cursor of a Rank-sorted view, overriding offset
 
-        return data
+        Returns:
+            Tuple of the page view and pagination metadata
+        """
+        if after is not None and view.rank_order is not None:
+            offset = cls.seek(view, after)
+        offset, pagination = cls.page_window(len(view), page, per_page, offset)
+        end = offset + per_page
+        if view.rank_order is not None and pagination["next_offset"] is not None:
+            last = view.indices[end - 1]
+            score = cls.rank_scores(view.dataset, view.dataset.batch)[last]
+            pagination["next_cursor"] = format_cursor(score, last)
+        return view[offset:end], pagination
+
+    @classmethod
+    def query_page(
+        cls,
+        access,
+        batch: str,
+        filter_params: FilterParams,
+        page: int,
+        per_page: int,
+        offset: Optional[int] = None,
+        rank_mode: str = "position",
+        per_branch: bool = False,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Fetch a single page from a backend that filters and sorts itself
+
+        Args:
+            access: Data access object with supports_queries set
+            batch: Batch year
+            filter_params: Filter parameters
+            page: 1-based page number, used when no offset is given
+            per_page: Number of records per page
+            offset: Number of records to skip, overriding page
+            rank_mode: How records are ranked, one of RANK_MODES
+            per_branch: Rank within each branch instead of the whole batch
+            after: Keyset cursor of a Rank-sorted result, overriding offset
+
+        Returns:
+            Tuple of the ranked records on the page and pagination metadata
+        """
+        by_rank = filter_params.query_key()[2] == "Rank"
+        if not by_rank:
+            after = None
+
+        total = access.count(batch, filter_params)
+        if after is not None:
+            # Only positions need the records before the cursor counted
+            offset = total - access.count(batch, filter_params, after)
+        offset, pagination = cls.page_window(total, page, per_page, offset)
+        rows = access.query(
+            batch, filter_params, offset, per_page, rank_mode, per_branch, after
+        )
+        if by_rank and rows and pagination["next_offset"] is not None:
+            keys = access.rank_keys(batch, filter_params, offset, per_page, after)
+            pagination["next_cursor"] = format_cursor(*keys[-1])
+        return rows, pagination
 
     @classmethod
     def process_data(
-        cls, data: List[Dict[str, Any]], batch: str, filter_params: FilterParams
-    ) -> List[Dict[str, Any]]:
+        cls,
+        data: Dataset,
+        batch: str,
+        filter_params: FilterParams,
+        rank_mode: str = "position",
+        per_branch: bool = False,
+    ) -> ResultView:
         """
         Apply all processing steps to the data
 
         Args:
-            data: Raw student data
+            data: Shared dataset for the batch
             batch: Batch year
             filter_params: Filter parameters
+            rank_mode: How records are ranked, one of RANK_MODES
+            per_branch: Rank within each branch instead of the whole batch
 
         Returns:
-            Processed and filtered data
+            Ranked view of the filtered and sorted records
         """
+        ranks = cls.ranking(data).ranks(rank_mode, per_branch)
+
+        # Views sorted by Rank can resolve keyset cursors
+        _, _, sort_by, order = filter_params.query_key()
+        rank_order = order if sort_by == "Rank" else None
+
+        # Rank orders depend on the schema, which can change without a reload
+        query_key = (filter_params.query_key(), schema_registry.get(data).rank_columns)
+        indices = result_cache.get(data, query_key)
+        if indices is not None:
+            return ResultView(data, indices, ranks=ranks, rank_order=rank_order)
+
+        indices = range(len(data))
+
         # Apply filters
         if filter_params.selected_branches:
-            data = cls.filter_by_branches(data, filter_params.selected_branches)
+            indices = cls.filter_by_branches(
+                data, indices, filter_params.selected_branches
+            )
 
         if filter_params.search_query:
-            data = cls.filter_by_search(data, filter_params.search_query)
+            indices = cls.filter_by_search(data, indices, filter_params.search_query)
 
         # Sort data
-        data = cls.sort_data(data, batch, filter_params.sort_by, filter_params.order)
+        indices = cls.sort_data(
+            data, indices, batch, filter_params.sort_by, filter_params.order
+        )
 
-        # Add ranking and clean sensitive data
-        data = cls.add_ranking(data)
-        data = cls.clean_sensitive_data(data)
+        indices = result_cache.put(data, query_key, indices)
 
-        return data
+        # Ranking and sensitive field removal happen lazily in the view
+        return ResultView(data, indices, ranks=ranks, rank_order=rank_order)
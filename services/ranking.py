@@ -0,0 +1,138 @@
+# Batch-level ranking by average YGPA with tie handling
+
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# "position" numbers rows by where they appear in the current result; the
+# other modes rank by score across the whole batch (or branch)
+RANK_MODES = ("position", "ordinal", "competition", "dense")
+RANK_SCOPES = ("overall", "branch")
+
+
+@dataclass
+class Ranking:
+    """
+    Precomputed ranks of every row of a batch
+
+    Arrays are indexed by row id and hold 0 for rows without a score.
+    """
+
+    overall: Dict[str, array]
+    by_branch: Dict[str, array]
+
+    def ranks(self, mode: str, per_branch: bool = False) -> Optional[array]:
+        """
+        Get the ranks for a mode
+
+        Args:
+            mode: One of RANK_MODES
+            per_branch: Rank within each branch instead of the whole batch
+
+        Returns:
+            Ranks indexed by row id, or None for "position"
+        """
+        if mode == "position":
+            return None
+        return (self.by_branch if per_branch else self.overall)[mode]
+
+
+def compute_ranking(
+    scores: Sequence[float],
+    order: Sequence[int],
+    branch_codes: Optional[Sequence[int]] = None,
+) -> Ranking:
+    """
+    Rank every row in one pass over the descending score order
+
+    Ordinal ranks break ties by file order (the order the permutation already
+    has), competition ranks give ties the same rank and skip the following
+    ones (1, 2, 2, 4), dense ranks do not skip (1, 2, 2, 3).
+
+    Args:
+        scores: Score of every row, NaN if missing
+        order: Row ids sorted by descending score, missing scores last
+        branch_codes: Branch code of every row, for per-branch ranks
+
+    Returns:
+        Ranking with overall and per-branch ranks for every mode
+    """
+    size = len(scores)
+    overall = {mode: array("I", bytes(4 * size)) for mode in RANK_MODES[1:]}
+    by_branch = {mode: array("I", bytes(4 * size)) for mode in RANK_MODES[1:]}
+    ordinal, competition, dense = (overall[m] for m in RANK_MODES[1:])
+    branch_ordinal, branch_competition, branch_dense = (
+        by_branch[m] for m in RANK_MODES[1:]
+    )
+
+    # Per-branch running state: rows seen, last score, last competition/dense rank
+    seen: Dict[int, list] = {}
+
+    previous = None
+    position = dense_rank = competition_rank = 0
+    for row_id in order:
+        score = scores[row_id]
+        if score != score:
+            # Missing scores sort last, so nothing after this is ranked
+            break
+        position += 1
+        if score != previous:
+            competition_rank = position
+            dense_rank += 1
+            previous = score
+        ordinal[row_id] = position
+        competition[row_id] = competition_rank
+        dense[row_id] = dense_rank
+
+        code = branch_codes[row_id] if branch_codes is not None else 0
+        state = seen.get(code)
+        if state is None:
+            state = seen[code] = [0, None, 0, 0]
+        state[0] += 1
+        if score != state[1]:
+            state[1] = score
+            state[2] = state[0]
+            state[3] += 1
+        branch_ordinal[row_id] = state[0]
+        branch_competition[row_id] = state[2]
+        branch_dense[row_id] = state[3]
+
+    logger.debug(f"Ranked {position} of {size} rows")
+    return Ranking(overall=overall, by_branch=by_branch)
+
+
+def format_cursor(score: float, row_id: int) -> str:
+    """
+    Encode the Rank sort key of a record as an ``after`` cursor
+
+    Args:
+        score: Rank score of the record, NaN if it has none
+        row_id: Row id of the record
+
+    Returns:
+        Cursor that continues a Rank-sorted result after the record
+    """
+    return f"{score!r},{row_id}"
+
+
+def parse_cursor(value: Optional[str]) -> Optional[Tuple[float, int]]:
+    """
+    Decode an ``after`` cursor made by format_cursor
+
+    Args:
+        value: Cursor from the request, if any
+
+    Returns:
+        Tuple of rank score and row id, None if missing or malformed
+    """
+    if not value:
+        return None
+    score, _, row_id = value.partition(",")
+    try:
+        return float(score), int(row_id)
+    except ValueError:
+        return None
@@ -1,49 +0,0 @@
-import csv
-import re
-
-INPUT_FILE = "grades_2022.csv"
-OUTPUT_FILE = "grades_2022_cleaned.csv"
-
-# Regex to extract branch from the last column value
-BRANCH_REGEX = re.compile(r"First Year [^ ]+ in (.+?) \([A-Z]+\)")
-
-
-def extract_branch(full_string):
-    match = BRANCH_REGEX.search(full_string)
-    if match:
-        return match.group(1).strip()
-    # fallback: try to extract before 'Second Semester' if regex fails
-    if " in " in full_string:
-        s = full_string.split(" in ", 1)[1]
-        return s.split(" Second Semester")[0].strip()
-    return full_string
-
-
-def is_all_na(row):
-    # Only check CGPA/YGPA columns (skip first two and last)
-    return all(cell.strip() == "N/A" for cell in row[2:-1])
-
-
-def main():
-    with open(INPUT_FILE, newline="", encoding="utf-8") as infile:
-        reader = list(csv.reader(infile))
-        if not reader:
-            print("Input file is empty.")
-            return
-        header = reader[0]
-        # Remove Autonomy Roll, fix Department/Branch, keep all CGPA/YGPA columns
-        new_header = ["Name"] + header[2:-1] + ["Branch"]
-        cleaned_rows = [new_header]
-        for row in reader[1:]:
-            if not is_all_na(row):
-                new_row = [row[1]] + row[2:-1] + [extract_branch(row[-1])]
-                cleaned_rows.append(new_row)
-    # Write cleaned data
-    with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as outfile:
-        writer = csv.writer(outfile)
-        writer.writerows(cleaned_rows)
-    print(f"Cleaned data written to {OUTPUT_FILE}")
-
-
-if __name__ == "__main__":
-    main()
@@ -1,5 +1,6 @@
 import json
 import csv
+import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
@@ -13,14 +14,28 @@ def get_grades():
     with open("autonomy_rolls.json", "r") as f:
         autonomy_rolls = json.load(f)
 
-    f = open("grades.csv", "w")
+    # Resume after a crash: keep the rows already written and skip those rolls
+    done = set()
+    if os.path.exists("grades.csv"):
+        with open("grades.csv", newline="") as f:
+            done = {row[0] for row in csv.reader(f) if row}
+
+    f = open("grades.csv", "a", newline="")
     writer = csv.writer(f)
-    writer.writerow(
-        ["College Roll", "Autonomy Roll", "Name", "GPA Sem 1", "GPA Sem 2", "Branch"]
-    )
+    if not done:
+        writer.writerow(
+            [
+                "College Roll",
+                "Autonomy Roll",
+                "Name",
+                "GPA Sem 1",
+                "GPA Sem 2",
+                "Branch",
+            ]
+        )
 
     for roll_no, autonomy_roll in autonomy_rolls.items():
-        if int(roll_no) <= 2457019:
+        if roll_no in done:
             continue
         driver.find_element(By.NAME, "roll").send_keys(autonomy_roll)
         select = Select(driver.find_element(By.NAME, "sem"))
@@ -40,6 +55,7 @@ def get_grades():
             gpa_1 = gpa_2 = "N/A"
 
         writer.writerow([roll_no, autonomy_roll, name, gpa_1, gpa_2, branch])
+        f.flush()
         driver.back()
         driver.find_element(By.NAME, "reset1").click()
 
@@ -0,0 +1,202 @@
+"""
+Scrape a batch's grades from the results form over HTTP or in browsers
+
+    python -m src.scraper 2023 --concurrency 16 --rate 20
+    python -m src.scraper 2024 --students autonomy_rolls.json
+    python -m src.scraper 2024 --resolve     # look rolls up while scraping
+    python -m src.scraper 2023 --browsers 4  # headless Firefox, if HTTP is blocked
+
+Every answer is journaled as it arrives, so re-running the same command
+after a crash resumes where it stopped. --incremental re-queries only the
+semesters that had no result last time.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from dataclasses import replace
+
+from src.scraper.autonomy import (
+    AUTONOMY_URL,
+    COLLEGE_ROLLS,
+    AutonomyResolver,
+    write_autonomy_rolls,
+)
+from src.scraper.batches import (
+    BATCHES,
+    BatchSpec,
+    load_students,
+    scrape_batch,
+    write_batch,
+)
+from src.scraper.browser import BrowserPool
+from src.scraper.engine import RESULTS_URL, ResultsScraper
+from src.scraper.journal import JOURNAL_PATH, Checkpoint, Journal
+from src.scraper.session import ScraperError
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("batch", choices=sorted(BATCHES), help="batch to scrape")
+    parser.add_argument(
+        "--url", default=RESULTS_URL, help=f"results form (default: {RESULTS_URL})"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="requests in flight at once (default: 8)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=10.0,
+        help="maximum requests per second, 0 for no limit (default: 10)",
+    )
+    parser.add_argument(
+        "--browsers",
+        type=int,
+        metavar="N",
+        help="query through N headless browser processes instead of HTTP",
+    )
+    parser.add_argument(
+        "--max-gap",
+        type=int,
+        metavar="N",
+        default=BatchSpec.max_gap,
+        help="consecutive missing rolls that end a branch, for batches with a "
+        f"roll prefix (default: {BatchSpec.max_gap})",
+    )
+    parser.add_argument(
+        "--students",
+        default="autonomy_rolls.json",
+        help="college roll → autonomy roll JSON for batches without a roll prefix",
+    )
+    parser.add_argument(
+        "--resolve",
+        action="store_true",
+        help="resolve autonomy rolls while scraping instead of reading --students",
+    )
+    parser.add_argument(
+        "--autonomy-url",
+        default=AUTONOMY_URL,
+        help=f"autonomy roll lookup form for --resolve (default: {AUTONOMY_URL})",
+    )
+    parser.add_argument("--output", help="grades CSV (default: data/<batch>/...)")
+    parser.add_argument(
+        "--missing", help="missing rolls file (default: data/<batch>/...)"
+    )
+    parser.add_argument(
+        "--journal",
+        default=JOURNAL_PATH,
+        help=f"checkpoint journal (default: {JOURNAL_PATH})",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="re-query semesters that had no result in the journal",
+    )
+    mode.add_argument(
+        "--fresh", action="store_true", help="discard the batch's journal first"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    spec = BATCHES[args.batch]
+    if args.max_gap < 1:
+        print("❌ --max-gap must be at least 1")
+        sys.exit(1)
+    spec = replace(spec, max_gap=args.max_gap)
+    if args.resolve and args.batch not in COLLEGE_ROLLS:
+        print(f"❌ Batch {args.batch} has no college rolls to resolve")
+        sys.exit(1)
+    students = None
+    if spec.roll_prefix is None and not args.resolve:
+        try:
+            students = load_students(args.students)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read {args.students}: {e}")
+            sys.exit(1)
+
+    journal = Journal(args.journal)
+    if args.fresh:
+        journal.forget(spec.batch)
+    checkpoint = Checkpoint(journal, spec.batch, incremental=args.incremental)
+
+    resolver = None
+    if args.resolve:
+        # Lookups stream straight into the grades scrape
+        resolver = AutonomyResolver(
+            args.autonomy_url,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            journal=journal,
+        )
+        students = resolver.resolve(COLLEGE_ROLLS[args.batch])
+
+    if args.browsers:
+        scraper = BrowserPool(args.url, workers=args.browsers, rate=args.rate)
+    else:
+        scraper = ResultsScraper(
+            args.url, concurrency=args.concurrency, rate=args.rate
+        )
+    started = time.perf_counter()
+    try:
+        result = scrape_batch(spec, scraper, students, checkpoint)
+    except ScraperError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted, re-run to resume from {args.journal}")
+        sys.exit(130)
+    finally:
+        scraper.close()
+        if resolver is not None:
+            resolver.close()
+        journal.close()
+    elapsed = time.perf_counter() - started
+
+    write_batch(spec, result, args.output, args.missing)
+    if resolver is not None:
+        write_autonomy_rolls(
+            resolver.found,
+            resolver.missing,
+            args.students,
+            os.path.join(os.path.dirname(args.students), "missing_rolls.txt"),
+        )
+        print(f"🔑 Wrote {len(resolver.found)} autonomy rolls to {args.students}")
+    requests = scraper.requests
+    if args.browsers:
+        transport = f"{args.browsers} browsers ({scraper.restarts} restarts)"
+    else:
+        transport = f"{scraper.session.connections} connections"
+    print(f"\n✅ {len(result.records)} students, {len(result.missing)} missing rolls")
+    print(
+        f"📊 {requests} requests over {transport} "
+        f"in {elapsed:.1f}s ({requests / elapsed if elapsed else 0:.1f}/s)"
+    )
+    print(
+        f"📒 {checkpoint.reused} answers reused from the journal, "
+        f"{checkpoint.fetched} fetched"
+    )
+    if scraper.failed:
+        print(
+            f"⚠️  {len(scraper.failed)} queries failed after retries, "
+            f"re-run to retry them"
+        )
+
+
+if __name__ == "__main__":
+    main()
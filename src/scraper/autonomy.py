@@ -0,0 +1,337 @@
+"""
+Resolve college rolls to autonomy rolls over HTTP
+
+    python -m src.scraper.autonomy 2024 --concurrency 8 --rate 5
+
+Lookups are cached in the scrape journal as they complete, so an
+interrupted run loses nothing and a re-run only asks for what is left.
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from src.scraper.discovery import find_ranges
+from src.scraper.engine import ResultsScraper
+from src.scraper.journal import (
+    FAILED,
+    FOUND,
+    JOURNAL_PATH,
+    MISSING,
+    Journal,
+    Outcome,
+)
+from src.scraper.session import ScraperError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+AUTONOMY_URL = "https://theheritage.ac.in/knowyourautonomyrollno.aspx"
+
+# Form fields of the lookup page
+COLLEGE_ROLL_FIELD = "txtCollegeRollNo"
+YEAR_FIELD = "DrYear"
+SUBMIT_BUTTON = "btnCollegeRollNo"
+RESULT_LABEL = "lblAutonomyExamRollNo"
+
+# A roll the page knows but whose answer is not a usable autonomy roll
+INVALID = "invalid"
+AUTONOMY_ROLL_LENGTH = 11
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class CollegeRolls:
+    """College rolls of a batch: <prefix><branch><number:03>"""
+
+    prefix: str
+    # DrYear option the batch's rolls are looked up under
+    year: str
+    branches: range
+    numbers: range
+    # More consecutive unknown rolls than this means the branch has ended
+    max_gap: int = 10
+
+    def roll(self, branch: int, number: int) -> str:
+        """College roll of a branch code and roll number"""
+        return f"{self.prefix}{branch}{number:03}"
+
+
+COLLEGE_ROLLS: Dict[str, CollegeRolls] = {
+    "2024": CollegeRolls("24", "1", range(51, 64), range(1, 210)),
+}
+
+
+class AutonomyResolver:
+    """
+    Looks up autonomy rolls concurrently, behind a persistent cache
+
+    Lookups run on a bounded worker pool sharing one rate limit. Every
+    answer is written to the journal as soon as it arrives, and cached
+    answers are never asked again (failed lookups are).
+    """
+
+    def __init__(
+        self,
+        url: str = AUTONOMY_URL,
+        concurrency: int = 8,
+        rate: float = 5.0,
+        journal: Optional[Journal] = None,
+    ):
+        """
+        Initialize the resolver
+
+        Args:
+            url: Lookup form URL
+            concurrency: Maximum number of lookups in flight
+            rate: Maximum requests per second, 0 for no limit (each lookup
+                takes two)
+            journal: Cache to read and append to
+        """
+        self.engine = ResultsScraper(url, concurrency=concurrency, rate=rate)
+        self.journal = journal
+        self._cache = journal.autonomy_rolls() if journal else {}
+        # Rolls already answered during this run
+        self._answered: Set[str] = set()
+        self.found: Dict[str, str] = {}
+        self.missing: Set[str] = set()
+        self.cached = 0
+        self.fetched = 0
+
+    def lookup(self, college_roll: str, year: str) -> Outcome:
+        """
+        Ask the form for one autonomy roll
+
+        The page wants the roll submitted, then the year picked on the page
+        that comes back and the same button pressed again.
+
+        Args:
+            college_roll: College roll
+            year: DrYear option
+
+        Returns:
+            FOUND with the autonomy roll, INVALID, MISSING, or FAILED
+        """
+        session = self.engine.session
+        try:
+            self.engine.limiter.acquire()
+            page = session.submit({COLLEGE_ROLL_FIELD: college_roll}, SUBMIT_BUTTON)
+            self.engine.limiter.acquire()
+            page = session.submit(
+                {COLLEGE_ROLL_FIELD: college_roll, YEAR_FIELD: year},
+                SUBMIT_BUTTON,
+                page=page,
+            )
+        except ScraperError as e:
+            logger.warning(f"Giving up on college roll {college_roll}: {e}")
+            return Outcome(FAILED)
+
+        autonomy_roll = page.text(RESULT_LABEL)
+        if autonomy_roll is None:
+            return Outcome(MISSING)
+        if len(autonomy_roll) != AUTONOMY_ROLL_LENGTH:
+            return Outcome(INVALID)
+        return Outcome(FOUND, autonomy_roll)
+
+    def _publish(self, college_roll: str, outcome: Outcome, found: "queue.Queue"):
+        """Hand a new hit to the consumer straight away"""
+        if outcome.status != FOUND:
+            self.missing.add(college_roll)
+        elif college_roll not in self.found:
+            self.found[college_roll] = outcome.result
+            found.put((college_roll, outcome.result))
+
+    def _answer(
+        self, college_rolls: List[str], year: str, found: "queue.Queue"
+    ) -> Dict[str, Outcome]:
+        """Answer lookups from the cache or the form, publishing hits"""
+        answers = {}
+        todo = []
+        for college_roll in college_rolls:
+            outcome = self._cache.get(college_roll)
+            if college_roll in self._answered:
+                answers[college_roll] = outcome
+            elif outcome is not None and outcome.status != FAILED:
+                self.cached += 1
+                self._answered.add(college_roll)
+                answers[college_roll] = outcome
+                self._publish(college_roll, outcome, found)
+            else:
+                todo.append(college_roll)
+
+        fetched = self.engine.map(lambda roll: self.lookup(roll, year), todo)
+        for college_roll, outcome in fetched:
+            if self.journal is not None:
+                self.journal.record_autonomy_roll(college_roll, outcome)
+            self._cache[college_roll] = outcome
+            self._answered.add(college_roll)
+            self.fetched += 1
+            answers[college_roll] = outcome
+            self._publish(college_roll, outcome, found)
+        return answers
+
+    def _run(self, rolls: CollegeRolls, found: "queue.Queue"):
+        """Find every branch's range, then resolve what is inside it"""
+
+        def probe(pairs):
+            answers = self._answer(
+                [rolls.roll(branch, number) for branch, number in pairs],
+                rolls.year,
+                found,
+            )
+            # Rolls the page knows count as taken even without a usable answer,
+            # and lookups that failed may be, so neither ends a branch
+            return {
+                (branch, number): answers[rolls.roll(branch, number)].status
+                in (FOUND, INVALID, FAILED)
+                for branch, number in pairs
+            }
+
+        try:
+            numbers = rolls.numbers
+            ends = find_ranges(
+                rolls.branches,
+                numbers.start,
+                numbers.stop - 1,
+                rolls.max_gap + 1,
+                probe,
+            )
+            probe(
+                [
+                    (branch, number)
+                    for branch, end in ends.items()
+                    for number in range(numbers.start, end + 1)
+                ]
+            )
+        except BaseException as e:
+            found.put(e)
+        finally:
+            found.put(_DONE)
+
+    def resolve(self, rolls: CollegeRolls) -> Iterator[Tuple[str, str]]:
+        """
+        Resolve a batch's college rolls, yielding each as soon as it is known
+
+        Resolution runs on a background thread, so whatever consumes this
+        (e.g. the grades scrape) works while lookups are still going.
+
+        Args:
+            rolls: The batch's college rolls
+
+        Returns:
+            Iterator of (college roll, autonomy roll)
+        """
+        found: "queue.Queue" = queue.Queue()
+        worker = threading.Thread(
+            target=self._run, args=(rolls, found), name="autonomy", daemon=True
+        )
+        worker.start()
+        while True:
+            item = found.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+        worker.join()
+
+    def close(self):
+        """Stop the workers and close the connections"""
+        self.engine.close()
+
+
+def write_autonomy_rolls(
+    found: Dict[str, str],
+    missing: Set[str],
+    output: str = "autonomy_rolls.json",
+    missing_output: str = "missing_rolls.txt",
+):
+    """
+    Write the mapping and missing rolls the way get_autonomy.py did
+
+    Args:
+        found: College roll → autonomy roll
+        missing: College rolls without a usable autonomy roll
+        output: JSON mapping path
+        missing_output: Missing rolls path
+    """
+    for path in (output, missing_output):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{output}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(found.items())), f, indent=4)
+    os.replace(temp_path, output)
+    with open(missing_output, "w", encoding="utf-8") as f:
+        for roll in sorted(missing):
+            f.write(roll + "\n")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("batch", choices=sorted(COLLEGE_ROLLS), help="batch")
+    parser.add_argument(
+        "--url", default=AUTONOMY_URL, help=f"lookup form (default: {AUTONOMY_URL})"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="lookups in flight (default: 8)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="maximum requests per second, 0 for no limit (default: 5)",
+    )
+    parser.add_argument(
+        "--journal",
+        default=JOURNAL_PATH,
+        help=f"lookup cache (default: {JOURNAL_PATH})",
+    )
+    parser.add_argument(
+        "--output", default="autonomy_rolls.json", help="mapping JSON to write"
+    )
+    parser.add_argument(
+        "--missing", default="missing_rolls.txt", help="missing rolls file to write"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    journal = Journal(args.journal)
+    resolver = AutonomyResolver(
+        args.url, concurrency=args.concurrency, rate=args.rate, journal=journal
+    )
+    started = time.perf_counter()
+    try:
+        for _ in resolver.resolve(COLLEGE_ROLLS[args.batch]):
+            pass
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted, re-run to resume from {args.journal}")
+        sys.exit(130)
+    finally:
+        resolver.close()
+        journal.close()
+
+    write_autonomy_rolls(resolver.found, resolver.missing, args.output, args.missing)
+    print(
+        f"\n✅ {len(resolver.found)} autonomy rolls, {len(resolver.missing)} missing "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    print(f"📒 {resolver.cached} lookups cached, {resolver.fetched} fetched")
+
+
+if __name__ == "__main__":
+    main()
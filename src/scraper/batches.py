@@ -0,0 +1,419 @@
+# Per-batch scrape definitions and the batch scrape itself
+
+import csv
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from src.scraper.discovery import find_ranges
+from src.scraper.engine import Query, ResultsScraper
+from src.scraper.forms import MISSING_VALUE, SemesterResult
+from src.scraper.journal import Checkpoint
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Students of a roll list used to probe which semesters are published
+SAMPLE_STUDENTS = 20
+
+
+@dataclass(frozen=True)
+class Semester:
+    """A semester option of the results form and the columns it fills"""
+
+    value: str
+    columns: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class BatchSpec:
+    """
+    How to scrape one batch
+
+    Batches with a roll prefix are enumerated as <prefix><branch:02><roll:03>;
+    batches without one are scraped from a college roll → autonomy roll list.
+    """
+
+    batch: str
+    semesters: Tuple[Semester, ...]
+    roll_prefix: Optional[str] = None
+    id_columns: Tuple[str, ...] = ("Autonomy Roll",)
+    branch_column: str = "Department"
+    branches: range = range(1, 21)
+    roll_numbers: range = range(1, 201)
+    # More consecutive missing rolls than this means the branch has ended
+    max_gap: int = 10
+
+    @property
+    def header(self) -> List[str]:
+        """CSV header, in the order the Selenium scripts wrote it"""
+        columns = [c for semester in self.semesters for c in semester.columns]
+        return [*self.id_columns, "Name", *columns, self.branch_column]
+
+    def roll(self, branch: int, number: int) -> str:
+        """Autonomy roll of a branch code and roll number"""
+        return f"{self.roll_prefix}{branch:02}{number:03}"
+
+    @property
+    def output(self) -> str:
+        """Default grades CSV path"""
+        return os.path.join("data", self.batch, f"grades_{self.batch}.csv")
+
+    @property
+    def missing_output(self) -> str:
+        """Default path for the list of rolls without results"""
+        return os.path.join("data", self.batch, f"missing_rolls_{self.batch}.txt")
+
+
+def _year_semesters(years: int) -> Tuple[Semester, ...]:
+    """Even semesters 2, 4, ... each showing two CGPAs and the year's YGPA"""
+    return tuple(
+        Semester(
+            str(2 * year),
+            (f"CGPA {2 * year - 1}", f"CGPA {2 * year}", f"YGPA {year}"),
+        )
+        for year in range(1, years + 1)
+    )
+
+
+BATCHES: Dict[str, BatchSpec] = {
+    "2021": BatchSpec("2021", _year_semesters(4), roll_prefix="126210"),
+    "2022": BatchSpec("2022", _year_semesters(3), roll_prefix="126220"),
+    "2023": BatchSpec("2023", _year_semesters(2), roll_prefix="126230"),
+    "2024": BatchSpec(
+        "2024",
+        (Semester("2", ("GPA Sem 1", "GPA Sem 2")),),
+        id_columns=("College Roll", "Autonomy Roll"),
+        branch_column="Branch",
+    ),
+}
+
+
+@dataclass
+class StudentRecord:
+    """One output row being assembled from several semester pages"""
+
+    ids: Tuple[str, ...]
+    roll: str
+    name: str = MISSING_VALUE
+    branch: str = MISSING_VALUE
+    values: Dict[str, str] = field(default_factory=dict)
+
+    def add(self, semester: Semester, result: Optional[SemesterResult]):
+        """Fill in a semester's columns from its result page"""
+        if result is None:
+            return
+        if self.name == MISSING_VALUE:
+            self.name, self.branch = result.name, result.branch
+        self.values.update(zip(semester.columns, result.values))
+
+    def row(self, spec: BatchSpec) -> List[str]:
+        """The CSV row"""
+        columns = [c for semester in spec.semesters for c in semester.columns]
+        return [
+            *self.ids,
+            self.name,
+            *(self.values.get(column, MISSING_VALUE) for column in columns),
+            self.branch,
+        ]
+
+
+@dataclass
+class BatchResult:
+    """Rows and missing rolls of a scraped batch"""
+
+    records: List[StudentRecord]
+    missing: List[str]
+
+
+def _try_fetch_all(
+    scraper: ResultsScraper,
+    checkpoint: Optional[Checkpoint],
+    queries: Iterable[Query],
+    known_students: bool = True,
+) -> Iterator[Tuple[Query, Optional[SemesterResult], bool]]:
+    """Like _fetch_all, also saying whether the form answered each query"""
+    if checkpoint is None:
+        return scraper.try_fetch_all(queries)
+    return checkpoint.try_fetch_all(scraper, queries, known_students)
+
+
+def _fetch_all(
+    scraper: ResultsScraper,
+    checkpoint: Optional[Checkpoint],
+    queries: Iterable[Query],
+    known_students: bool = True,
+) -> Iterator[Tuple[Query, Optional[SemesterResult]]]:
+    """Run queries directly, or through the checkpoint journal if there is one"""
+    if checkpoint is None:
+        return scraper.fetch_all(queries)
+    return checkpoint.fetch_all(scraper, queries, known_students)
+
+
+def discover_rolls(
+    spec: BatchSpec,
+    scraper: ResultsScraper,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Tuple[List[StudentRecord], List[str]]:
+    """
+    Find every roll with a first-semester result
+
+    Each branch's populated range is found by galloping/binary search
+    (see discovery.find_ranges), all branches concurrently, and only the
+    rolls inside it are then queried. Empty branch codes cost
+    ``max_gap + 1`` probes and populated ones a handful past their last roll.
+    Probes the form never answered count as results while searching, so
+    an outage cannot end a branch early; they are asked again afterwards
+    and listed as missing if they still fail.
+
+    Args:
+        spec: Batch definition with a roll prefix
+        scraper: Scraper to query with
+        checkpoint: Journal to resume from and record to
+
+    Returns:
+        (records with the first semester filled in, rolls without results)
+    """
+    first = spec.semesters[0]
+    labels = len(first.columns)
+    outcomes: Dict[Tuple[int, int], Optional[SemesterResult]] = {}
+    failed: Set[Tuple[int, int]] = set()
+
+    def probe(pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], bool]:
+        positions = {
+            spec.roll(branch, number): (branch, number)
+            for branch, number in pairs
+            if (branch, number) not in outcomes
+        }
+        queries = [Query(roll, first.value, labels) for roll in positions]
+        for query, result, answered in _try_fetch_all(
+            scraper, checkpoint, queries, known_students=False
+        ):
+            pair = positions[query.roll]
+            if answered:
+                outcomes[pair] = result
+                failed.discard(pair)
+            else:
+                failed.add(pair)
+        return {
+            pair: outcomes.get(pair) is not None or pair in failed for pair in pairs
+        }
+
+    numbers = spec.roll_numbers
+    ends = find_ranges(
+        spec.branches, numbers.start, numbers.stop - 1, spec.max_gap + 1, probe
+    )
+
+    # Everything inside the ranges still unprobed, in one concurrent pass
+    probe(
+        [
+            (branch, number)
+            for branch, end in ends.items()
+            for number in range(numbers.start, end + 1)
+        ]
+    )
+
+    # Rolls that never answered are listed as missing, so a re-run retries them
+    for pair in failed:
+        outcomes.setdefault(pair, None)
+
+    records, missing = [], []
+    for (branch, number), result in sorted(outcomes.items()):
+        roll = spec.roll(branch, number)
+        if result is None:
+            missing.append(roll)
+            continue
+        record = StudentRecord(ids=(roll,), roll=roll)
+        record.add(first, result)
+        records.append(record)
+    logger.info(
+        f"Discovered {len(records)} rolls with {len(outcomes)} first-semester probes"
+    )
+    return records, missing
+
+
+def _samples(spec: BatchSpec, records: List[StudentRecord]) -> List[StudentRecord]:
+    """
+    Students to probe publication on
+
+    Discovered rolls all have a result, so the first of every branch code
+    is enough. Listed students may not, and the first arrivals often share
+    a branch, so every one of them is asked.
+    """
+    if spec.roll_prefix is None:
+        return list(records)
+    samples, seen = [], set()
+    for record in records:
+        group = record.roll[:-3]
+        if group not in seen:
+            seen.add(group)
+            samples.append(record)
+    return samples
+
+
+def published_semesters(
+    spec: BatchSpec,
+    scraper: ResultsScraper,
+    records: List[StudentRecord],
+    semesters: Sequence[Semester],
+    checkpoint: Optional[Checkpoint] = None,
+) -> List[Semester]:
+    """
+    Probe which semesters have results out, once per batch
+
+    Asks for every semester of a sample of students (see _samples); a
+    semester is published if any of them has a result. If none of them has
+    any result, the sample says nothing and every semester is kept. The
+    sample results are kept.
+
+    Args:
+        spec: Batch definition
+        scraper: Scraper to query with
+        records: Known students, filled in with the sample results
+        semesters: Semesters to check
+        checkpoint: Journal to resume from and record to
+
+    Returns:
+        The semesters with results, in order
+    """
+    samples = _samples(spec, records)
+    by_value = {semester.value: semester for semester in semesters}
+    by_roll = {record.roll: record for record in samples}
+    queries = [
+        Query(record.roll, semester.value, len(semester.columns))
+        for semester in semesters
+        for record in samples
+    ]
+    live = set()
+    for query, result in _fetch_all(scraper, checkpoint, queries):
+        by_roll[query.roll].add(by_value[query.semester], result)
+        if result is not None:
+            live.add(query.semester)
+
+    if samples and not any(record.name != MISSING_VALUE for record in samples):
+        logger.warning(
+            f"Batch {spec.batch}: no sampled student has results, "
+            f"querying every semester"
+        )
+        return list(semesters)
+
+    published = [semester for semester in semesters if semester.value in live]
+    skipped = [semester.value for semester in semesters if semester.value not in live]
+    if skipped:
+        logger.info(f"Batch {spec.batch}: semesters {skipped} not published, skipping")
+    return published
+
+
+def scrape_batch(
+    spec: BatchSpec,
+    scraper: ResultsScraper,
+    students: Optional[Iterable[Tuple[str, str]]] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> BatchResult:
+    """
+    Scrape every student and semester of a batch
+
+    Rolls are discovered first, then the published semesters probed, and
+    only the live (roll, semester) pairs left are queried. Students given
+    as a stream (e.g. from AutonomyResolver.resolve) are queried as they
+    arrive; publication is probed on the first SAMPLE_STUDENTS of them.
+
+    Args:
+        spec: Batch definition
+        scraper: Scraper to query with
+        students: (college roll, autonomy roll) pairs, for batches without
+            a roll prefix; may be a lazy iterator
+        checkpoint: Journal to resume from and record to
+
+    Returns:
+        Records in roll order and the rolls without results
+    """
+    if spec.roll_prefix is not None:
+        records, missing = discover_rolls(spec, scraper, checkpoint)
+        remaining = spec.semesters[1:]
+    else:
+        if students is None:
+            raise ValueError(f"Batch {spec.batch} needs a list of students")
+        stream = (
+            StudentRecord(ids=(college, autonomy), roll=autonomy)
+            for college, autonomy in students
+        )
+        records = list(islice(stream, SAMPLE_STUDENTS))
+        missing = []
+        remaining = spec.semesters
+
+    remaining = published_semesters(spec, scraper, records, remaining, checkpoint)
+    sampled = {(r.roll, s.value) for r in _samples(spec, records) for s in remaining}
+
+    by_roll = {record.roll: record for record in records}
+    semesters = {semester.value: semester for semester in remaining}
+
+    def queries() -> Iterator[Query]:
+        arrivals = stream if spec.roll_prefix is None else iter(())
+        for record in chain(list(records), arrivals):
+            known = by_roll.get(record.roll)
+            if known is None:
+                by_roll[record.roll] = record
+                records.append(record)
+            elif known is not record:
+                logger.warning(f"Skipping duplicate autonomy roll {record.roll}")
+                continue
+            for semester in remaining:
+                if (record.roll, semester.value) not in sampled:
+                    yield Query(record.roll, semester.value, len(semester.columns))
+
+    for query, result in _fetch_all(scraper, checkpoint, queries()):
+        by_roll[query.roll].add(semesters[query.semester], result)
+
+    if spec.roll_prefix is None:
+        missing = [r.roll for r in records if r.name == MISSING_VALUE]
+    records.sort(key=lambda record: record.ids)
+    return BatchResult(records=records, missing=sorted(missing))
+
+
+def write_batch(
+    spec: BatchSpec,
+    result: BatchResult,
+    output: Optional[str] = None,
+    missing_output: Optional[str] = None,
+):
+    """
+    Write a scraped batch the way the Selenium scripts did
+
+    Args:
+        spec: Batch definition
+        result: Scraped batch
+        output: Grades CSV path (default: spec.output)
+        missing_output: Missing rolls path (default: spec.missing_output)
+    """
+    output = output or spec.output
+    missing_output = missing_output or spec.missing_output
+    for path in (output, missing_output):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(spec.header)
+        for record in result.records:
+            writer.writerow(record.row(spec))
+    with open(missing_output, "w", encoding="utf-8") as f:
+        for roll in result.missing:
+            f.write(roll + "\n")
+
+
+def load_students(path: str) -> List[Tuple[str, str]]:
+    """
+    Read the college roll → autonomy roll mapping written by get_autonomy.py
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        (college roll, autonomy roll) pairs
+    """
+    with open(path, encoding="utf-8") as f:
+        return list(json.load(f).items())
+
@@ -0,0 +1,287 @@
+"""
+Benchmark every scraper strategy against a local fake of the forms
+
+    python -m src.scraper.benchmark                      # 2021, synthetic students
+    python -m src.scraper.benchmark 2024 --latency 0.2 --error-rate 0.02
+    python -m src.scraper.benchmark 2023 --replay data/cassette.db
+
+Each strategy scrapes the whole batch from scratch, with its own journal
+and no rate limit, against the same server started in a separate process.
+Throughput is compared, every strategy's output is checked against the
+first one's, and on synthetic students every student is checked to have
+been found.
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Tuple
+
+from src.scraper.autonomy import AUTONOMY_ROLL_LENGTH, COLLEGE_ROLLS, AutonomyResolver
+from src.scraper.batches import BATCHES, BatchSpec, scrape_batch
+from src.scraper.browser import BrowserPool
+from src.scraper.engine import ResultsScraper
+from src.scraper.fake_server import BackgroundServer, Roster, ServerOptions
+from src.scraper.journal import Checkpoint, Journal
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """A way of querying the form"""
+
+    name: str
+    # Requests in flight, for HTTP and for autonomy roll lookups
+    concurrency: int = 8
+    # Headless browser processes instead of HTTP, 0 for HTTP
+    browsers: int = 0
+
+    def scraper(self, url: str):
+        """Build this strategy's scraper, unthrottled"""
+        if self.browsers:
+            return BrowserPool(url, workers=self.browsers, rate=0)
+        return ResultsScraper(url, concurrency=self.concurrency, rate=0)
+
+
+STRATEGIES: Tuple[Strategy, ...] = (
+    Strategy("http-serial", concurrency=1),
+    Strategy("http-8", concurrency=8),
+    Strategy("http-32", concurrency=32),
+    Strategy("browsers-4", concurrency=4, browsers=4),
+)
+
+
+@dataclass
+class Run:
+    """Outcome of one strategy's scrape"""
+
+    strategy: Strategy
+    seconds: float
+    queries: int
+    requests: int
+    students: int
+    failed: int
+    # Output rows and missing rolls, to compare strategies by
+    output: Tuple[List[List[str]], List[str]]
+    # Autonomy rolls of every student in the output
+    rolls: FrozenSet[str]
+
+
+def run(strategy: Strategy, spec: BatchSpec, server, directory: str) -> Run:
+    """
+    Scrape a batch from scratch with one strategy
+
+    Args:
+        strategy: Strategy to run
+        spec: Batch to scrape
+        server: Running fake server
+        directory: Where to keep the run's journal
+
+    Returns:
+        Timings, counts and output of the run
+    """
+    journal = Journal(os.path.join(directory, f"{strategy.name}.db"))
+    checkpoint = Checkpoint(journal, spec.batch)
+    resolver: Optional[AutonomyResolver] = None
+    students = None
+    started = time.perf_counter()
+    scraper = strategy.scraper(server.results_url)
+    try:
+        if spec.roll_prefix is None:
+            resolver = AutonomyResolver(
+                server.autonomy_url,
+                concurrency=strategy.concurrency,
+                rate=0,
+                journal=journal,
+            )
+            students = resolver.resolve(COLLEGE_ROLLS[spec.batch])
+        result = scrape_batch(spec, scraper, students, checkpoint)
+    finally:
+        scraper.close()
+        if resolver is not None:
+            resolver.close()
+        journal.close()
+    seconds = time.perf_counter() - started
+
+    requests = scraper.requests
+    if resolver is not None:
+        requests += resolver.engine.requests
+    return Run(
+        strategy=strategy,
+        seconds=seconds,
+        queries=checkpoint.fetched,
+        requests=requests,
+        students=len(result.records),
+        failed=len(scraper.failed),
+        output=([r.row(spec) for r in result.records], result.missing),
+        rolls=frozenset(r.roll for r in result.records),
+    )
+
+
+def expected_rolls(roster: Roster, spec: BatchSpec) -> FrozenSet[str]:
+    """
+    Autonomy rolls a complete scrape of synthetic students must output
+
+    Args:
+        roster: Synthetic students the server answers from
+        spec: Batch being scraped
+
+    Returns:
+        Rolls with a first-semester result, or for batches scraped from a
+        roll list, every roll the autonomy form resolves
+    """
+    if spec.roll_prefix is None:
+        rolls = COLLEGE_ROLLS[spec.batch]
+        resolved = (
+            roster.autonomy_roll(rolls.roll(branch, number), rolls.year)
+            for branch in rolls.branches
+            for number in rolls.numbers
+        )
+        return frozenset(
+            roll for roll in resolved if roll and len(roll) == AUTONOMY_ROLL_LENGTH
+        )
+
+    first = int(spec.semesters[0].value)
+    found = set()
+    for branch in spec.branches:
+        for number in spec.roll_numbers:
+            student = roster.student(spec.roll(branch, number))
+            if student is not None and roster.grades(student, first) is not None:
+                found.add(student.roll)
+    return frozenset(found)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "batch", nargs="?", default="2021", choices=sorted(BATCHES), help="batch"
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=[strategy.name for strategy in STRATEGIES],
+        help="strategies to run (default: all available)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="mean server latency in seconds (default: 0.05)",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of 503s (default: 0)"
+    )
+    parser.add_argument(
+        "--drop-rate",
+        type=float,
+        default=0.0,
+        help="fraction of dropped connections (default: 0)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="synthetic students (default: 0)"
+    )
+    parser.add_argument(
+        "--vacancy-run",
+        type=int,
+        default=Roster.vacancy_run,
+        metavar="N",
+        help=f"longest run of vacant rolls (default: {Roster.vacancy_run})",
+    )
+    parser.add_argument(
+        "--replay", metavar="CASSETTE", help="serve a recording instead of synthetic"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="scraper logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    strategies = [
+        strategy
+        for strategy in STRATEGIES
+        if args.strategies is None or strategy.name in args.strategies
+    ]
+    if importlib.util.find_spec("selenium") is None:
+        skipped = [strategy.name for strategy in strategies if strategy.browsers]
+        if skipped:
+            print(f"⏭️  Skipping {', '.join(skipped)}: Selenium is not installed")
+        strategies = [strategy for strategy in strategies if not strategy.browsers]
+    if not strategies:
+        print("❌ No strategies to run")
+        sys.exit(1)
+    if args.replay and not os.path.exists(args.replay):
+        print(f"❌ Cassette not found: {args.replay}")
+        sys.exit(1)
+
+    spec = BATCHES[args.batch]
+    options = ServerOptions(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+        vacancy_run=args.vacancy_run,
+        cassette=args.replay,
+    )
+    expected = None if args.replay else expected_rolls(options.roster, spec)
+    server = BackgroundServer(options)
+    source = f"replaying {args.replay}" if args.replay else f"seed {args.seed}"
+    print(
+        f"🧪 Batch {spec.batch} on {server.base_url} ({source}, "
+        f"{args.latency * 1000:.0f}ms latency, {args.error_rate:.0%} errors, "
+        f"{args.drop_rate:.0%} drops)\n"
+    )
+    print(
+        f"{'strategy':<14}{'queries':>9}{'requests':>10}{'seconds':>9}"
+        f"{'queries/s':>11}{'students':>10}{'failed':>8}  output"
+    )
+
+    runs: List[Run] = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for strategy in strategies:
+                result = run(strategy, spec, server, directory)
+                if expected is not None and result.rolls != expected:
+                    lost = len(expected - result.rolls)
+                    verdict = f"❌ missed {lost} of {len(expected)} students"
+                elif not runs:
+                    verdict = "reference"
+                elif result.output == runs[0].output:
+                    verdict = "identical"
+                else:
+                    verdict = f"❌ differs from {runs[0].strategy.name}"
+                runs.append(result)
+                rate = result.queries / result.seconds if result.seconds else 0
+                print(
+                    f"{strategy.name:<14}{result.queries:>9}{result.requests:>10}"
+                    f"{result.seconds:>9.2f}{rate:>11.1f}{result.students:>10}"
+                    f"{result.failed:>8}  {verdict}"
+                )
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted")
+        sys.exit(130)
+    finally:
+        server.close()
+
+    fastest = min(runs, key=lambda r: r.seconds)
+    print(f"\n🏁 Fastest: {fastest.strategy.name} ({fastest.seconds:.2f}s)")
+    if any(r.output != runs[0].output for r in runs):
+        sys.exit(1)
+    if expected is not None and any(r.rolls != expected for r in runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+# Pool of headless browser processes for querying the results form
+
+import itertools
+import logging
+import multiprocessing
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.scraper.engine import (
+    RESULTS_URL,
+    ROLL_FIELD,
+    SEMESTER_FIELD,
+    SUBMIT_BUTTON,
+    Query,
+)
+from src.scraper.forms import SemesterResult, parse_form, parse_result
+from src.scraper.session import ScraperError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Button that clears the form after "back", as in the get_grades scripts
+RESET_BUTTON = "reset1"
+
+# Spawned (not forked) workers: each starts its own browser from a clean process
+_context = multiprocessing.get_context("spawn")
+
+
+class SharedRateLimiter:
+    """
+    Politeness limit shared by every worker process
+
+    Keeps the time the next request may go out in shared memory, so the
+    whole pool never exceeds ``rate`` requests per second between them.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Initialize the limiter
+
+        Args:
+            rate: Requests per second across all processes, 0 for no limit
+        """
+        self.rate = rate
+        self._next = _context.Value("d", 0.0, lock=False)
+        self._lock = _context.Lock()
+
+    def acquire(self):
+        """Block until this process may send a request"""
+        if self.rate <= 0:
+            return
+        # A worker killed while holding the lock must not stall the others
+        locked = self._lock.acquire(timeout=1.0)
+        try:
+            now = time.monotonic()
+            slot = max(now, self._next.value)
+            self._next.value = slot + 1 / self.rate
+        finally:
+            if locked:
+                self._lock.release()
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class FirefoxBrowser:
+    """Firefox on the results form, filled in the way get_grades did it"""
+
+    def __init__(self, url: str, headless: bool, timeout: float):
+        """
+        Start Firefox on the results form
+
+        Args:
+            url: Results form URL
+            headless: Run the browser without a window
+            timeout: Seconds a page may take to load
+        """
+        # Only the browser workers need Selenium
+        from selenium import webdriver
+
+        options = webdriver.FirefoxOptions()
+        if headless:
+            options.add_argument("-headless")
+        self.url = url
+        self.driver = webdriver.Firefox(options=options)
+        self.driver.set_page_load_timeout(timeout)
+        self.driver.get(url)
+
+    def query(self, query: Query) -> Optional[SemesterResult]:
+        """Fill in the form, submit it and read the result"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import Select
+
+        driver = self.driver
+        field = driver.find_element(By.NAME, ROLL_FIELD)
+        field.clear()
+        field.send_keys(query.roll)
+        Select(driver.find_element(By.NAME, SEMESTER_FIELD)).select_by_value(
+            query.semester
+        )
+        driver.find_element(By.ID, SUBMIT_BUTTON).click()
+        try:
+            return parse_result(parse_form(driver.page_source), query.labels)
+        finally:
+            driver.back()
+            driver.find_element(By.NAME, RESET_BUTTON).click()
+
+    def reload(self):
+        """Open the form again after an error left the page in an unknown state"""
+        self.driver.get(self.url)
+
+    def quit(self):
+        """Close the browser"""
+        self.driver.quit()
+
+
+# Starts a browser on the form from (url, headless, page load timeout)
+BrowserFactory = Callable[[str, bool, float], FirefoxBrowser]
+
+
+def _worker(
+    worker_id: int,
+    browser_factory: BrowserFactory,
+    url: str,
+    headless: bool,
+    timeout: float,
+    inbox: "multiprocessing.Queue",
+    results: Connection,
+    limiter: SharedRateLimiter,
+):
+    """
+    Worker process: answer jobs one at a time until told to stop
+
+    Jobs arrive as (ticket, query) and are answered with
+    (worker, ticket, result, answered) on the worker's own results pipe.
+    """
+    browser = browser_factory(url, headless, timeout)
+    try:
+        while True:
+            job = inbox.get()
+            if job is None:
+                break
+            ticket, query = job
+            limiter.acquire()
+            try:
+                result, answered = browser.query(query), True
+            except Exception as e:
+                # The page is in an unknown state now, so start over on it
+                logger.warning(f"Worker {worker_id}: {query.roll}: {e}")
+                result, answered = None, False
+                browser.reload()
+            results.send((worker_id, ticket, result, answered))
+    finally:
+        browser.quit()
+
+
+@dataclass
+class _Job:
+    """A query, how often it has been handed out and its current hand-out"""
+
+    query: Query
+    attempts: int = 0
+    ticket: int = 0
+    started: float = 0.0
+
+
+class BrowserPool:
+    """
+    Runs queries on N headless browsers in separate processes
+
+    Each worker holds at most one job, so the pool always knows what a
+    worker was doing when it died. A worker that exits or spends longer
+    than ``job_timeout`` on a job is killed and replaced, and its job is
+    retried. Offers the same fetch_all/try_fetch_all/failed/close interface
+    as ResultsScraper, so batches scrape through either.
+    """
+
+    def __init__(
+        self,
+        url: str = RESULTS_URL,
+        workers: int = 2,
+        rate: float = 2.0,
+        headless: bool = True,
+        job_timeout: float = 60.0,
+        max_attempts: int = 3,
+        browser_factory: BrowserFactory = FirefoxBrowser,
+    ):
+        """
+        Start the pool
+
+        Args:
+            url: Results form URL
+            workers: Browser processes to run
+            rate: Maximum form submissions per second across all browsers
+            headless: Run the browsers without a window
+            job_timeout: Seconds a job may take before its worker is
+                considered hung
+            max_attempts: Times a job is tried before it is given up on
+            browser_factory: Picklable callable starting a worker's browser
+        """
+        self.url = url
+        self.browser_factory = browser_factory
+        self.size = max(1, workers)
+        self.headless = headless
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.limiter = SharedRateLimiter(rate)
+        self.failed: List[Query] = []
+        self.requests = 0
+        self.restarts = 0
+
+        self._inboxes: Dict[int, "multiprocessing.Queue"] = {}
+        self._results: Dict[int, Connection] = {}
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        for worker_id in range(self.size):
+            self._start(worker_id)
+
+    def _start(self, worker_id: int):
+        # Queues and pipes are never shared between workers, and a restarted
+        # worker gets new ones, so a worker killed mid-write (holding a
+        # queue's lock or half way through a message) cannot block the rest
+        old = self._results.pop(worker_id, None)
+        if old is not None:
+            old.close()
+        self._inboxes[worker_id] = _context.Queue()
+        receiver, sender = _context.Pipe(duplex=False)
+        process = _context.Process(
+            target=_worker,
+            args=(
+                worker_id,
+                self.browser_factory,
+                self.url,
+                self.headless,
+                self.job_timeout,
+                self._inboxes[worker_id],
+                sender,
+                self.limiter,
+            ),
+            name=f"browser-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        # Only the worker writes, so its exit shows up as end of file here
+        sender.close()
+        self._results[worker_id] = receiver
+        self._processes[worker_id] = process
+
+    def _restart(self, worker_id: int, reason: str):
+        """Kill a worker and start a fresh one in its place"""
+        logger.warning(f"Restarting browser worker {worker_id}: {reason}")
+        process = self._processes[worker_id]
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=5)
+        self.restarts += 1
+        # Workers that never get a single job done cannot start a browser
+        if self.requests == 0 and self.restarts > self.size * self.max_attempts:
+            raise ScraperError(f"Browser workers keep failing: {reason}")
+        self._start(worker_id)
+
+    def try_fetch_all(
+        self, queries: Iterable[Query]
+    ) -> Iterator[Tuple[Query, Optional[SemesterResult], bool]]:
+        """
+        Look up many rolls and semesters on the browser pool
+
+        Args:
+            queries: Lookups to run
+
+        Returns:
+            Iterator of (query, result, whether the form answered) in
+            completion order
+        """
+        queries = iter(queries)
+        waiting: Deque[_Job] = deque()
+        running: Dict[int, _Job] = {}
+        tickets = itertools.count(1)
+        exhausted = False
+
+        def retry(job: _Job) -> bool:
+            """Queue a job again, or give up on it"""
+            if job.attempts < self.max_attempts:
+                waiting.appendleft(job)
+                return True
+            self.failed.append(job.query)
+            return False
+
+        while True:
+            # Hand out jobs to idle workers, pulling queries only as needed
+            for worker_id in self._processes:
+                if worker_id in running:
+                    continue
+                if not waiting and not exhausted:
+                    query = next(queries, None)
+                    if query is None:
+                        exhausted = True
+                    else:
+                        waiting.append(_Job(query))
+                if not waiting:
+                    break
+                job = waiting.popleft()
+                job.attempts += 1
+                job.ticket = next(tickets)
+                job.started = time.monotonic()
+                running[worker_id] = job
+                self._inboxes[worker_id].put((job.ticket, job.query))
+            if exhausted and not waiting and not running:
+                return
+
+            for connection in wait(list(self._results.values()), timeout=1.0):
+                try:
+                    worker_id, ticket, result, answered = connection.recv()
+                except (EOFError, OSError):
+                    # The worker is gone; it is replaced below
+                    continue
+                job = running.get(worker_id)
+                # Answers to hand-outs that were since retried elsewhere are stale
+                if job is not None and job.ticket == ticket:
+                    del running[worker_id]
+                    self.requests += 1
+                    if answered:
+                        yield job.query, result, True
+                    elif not retry(job):
+                        yield job.query, None, False
+
+            # Crashed or hung workers: replace them and retry their jobs
+            now = time.monotonic()
+            for worker_id, process in list(self._processes.items()):
+                job = running.get(worker_id)
+                if not process.is_alive():
+                    reason = f"exited with code {process.exitcode}"
+                elif job is not None and now - job.started > self.job_timeout:
+                    reason = f"no answer in {self.job_timeout:.0f}s"
+                else:
+                    continue
+                self._restart(worker_id, reason)
+                if job is not None:
+                    del running[worker_id]
+                    if not retry(job):
+                        yield job.query, None, False
+
+    def fetch_all(
+        self, queries: Iterable[Query]
+    ) -> Iterator[Tuple[Query, Optional[SemesterResult]]]:
+        """
+        Look up many rolls and semesters on the browser pool
+
+        Failed queries are yielded with a None result.
+
+        Args:
+            queries: Lookups to run
+
+        Returns:
+            Iterator of (query, result) in completion order
+        """
+        for query, result, _ in self.try_fetch_all(queries):
+            yield query, result
+
+    def close(self):
+        """Stop every browser"""
+        for inbox in self._inboxes.values():
+            inbox.put(None)
+        for process in self._processes.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+        for connection in self._results.values():
+            connection.close()
+        self._processes.clear()
+        self._inboxes.clear()
+        self._results.clear()
@@ -0,0 +1,125 @@
+# Galloping/binary search for the populated roll range of every branch
+
+import logging
+from typing import Callable, Dict, Generator, Iterable, List, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Probes requested by a search, and whether each roll number had a result
+Probes = List[int]
+Answers = Dict[int, bool]
+Search = Generator[Probes, Answers, int]
+
+
+def _populated(number: int, limit: int, gap: int, known: Answers) -> Search:
+    """
+    Whether any roll in [number, number + gap) has a result
+
+    Asks for ``number`` first and only widens to the rest of the window on
+    a miss, so populated stretches cost one probe per step.
+    """
+    if number > limit:
+        return False
+    if number not in known:
+        known.update((yield [number]))
+    if known[number]:
+        return True
+    window = range(number + 1, min(number + gap, limit + 1))
+    unknown = [n for n in window if n not in known]
+    if unknown:
+        known.update((yield unknown))
+    return any(known[n] for n in window)
+
+
+def last_live(start: int, limit: int, gap: int, known: Answers) -> Search:
+    """
+    Find the last roll number with a result in a branch
+
+    Rolls are allotted from ``start`` upwards with gaps shorter than ``gap``
+    (students who left), so "some result in the next ``gap`` rolls" is true
+    up to the end of the branch and false after it. Gallop 1, 2, 4, 8, ...
+    past the end, then binary search back to it.
+
+    Args:
+        start: First roll number
+        limit: Last roll number that can exist
+        gap: Longest run of missing rolls inside a branch, plus one
+        known: Answers so far, updated with every probe
+
+    Returns:
+        The last roll number with a result, or start - 1 for an empty branch
+    """
+    if not (yield from _populated(start, limit, gap, known)):
+        return start - 1
+    low, step = start, 1
+    high = start + step
+    while high <= limit and (yield from _populated(high, limit, gap, known)):
+        low, step = high, step * 2
+        high = start + step
+    high = min(high, limit + 1)
+    # populated(low) holds and populated(high) does not (or high is past limit)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if (yield from _populated(middle, limit, gap, known)):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def find_ranges(
+    branches: Iterable[int],
+    start: int,
+    limit: int,
+    gap: int,
+    probe: Callable[[List[Tuple[int, int]]], Dict[Tuple[int, int], bool]],
+) -> Dict[int, int]:
+    """
+    Search every branch at once
+
+    Each round collects the next probes of every unfinished search and
+    sends them as one concurrent batch, so the number of rounds is that of
+    the slowest branch (about 2·log2(limit)), not the sum over branches.
+
+    Args:
+        branches: Branch codes to search
+        start: First roll number
+        limit: Last roll number that can exist
+        gap: Longest run of missing rolls inside a branch, plus one
+        probe: Queries (branch, number) pairs and says which had a result
+
+    Returns:
+        Last roll number with a result per branch (start - 1 if empty)
+    """
+    known: Dict[int, Answers] = {}
+    searches: Dict[int, Search] = {}
+    wanted: Dict[int, Probes] = {}
+    ends: Dict[int, int] = {}
+
+    for branch in branches:
+        known[branch] = {}
+        searches[branch] = last_live(start, limit, gap, known[branch])
+        try:
+            wanted[branch] = next(searches[branch])
+        except StopIteration as stop:
+            # Settled without a probe, e.g. an empty roll range
+            ends[branch] = stop.value
+
+    rounds = 0
+    while wanted:
+        rounds += 1
+        answers = probe([(b, n) for b, numbers in wanted.items() for n in numbers])
+        for branch in list(wanted):
+            reply = {n: answers[branch, n] for n in wanted[branch]}
+            try:
+                wanted[branch] = searches[branch].send(reply)
+            except StopIteration as stop:
+                ends[branch] = stop.value
+                del wanted[branch]
+
+    logger.info(
+        f"Found {sum(end >= start for end in ends.values())} populated branches "
+        f"in {rounds} rounds"
+    )
+    return ends
@@ -0,0 +1,228 @@
+# Bounded-concurrency, rate-limited engine for querying the results form
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.scraper.forms import SemesterResult, parse_result
+from src.scraper.session import FormSession, ScraperError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Results form of every batch
+RESULTS_URL = "http://111.93.160.42:8084/stud25e.aspx"
+
+# Form fields of the results page
+ROLL_FIELD = "roll"
+SEMESTER_FIELD = "sem"
+SUBMIT_BUTTON = "Button1"
+
+Job = TypeVar("Job")
+Result = TypeVar("Result")
+
+_DONE = object()
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket
+
+    Allows bursts of up to ``burst`` requests, then ``rate`` per second.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize the limiter
+
+        Args:
+            rate: Requests per second, 0 for no limit
+            burst: Bucket size (default: one second worth of requests)
+        """
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else int(rate) or 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+@dataclass
+class Query:
+    """One (roll, semester) lookup"""
+
+    roll: str
+    semester: str
+    labels: int
+
+
+class ResultsScraper:
+    """
+    Queries the results form for many (roll, semester) pairs at once
+
+    Requests go through a pooled FormSession, at most ``concurrency`` are in
+    flight, and all of them share one rate limiter.
+    """
+
+    def __init__(
+        self,
+        url: str = RESULTS_URL,
+        concurrency: int = 8,
+        rate: float = 10.0,
+        session: Optional[FormSession] = None,
+    ):
+        """
+        Initialize the scraper
+
+        Args:
+            url: Results form URL
+            concurrency: Maximum number of requests in flight
+            rate: Maximum requests per second across all workers, 0 for no limit
+            session: Session to use instead of a new one
+        """
+        self.concurrency = max(1, concurrency)
+        self.session = session or FormSession(url, pool_size=self.concurrency)
+        self.limiter = RateLimiter(rate)
+        self.failed: List[Query] = []
+        self._lock = threading.Lock()
+        # Long-lived workers keep their loaded form between calls
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="scraper"
+        )
+
+    def fetch(self, query: Query) -> Optional[SemesterResult]:
+        """
+        Look up one roll and semester
+
+        Args:
+            query: The lookup
+
+        Returns:
+            The result shown, or None if there is none
+
+        Raises:
+            ScraperError: If the form cannot be reached
+        """
+        self.limiter.acquire()
+        page = self.session.submit(
+            {ROLL_FIELD: query.roll, SEMESTER_FIELD: query.semester}, SUBMIT_BUTTON
+        )
+        return parse_result(page, query.labels)
+
+    def map(
+        self, function: Callable[[Job], Result], jobs: Iterable[Job]
+    ) -> Iterator[Tuple[Job, Result]]:
+        """
+        Run a function over jobs on the worker pool
+
+        Jobs are pulled lazily, so at most ``concurrency`` of them are pending
+        at any time and results are yielded as soon as they complete.
+
+        Args:
+            function: Called with each job on a worker thread
+            jobs: Jobs to run
+
+        Returns:
+            Iterator of (job, result) in completion order
+        """
+        jobs = iter(jobs)
+        pending = {}
+        try:
+            while True:
+                while len(pending) < self.concurrency:
+                    job = next(jobs, _DONE)
+                    if job is _DONE:
+                        break
+                    pending[self._executor.submit(function, job)] = job
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            # Abandoned or interrupted: drop what has not started yet
+            for future in pending:
+                future.cancel()
+
+    def try_fetch(self, query: Query) -> Tuple[Optional[SemesterResult], bool]:
+        """
+        Look up one roll and semester, logging instead of raising on failure
+
+        Queries whose requests fail after every retry are kept in ``failed``.
+
+        Args:
+            query: The lookup
+
+        Returns:
+            (result, whether the form answered)
+        """
+        try:
+            return self.fetch(query), True
+        except ScraperError as e:
+            logger.warning(f"Giving up on {query.roll} sem {query.semester}: {e}")
+            with self._lock:
+                self.failed.append(query)
+            return None, False
+
+    def try_fetch_all(
+        self, queries: Iterable[Query]
+    ) -> Iterator[Tuple[Query, Optional[SemesterResult], bool]]:
+        """
+        Look up many rolls and semesters concurrently
+
+        Args:
+            queries: Lookups to run
+
+        Returns:
+            Iterator of (query, result, whether the form answered) in
+            completion order
+        """
+        for query, (result, answered) in self.map(self.try_fetch, queries):
+            yield query, result, answered
+
+    def fetch_all(
+        self, queries: Iterable[Query]
+    ) -> Iterator[Tuple[Query, Optional[SemesterResult]]]:
+        """
+        Look up many rolls and semesters concurrently
+
+        Failed queries are yielded with a None result, see try_fetch.
+
+        Args:
+            queries: Lookups to run
+
+        Returns:
+            Iterator of (query, result) in completion order
+        """
+        for query, result, _ in self.try_fetch_all(queries):
+            yield query, result
+
+    @property
+    def requests(self) -> int:
+        """HTTP requests sent so far"""
+        return self.session.requests
+
+    def close(self):
+        """Stop the workers and close the underlying connections"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+
@@ -0,0 +1,913 @@
+"""
+Local stand-in for the results and autonomy roll forms
+
+    python -m src.scraper.fake_server --port 8084 --latency 0.05 --error-rate 0.02
+    python -m src.scraper.fake_server --record data/cassette.db   # proxy + capture
+    python -m src.scraper.fake_server --replay data/cassette.db   # offline
+
+Serves both forms on one port, at the same paths as the real ones and with
+the same element ids, so any scraper can be pointed at it with --url and
+--autonomy-url. By default it answers from deterministic synthetic
+students. --record forwards every request to the real forms and stores the
+answers; --replay serves them back without touching the network.
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.scraper.autonomy import (
+    AUTONOMY_URL,
+    COLLEGE_ROLL_FIELD,
+    RESULT_LABEL,
+    YEAR_FIELD,
+)
+from src.scraper.autonomy import SUBMIT_BUTTON as LOOKUP_BUTTON
+from src.scraper.browser import RESET_BUTTON
+from src.scraper.engine import RESULTS_URL, ROLL_FIELD, SEMESTER_FIELD, SUBMIT_BUTTON
+from src.scraper.forms import BRANCH_LABEL, NAME_LABEL, VALUE_LABEL
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+RESULTS_PATH = urlsplit(RESULTS_URL).path
+AUTONOMY_PATH = urlsplit(AUTONOMY_URL).path
+
+# ASP.NET state that changes between visits and must not key a recording
+VOLATILE_FIELDS = {
+    "__VIEWSTATE",
+    "__VIEWSTATEGENERATOR",
+    "__EVENTVALIDATION",
+    "__EVENTTARGET",
+    "__EVENTARGUMENT",
+}
+
+SESSION_COOKIE = "ASP.NET_SessionId"
+
+# Synthetic college: branch codes 1.. in this order, with the abbreviation
+# the result page prints after the name
+BRANCHES: Tuple[Tuple[str, str], ...] = (
+    ("Computer Science & Engineering", "CSE"),
+    ("Information Technology", "IT"),
+    ("Electronics & Communication Engineering", "ECE"),
+    ("Electrical Engineering", "EE"),
+    ("Mechanical Engineering", "ME"),
+    ("Civil Engineering", "CE"),
+    ("Chemical Engineering", "CHE"),
+    ("Biotechnology", "BT"),
+    ("Applied Electronics & Instrumentation Engineering", "AEIE"),
+    ("Computer Science & Business Systems", "CSBS"),
+    ("Computer Science & Engineering (AI&ML)", "CSEAIML"),
+    ("Computer Science & Engineering (Data Science)", "CSEDS"),
+    ("Computer Science and Engineering (IoT)", "CSEIOT"),
+)
+
+FIRST_NAMES = tuple(
+    "AARAV ADITI ANIK ANKITA ARJUN DEBARATI ISHAAN KAVYA MEGHNA NEHA PRIYANKA "
+    "RAHUL RIYA SAYAN SOUMYA TANMAY".split()
+)
+LAST_NAMES = tuple(
+    "BANERJEE BASU BOSE CHAKRABORTY DAS DUTTA GHOSH GUPTA KUMAR MONDAL MUKHERJEE "
+    "PAUL ROY SAHA SEN SINGH".split()
+)
+
+ORDINALS = ("First", "Second", "Third", "Fourth", "Fifth", "Sixth", "Seventh", "Eighth")
+
+# Last semester with results out, per 6-digit autonomy roll prefix (batch)
+PUBLISHED = {"126210": 8, "126220": 6, "126230": 4, "126240": 2}
+
+
+@dataclass(frozen=True)
+class Student:
+    """A synthetic student"""
+
+    roll: str
+    name: str
+    branch: int
+    # Typical GPA, each semester scatters around it
+    ability: float
+
+
+@dataclass(frozen=True)
+class Roster:
+    """
+    Deterministic synthetic students, the same for the same seed
+
+    Results-form rolls are <6-digit prefix><branch:02><number:03>. Each
+    branch has a random number of rolls with runs of vacancies (students
+    who left). Any roll, the first included, starts a run with chance
+    ``vacancy``, and the run's length is drawn independently from 1 to
+    ``vacancy_run``. College rolls for the autonomy form are
+    <year:02><50 + branch><number:03> and map onto 126<year>0 rolls.
+    """
+
+    seed: int = 0
+    # Rolls per branch are drawn from this range
+    sizes: Tuple[int, int] = (30, 90)
+    # Chance a run of vacant rolls starts at a roll
+    vacancy: float = 0.03
+    # Longest run of vacant rolls
+    vacancy_run: int = 8
+    # Chance a branch code is not offered in a batch
+    closed: float = 0.15
+    # Chance a student's result for a later semester is withheld
+    withheld: float = 0.02
+    # Chance the autonomy form shows an unusable roll for a college roll
+    invalid: float = 0.02
+    # Semester values that show nothing, on top of PUBLISHED
+    unpublished: FrozenSet[str] = frozenset()
+
+    def _random(self, *key) -> random.Random:
+        return random.Random(":".join(map(str, (self.seed, *key))))
+
+    def vacancies(self, group: str) -> FrozenSet[int]:
+        """
+        Vacant roll numbers of a branch, before its size is applied
+
+        Args:
+            group: Roll without its last three digits
+
+        Returns:
+            Roll numbers nobody holds
+        """
+        rng = self._random("vacant", group)
+        vacant = set()
+        number = 1
+        while number <= self.sizes[1]:
+            if rng.random() < self.vacancy:
+                run = rng.randint(1, self.vacancy_run)
+                vacant.update(range(number, number + run))
+                # A run ends at a held roll, or it would be part of a longer one
+                number += run + 1
+            else:
+                number += 1
+        return frozenset(vacant)
+
+    def size(self, group: str) -> int:
+        """
+        Rolls allotted in a branch
+
+        Args:
+            group: Roll without its last three digits
+
+        Returns:
+            Last roll number, 0 if the branch code is not offered
+        """
+        branch = int(group[-2:])
+        if not 1 <= branch <= len(BRANCHES):
+            return 0
+        rng = self._random("size", group)
+        if branch > 1 and rng.random() < self.closed:
+            return 0
+        size = rng.randint(*self.sizes)
+        vacant = self.vacancies(group)
+        while size in vacant:
+            size -= 1
+        return size
+
+    def student(self, roll: str) -> Optional[Student]:
+        """
+        The student a results-form roll belongs to
+
+        Args:
+            roll: Autonomy roll
+
+        Returns:
+            The student, or None for a roll nobody holds
+        """
+        if len(roll) != 11 or not roll.isdigit():
+            return None
+        group, number = roll[:-3], int(roll[-3:])
+        if not 1 <= number <= self.size(group) or number in self.vacancies(group):
+            return None
+        rng = self._random("student", roll)
+        name = f"{rng.choice(FIRST_NAMES)}  {rng.choice(LAST_NAMES)}"
+        return Student(roll, name, int(group[-2:]), rng.uniform(5.0, 9.6))
+
+    def grades(self, student: Student, semester: int) -> Optional[List[float]]:
+        """
+        GPAs on a student's result page for an even semester
+
+        Args:
+            student: The student
+            semester: Semester number (2, 4, ...)
+
+        Returns:
+            [odd semester, even semester, year average], or None if the
+            semester shows nothing
+        """
+        if str(semester) in self.unpublished:
+            return None
+        if semester > PUBLISHED.get(student.roll[:6], 8) or semester % 2:
+            return None
+        rng = self._random("grades", student.roll, semester)
+        if semester > 2 and rng.random() < self.withheld:
+            return None
+        gpas = [
+            round(min(10.0, max(4.0, rng.gauss(student.ability, 0.35))), 2)
+            for _ in range(2)
+        ]
+        return [*gpas, round(sum(gpas) / 2, 2)]
+
+    def autonomy_roll(self, college_roll: str, year: str) -> Optional[str]:
+        """
+        What the autonomy form shows for a college roll
+
+        Args:
+            college_roll: College roll
+            year: DrYear option picked
+
+        Returns:
+            The autonomy roll, "" for a roll the form knows but cannot map,
+            or None for an unknown roll
+        """
+        if len(college_roll) != 7 or not college_roll.isdigit():
+            return None
+        batch, branch, number = college_roll[:2], college_roll[2:4], college_roll[4:]
+        if year != str(25 - int(batch)) or not 51 <= int(branch) <= 99:
+            return None
+        roll = f"126{batch}0{int(branch) - 50:02}{number}"
+        if self.student(roll) is None:
+            return None
+        if self._random("invalid", college_roll).random() < self.invalid:
+            return ""
+        return roll
+
+
+@dataclass
+class Request:
+    """A decoded request"""
+
+    method: str
+    path: str
+    # Query string or form fields
+    fields: Dict[str, str]
+    cookies: Dict[str, str]
+    body: Optional[bytes] = None
+
+
+@dataclass
+class Response:
+    """What the server answers with"""
+
+    status: int = 200
+    body: str = ""
+    content_type: str = "text/html; charset=utf-8"
+    cookies: List[str] = field(default_factory=list)
+
+
+def _grade(value: float) -> str:
+    """Format a GPA the way the result page does: 9.5, 8, 7.25"""
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class SyntheticForms:
+    """Both forms, answering from a Roster"""
+
+    def __init__(self, roster: Roster):
+        """
+        Initialize the forms
+
+        Args:
+            roster: Students to answer with
+        """
+        self.roster = roster
+        # Stand-ins for ASP.NET's per-deployment state: posts must echo them
+        self.view_state = secrets.token_hex(16)
+        self.event_validation = secrets.token_hex(8)
+
+    def _hidden(self, view_state: str) -> str:
+        return (
+            f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" '
+            f'value="{view_state}" />\n'
+            f'<input type="hidden" name="__VIEWSTATEGENERATOR" '
+            f'id="__VIEWSTATEGENERATOR" value="A1B2C3D4" />\n'
+            f'<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" '
+            f'value="{self.event_validation}" />\n'
+        )
+
+    def _page(self, path: str, view_state: str, content: str) -> str:
+        action = "./" + path.rsplit("/", 1)[-1]
+        return (
+            "<!DOCTYPE html>\n<html><head><title>Result</title></head><body>\n"
+            f'<form method="post" action="{action}" id="form1">\n'
+            f"{self._hidden(view_state)}{content}</form>\n</body></html>\n"
+        )
+
+    def results_page(self, labels: str = "") -> str:
+        """The results form, with a result's labels if there is one"""
+        options = "".join(
+            f'<option value="{value}">{value}</option>' for value in range(1, 9)
+        )
+        return self._page(
+            RESULTS_PATH,
+            self.view_state,
+            f'<input name="{ROLL_FIELD}" type="text" id="{ROLL_FIELD}" />\n'
+            f'<select name="{SEMESTER_FIELD}" id="{SEMESTER_FIELD}">{options}'
+            "</select>\n"
+            f'<input type="submit" name="{SUBMIT_BUTTON}" value="Show Result" '
+            f'id="{SUBMIT_BUTTON}" />\n'
+            f'<input type="submit" name="{RESET_BUTTON}" value="Reset" '
+            f'id="{RESET_BUTTON}" />\n'
+            f"{labels}",
+        )
+
+    def result_labels(self, roll: str, semester: str) -> str:
+        """The labels of a result, or nothing"""
+        student = self.roster.student(roll)
+        if student is None or not semester.isdigit():
+            return ""
+        grades = self.roster.grades(student, int(semester))
+        if grades is None:
+            return ""
+        number = int(semester)
+        year = ORDINALS[(number - 1) // 2]
+        branch, abbreviation = BRANCHES[student.branch - 1]
+        labels = [
+            (NAME_LABEL, f"Name : {escape(student.name)}"),
+            (
+                BRANCH_LABEL,
+                f"{year} Year B.Tech in {escape(branch)} ({abbreviation}) "
+                f"{ORDINALS[number - 1]} Semester Examination",
+            ),
+        ]
+        captions = (f"CGPA {number - 1}", f"CGPA {number}", f"YGPA {number // 2}")
+        for i, (caption, value) in enumerate(zip(captions, grades), 1):
+            html = f"<b>{caption}</b> : {_grade(value)}"
+            labels.append((VALUE_LABEL.format(i), html))
+        return "".join(
+            f'<span id="{label}">{html}</span><br />\n' for label, html in labels
+        )
+
+    def autonomy_page(self, step: int, college_roll: str = "", label: str = "") -> str:
+        """The autonomy form at a step: 0 blank, 1 asking the year, 2 answered"""
+        year = ""
+        if step:
+            year = (
+                f'<select name="{YEAR_FIELD}" id="{YEAR_FIELD}">'
+                '<option value="0">Select</option>'
+                + "".join(f'<option value="{y}">{y}</option>' for y in range(1, 5))
+                + "</select>\n"
+            )
+        return self._page(
+            AUTONOMY_PATH,
+            f"{self.view_state}.{step}",
+            f'<input name="{COLLEGE_ROLL_FIELD}" type="text" '
+            f'value="{escape(college_roll)}" id="{COLLEGE_ROLL_FIELD}" />\n'
+            f"{year}"
+            f'<input type="submit" name="{LOOKUP_BUTTON}" value="Submit" '
+            f'id="{LOOKUP_BUTTON}" />\n'
+            f"{label}",
+        )
+
+    def handle(self, request: Request) -> Response:
+        """
+        Answer a request
+
+        Args:
+            request: The request
+
+        Returns:
+            The response
+        """
+        method, fields = request.method, request.fields
+        set_cookies = []
+        if SESSION_COOKIE not in request.cookies:
+            set_cookies.append(
+                f"{SESSION_COOKIE}={secrets.token_hex(12)}; path=/; HttpOnly"
+            )
+
+        if request.path == RESULTS_PATH:
+            if method == "GET":
+                return Response(body=self.results_page(), cookies=set_cookies)
+            if (
+                fields.get("__VIEWSTATE") != self.view_state
+                or fields.get("__EVENTVALIDATION") != self.event_validation
+                or SUBMIT_BUTTON not in fields
+            ):
+                return Response(500, "Invalid postback or callback argument")
+            labels = self.result_labels(
+                fields.get(ROLL_FIELD, "").strip(), fields.get(SEMESTER_FIELD, "")
+            )
+            return Response(body=self.results_page(labels), cookies=set_cookies)
+
+        if request.path == AUTONOMY_PATH:
+            if method == "GET":
+                return Response(body=self.autonomy_page(0), cookies=set_cookies)
+            view_state = fields.get("__VIEWSTATE", "")
+            state, _, step = view_state.partition(".")
+            if state != self.view_state or LOOKUP_BUTTON not in fields:
+                return Response(500, "Invalid postback or callback argument")
+            college_roll = fields.get(COLLEGE_ROLL_FIELD, "").strip()
+            if step == "0":
+                page = self.autonomy_page(1, college_roll)
+                return Response(body=page, cookies=set_cookies)
+            answer = self.roster.autonomy_roll(college_roll, fields.get(YEAR_FIELD, ""))
+            label = ""
+            if answer is not None:
+                label = f'<span id="{RESULT_LABEL}">{answer}</span>\n'
+            page = self.autonomy_page(2, college_roll, label)
+            return Response(body=page, cookies=set_cookies)
+
+        return Response(404, "Not Found", content_type="text/plain")
+
+
+def request_key(request: Request) -> str:
+    """
+    Identify a request by what it asks, not by its ASP.NET state
+
+    Args:
+        request: The request
+
+    Returns:
+        Key under which its response is recorded
+    """
+    asked = sorted(
+        (name, value)
+        for name, value in request.fields.items()
+        if name not in VOLATILE_FIELDS
+    )
+    return json.dumps([request.method, request.path, asked])
+
+
+class Cassette:
+    """
+    Recorded responses, in SQLite
+
+    Writes are committed one by one, so a recording can be interrupted and
+    continued like a scrape.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a cassette
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, status INTEGER NOT NULL, "
+            "content_type TEXT NOT NULL, body TEXT NOT NULL, recorded REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def get(self, key: str) -> Optional[Response]:
+        """
+        Look up a recorded response
+
+        Args:
+            key: Request key
+
+        Returns:
+            The response, or None if it was never recorded
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, body, content_type FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return Response(*row) if row else None
+
+    def put(self, key: str, response: Response):
+        """
+        Record a response
+
+        Args:
+            key: Request key
+            response: The response
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response.status,
+                    response.content_type,
+                    response.body,
+                    time.time(),
+                ),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+        return count
+
+    def close(self):
+        """Close the database"""
+        self._connection.close()
+
+
+class Replayer:
+    """Serves recorded responses; unrecorded requests get a 404"""
+
+    def __init__(self, cassette: Cassette):
+        """
+        Initialize the replayer
+
+        Args:
+            cassette: Recorded responses
+        """
+        self.cassette = cassette
+
+    def handle(self, request: Request) -> Response:
+        """Answer a request from the cassette"""
+        response = self.cassette.get(request_key(request))
+        if response is None:
+            logger.warning(f"Not recorded: {request.method} {request.path}")
+            return Response(404, "Not recorded", content_type="text/plain")
+        if SESSION_COOKIE not in request.cookies:
+            response.cookies.append(f"{SESSION_COOKIE}=replay; path=/; HttpOnly")
+        return response
+
+
+class Recorder:
+    """Forwards requests to the real forms and records their answers"""
+
+    def __init__(
+        self, cassette: Cassette, upstreams: Sequence[str], timeout: float = 30.0
+    ):
+        """
+        Initialize the recorder
+
+        Args:
+            cassette: Where to record
+            upstreams: Real form URLs; requests are routed by path
+            timeout: Socket timeout in seconds
+        """
+        self.cassette = cassette
+        self.timeout = timeout
+        self.routes = {urlsplit(url).path: urlsplit(url) for url in upstreams}
+
+    def handle(self, request: Request) -> Response:
+        """Answer a request from the real form, recording the answer"""
+        method, path = request.method, request.path
+        upstream = self.routes.get(path)
+        if upstream is None:
+            return Response(404, "No upstream for this path", content_type="text/plain")
+        cls = (
+            http.client.HTTPSConnection
+            if upstream.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        connection = cls(upstream.hostname, upstream.port, timeout=self.timeout)
+        headers = {"User-Agent": "Mozilla/5.0", "Accept": "text/html"}
+        if request.cookies:
+            headers["Cookie"] = "; ".join(
+                f"{name}={value}" for name, value in request.cookies.items()
+            )
+        if request.body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            connection.request(
+                method, upstream.path, body=request.body, headers=headers
+            )
+            upstream_response = connection.getresponse()
+            payload = upstream_response.read()
+        except (OSError, http.client.HTTPException) as e:
+            logger.warning(f"{method} {path}: upstream failed: {e}")
+            return Response(502, str(e), content_type="text/plain")
+        finally:
+            connection.close()
+
+        response = Response(
+            upstream_response.status,
+            payload.decode(
+                upstream_response.headers.get_content_charset() or "utf-8",
+                errors="replace",
+            ),
+            upstream_response.getheader("Content-Type") or "text/html",
+            # Cookies are scoped to the proxy instead of the real host
+            [
+                ";".join(
+                    part
+                    for part in cookie.split(";")
+                    if part.strip().split("=")[0].lower() not in ("domain", "secure")
+                )
+                for cookie in upstream_response.headers.get_all("Set-Cookie") or ()
+            ],
+        )
+        # Transient failures are passed on but not recorded
+        if response.status < 500:
+            self.cassette.put(request_key(request), response)
+        return response
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Decodes requests for the server's backend, injecting latency and errors"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+    server: "FakeServer"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _respond(self, method: str):
+        parts = urlsplit(self.path)
+        body = None
+        if method == "POST":
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            fields = dict(parse_qsl(body.decode("ascii"), keep_blank_values=True))
+        else:
+            fields = dict(parse_qsl(parts.query, keep_blank_values=True))
+        cookies = {}
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name:
+                cookies[name] = value
+        request = Request(method, parts.path, fields, cookies, body)
+
+        server = self.server
+        if server.latency:
+            time.sleep(random.uniform(0.5, 1.5) * server.latency)
+        chance = random.random()
+        if chance < server.drop_rate:
+            # Hang up without answering, like an overloaded IIS
+            self.close_connection = True
+            return
+        if chance < server.drop_rate + server.error_rate:
+            response = Response(503, "Service Unavailable", content_type="text/plain")
+        else:
+            response = server.backend.handle(request)
+        with server.lock:
+            server.requests += 1
+
+        payload = response.body.encode("utf-8")
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            payload = gzip.compress(payload, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        for cookie in response.cookies:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+
+class FakeServer(ThreadingHTTPServer):
+    """HTTP server for one of the backends, with latency and error injection"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        backend,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+    ):
+        """
+        Bind the server
+
+        Args:
+            backend: SyntheticForms, Recorder or Replayer
+            host: Interface to listen on
+            port: Port to listen on, 0 for any free one
+            latency: Mean seconds to wait before answering (±50%)
+            error_rate: Fraction of requests answered with a 503
+            drop_rate: Fraction of requests hung up on without an answer
+        """
+        super().__init__((host, port), _Handler)
+        self.backend = backend
+        self.latency = latency
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        """http://host:port of the server"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def results_url(self) -> str:
+        """Results form URL on this server"""
+        return self.base_url + RESULTS_PATH
+
+    @property
+    def autonomy_url(self) -> str:
+        """Autonomy roll form URL on this server"""
+        return self.base_url + AUTONOMY_PATH
+
+
+@dataclass(frozen=True)
+class ServerOptions:
+    """Everything needed to build a server, picklable for a child process"""
+
+    host: str = "127.0.0.1"
+    port: int = 0
+    latency: float = 0.0
+    error_rate: float = 0.0
+    drop_rate: float = 0.0
+    seed: int = 0
+    unpublished: FrozenSet[str] = frozenset()
+    vacancy_run: int = Roster.vacancy_run
+    # Cassette to replay, or to record into when upstreams are given
+    cassette: Optional[str] = None
+    upstreams: Tuple[str, ...] = ()
+
+    @property
+    def roster(self) -> Roster:
+        """The synthetic students served when not replaying"""
+        return Roster(
+            seed=self.seed,
+            vacancy_run=self.vacancy_run,
+            unpublished=self.unpublished,
+        )
+
+
+def make_server(options: ServerOptions) -> FakeServer:
+    """
+    Build a server from options
+
+    Args:
+        options: Server options
+
+    Returns:
+        The bound (not yet serving) server
+    """
+    if options.cassette is None:
+        backend = SyntheticForms(options.roster)
+    elif options.upstreams:
+        backend = Recorder(Cassette(options.cassette), options.upstreams)
+    else:
+        backend = Replayer(Cassette(options.cassette))
+    return FakeServer(
+        backend,
+        options.host,
+        options.port,
+        latency=options.latency,
+        error_rate=options.error_rate,
+        drop_rate=options.drop_rate,
+    )
+
+
+def _serve(options: ServerOptions, ready: "multiprocessing.Queue"):
+    """Child process: serve until killed"""
+    server = make_server(options)
+    ready.put(server.base_url)
+    server.serve_forever()
+
+
+class BackgroundServer:
+    """
+    A fake server in its own process
+
+    Keeps the server off the scraper's GIL, so benchmarks measure the
+    scraper rather than the two competing for one interpreter.
+    """
+
+    def __init__(self, options: ServerOptions = ServerOptions()):
+        """
+        Start the server
+
+        Args:
+            options: Server options
+        """
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self._process = context.Process(
+            target=_serve, args=(options, ready), name="fake-server", daemon=True
+        )
+        self._process.start()
+        self.base_url = ready.get(timeout=30)
+        self.results_url = self.base_url + RESULTS_PATH
+        self.autonomy_url = self.base_url + AUTONOMY_PATH
+
+    def close(self):
+        """Stop the server"""
+        self._process.kill()
+        self._process.join()
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8084, help="port (default: 8084)")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="mean seconds before each answer, ±50%% (default: 0)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="fraction of requests answered with a 503 (default: 0)",
+    )
+    parser.add_argument(
+        "--drop-rate",
+        type=float,
+        default=0.0,
+        help="fraction of connections hung up on without an answer (default: 0)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="synthetic students to serve (default: 0)"
+    )
+    parser.add_argument(
+        "--vacancy-run",
+        type=int,
+        default=Roster.vacancy_run,
+        metavar="N",
+        help=f"longest run of vacant rolls (default: {Roster.vacancy_run})",
+    )
+    parser.add_argument(
+        "--unpublish",
+        action="append",
+        default=[],
+        metavar="SEM",
+        help="semester value to show no results for, as if not yet published",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--record", metavar="CASSETTE", help="proxy to the real forms, recording"
+    )
+    mode.add_argument("--replay", metavar="CASSETTE", help="serve a recording")
+    parser.add_argument(
+        "--upstream",
+        action="append",
+        metavar="URL",
+        help=f"real form to record from (default: {RESULTS_URL} and {AUTONOMY_URL})",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="log requests")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    options = ServerOptions(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+        unpublished=frozenset(args.unpublish),
+        vacancy_run=args.vacancy_run,
+        cassette=args.record or args.replay,
+        upstreams=tuple(args.upstream or (RESULTS_URL, AUTONOMY_URL))
+        if args.record
+        else (),
+    )
+    server = make_server(options)
+    if args.record:
+        print(f"🔴 Recording to {args.record} from {', '.join(options.upstreams)}")
+    elif args.replay:
+        recorded = len(server.backend.cassette)
+        print(f"▶️  Replaying {recorded} responses from {args.replay}")
+    else:
+        print(f"🧪 Serving synthetic students (seed {args.seed})")
+    print(f"   results form:  {server.results_url}")
+    print(f"   autonomy form: {server.autonomy_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n✅ Answered {server.requests} requests")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
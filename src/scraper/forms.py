@@ -0,0 +1,174 @@
+# Parsing of the ASP.NET result form: hidden state, inputs and result labels
+
+import logging
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Element ids of the result page
+NAME_LABEL = "lblname"
+BRANCH_LABEL = "lbltop"
+VALUE_LABEL = "lblbottom{}"
+
+# Placeholder for values the result page does not show
+MISSING_VALUE = "N/A"
+
+# Elements that never have a closing tag
+_VOID_TAGS = {"input", "br", "img", "hr", "meta", "link", "col", "area", "base"}
+
+
+@dataclass
+class FormPage:
+    """A parsed page of an ASP.NET form"""
+
+    action: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+    buttons: Dict[str, str] = field(default_factory=dict)
+    texts: Dict[str, str] = field(default_factory=dict)
+
+    def text(self, element_id: str) -> Optional[str]:
+        """
+        Get the whitespace-normalised text of an element
+
+        Args:
+            element_id: Element id
+
+        Returns:
+            The element's text, or None if the page has no such element
+        """
+        return self.texts.get(element_id)
+
+
+class _FormParser(HTMLParser):
+    """Collects inputs, selects, buttons and the text of every element with an id"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.page = FormPage()
+        # Open elements as (tag, id); text is added to every open id
+        self._open: List[tuple] = []
+        self._chunks: Dict[str, List[str]] = {}
+        self._select: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        element_id = attrs.get("id")
+
+        if tag == "form" and self.page.action is None:
+            self.page.action = attrs.get("action")
+        elif tag == "input":
+            self._input(attrs)
+        elif tag == "select":
+            self._select = attrs.get("name")
+        elif tag == "option" and self._select:
+            # The first option, or the selected one, is what the browser posts
+            if "selected" in attrs or self._select not in self.page.fields:
+                self.page.fields[self._select] = attrs.get("value", "")
+
+        if element_id is not None:
+            self._chunks.setdefault(element_id, [])
+        if tag not in _VOID_TAGS:
+            self._open.append((tag, element_id))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS and self._open and self._open[-1][0] == tag:
+            self._open.pop()
+
+    def handle_endtag(self, tag):
+        if tag == "select":
+            self._select = None
+        # Pop up to the matching tag, tolerating unclosed children
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index][0] == tag:
+                del self._open[index:]
+                break
+
+    def handle_data(self, data):
+        for _, element_id in self._open:
+            if element_id is not None:
+                self._chunks[element_id].append(data)
+
+    def _input(self, attrs):
+        name = attrs.get("name")
+        if not name:
+            return
+        kind = attrs.get("type", "text").lower()
+        if kind in ("submit", "button", "image", "reset"):
+            self.page.buttons[name] = attrs.get("value", "")
+        elif kind in ("checkbox", "radio"):
+            if "checked" in attrs:
+                self.page.fields[name] = attrs.get("value", "on")
+        else:
+            self.page.fields[name] = attrs.get("value", "")
+
+    def close(self):
+        super().close()
+        self.page.texts = {
+            element_id: " ".join("".join(chunks).split())
+            for element_id, chunks in self._chunks.items()
+        }
+
+
+def parse_form(html: str) -> FormPage:
+    """
+    Parse a form page
+
+    Args:
+        html: Page source
+
+    Returns:
+        The page's form fields, buttons and element texts
+    """
+    parser = _FormParser()
+    parser.feed(html)
+    parser.close()
+    return parser.page
+
+
+@dataclass
+class SemesterResult:
+    """What the result page shows for one roll and semester"""
+
+    name: str
+    branch: str
+    values: List[str]
+
+
+def _last_word(text: Optional[str]) -> str:
+    """The value part of a "<label> : <value>" text"""
+    words = (text or "").split()
+    return words[-1] if words else MISSING_VALUE
+
+
+def parse_result(page: FormPage, labels: int) -> Optional[SemesterResult]:
+    """
+    Read a student's result from a result page
+
+    The name label reads "Name : <name>", the other labels end with the
+    value, so they are split the same way the Selenium scripts did.
+
+    Args:
+        page: Parsed result page
+        labels: Number of lblbottom labels holding values
+
+    Returns:
+        The result, or None if the page shows no student
+    """
+    name = page.text(NAME_LABEL)
+    if not name:
+        return None
+    values = [
+        _last_word(page.text(VALUE_LABEL.format(i))) for i in range(1, labels + 1)
+    ]
+    if all(value == MISSING_VALUE for value in values):
+        return None
+    return SemesterResult(
+        name=" ".join(name.split()[2:]).title(),
+        branch=page.text(BRANCH_LABEL) or MISSING_VALUE,
+        values=values,
+    )
+
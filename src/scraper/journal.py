@@ -0,0 +1,281 @@
+# Durable checkpoint journal of scraped (roll, semester) outcomes
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from src.scraper.engine import Query, ResultsScraper
+from src.scraper.forms import SemesterResult
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default journal, shared by every batch
+JOURNAL_PATH = os.path.join("data", "scrape_journal.db")
+
+# Outcome of a query: the form showed a result, showed nothing, or never answered
+FOUND = "found"
+MISSING = "missing"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    batch TEXT NOT NULL,
+    roll TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    status TEXT NOT NULL,
+    name TEXT,
+    branch TEXT,
+    grades TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (batch, roll, semester)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS autonomy_rolls (
+    college_roll TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    autonomy_roll TEXT,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class Outcome:
+    """A journaled answer to one query"""
+
+    status: str
+    # The semester's result, or the autonomy roll for roll lookups
+    result: Union[SemesterResult, str, None] = None
+
+
+class Journal:
+    """
+    Append-as-you-go record of every query a scrape has answered
+
+    Every outcome is committed as soon as it arrives, so a crashed or
+    interrupted run loses nothing and the next run picks up from it. The
+    same file caches college roll → autonomy roll lookups. A journal can
+    be shared between threads.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        """
+        Open (or create) a journal
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def outcomes(self, batch: str) -> Dict[Tuple[str, str], Outcome]:
+        """
+        Load every journaled outcome of a batch
+
+        Args:
+            batch: Batch year
+
+        Returns:
+            Outcomes keyed by (roll, semester)
+        """
+        outcomes = {}
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT roll, semester, status, name, branch, grades "
+                "FROM outcomes WHERE batch = ?",
+                (batch,),
+            ).fetchall()
+        for roll, semester, status, name, branch, grades in rows:
+            result = None
+            if status == FOUND:
+                result = SemesterResult(name, branch, json.loads(grades))
+            outcomes[roll, semester] = Outcome(status, result)
+        return outcomes
+
+    def record(self, batch: str, query: Query, outcome: Outcome):
+        """
+        Durably record the outcome of a query
+
+        Args:
+            batch: Batch year
+            query: The query
+            outcome: What the form answered
+        """
+        result = outcome.result
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    batch,
+                    query.roll,
+                    query.semester,
+                    outcome.status,
+                    result.name if result else None,
+                    result.branch if result else None,
+                    json.dumps(result.values) if result else None,
+                    time.time(),
+                ),
+            )
+
+    def forget(self, batch: str):
+        """
+        Drop every outcome of a batch, for a fresh scrape
+
+        Args:
+            batch: Batch year
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM outcomes WHERE batch = ?", (batch,))
+
+    def autonomy_rolls(self) -> Dict[str, Outcome]:
+        """
+        Load every cached autonomy roll lookup
+
+        Returns:
+            Outcomes keyed by college roll; found ones carry the autonomy
+            roll as their result
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT college_roll, status, autonomy_roll FROM autonomy_rolls"
+            ).fetchall()
+        return {
+            college: Outcome(status, autonomy) for college, status, autonomy in rows
+        }
+
+    def record_autonomy_roll(self, college_roll: str, outcome: Outcome):
+        """
+        Durably cache an autonomy roll lookup
+
+        Args:
+            college_roll: College roll looked up
+            outcome: FOUND with the autonomy roll as result, MISSING or FAILED
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO autonomy_rolls VALUES (?, ?, ?, ?)",
+                (college_roll, outcome.status, outcome.result, time.time()),
+            )
+
+    def close(self):
+        """Close the database"""
+        self._connection.close()
+
+
+class Checkpoint:
+    """
+    Runs queries through a journal, skipping the ones already answered
+
+    A resumed run reuses every found or missing outcome and only retries
+    queries that failed or were never sent. In incremental mode, semesters
+    of known students that showed nothing last time are asked again, to pick
+    up results published since.
+    """
+
+    def __init__(self, journal: Journal, batch: str, incremental: bool = False):
+        """
+        Initialize the checkpoint
+
+        Args:
+            journal: Journal to read and append to
+            batch: Batch year
+            incremental: Re-query missing semesters of known students
+        """
+        self.journal = journal
+        self.batch = batch
+        self.incremental = incremental
+        self._outcomes = journal.outcomes(batch)
+        self.reused = 0
+        self.fetched = 0
+        if self._outcomes:
+            logger.info(
+                f"Resuming batch {batch} with {len(self._outcomes)} journaled queries"
+            )
+
+    def _reusable(self, outcome: Optional[Outcome], known_student: bool) -> bool:
+        if outcome is None or outcome.status == FAILED:
+            return False
+        if outcome.status == MISSING and known_student and self.incremental:
+            return False
+        return True
+
+    def try_fetch_all(
+        self,
+        scraper: ResultsScraper,
+        queries: Iterable[Query],
+        known_students: bool = True,
+    ) -> Iterator[Tuple[Query, Optional[SemesterResult], bool]]:
+        """
+        Answer queries from the journal, fetching and journaling the rest
+
+        Args:
+            scraper: Scraper for queries that need the form
+            queries: Lookups to run
+            known_students: Whether the rolls are known to exist, so that
+                their missing semesters are re-queried in incremental mode
+
+        Returns:
+            Iterator of (query, result, whether the form answered), pulling
+            queries lazily so a streamed input starts being answered before
+            it ends
+        """
+        journaled: Deque[Tuple[Query, Optional[SemesterResult], bool]] = deque()
+
+        def pending() -> Iterator[Query]:
+            for query in queries:
+                outcome = self._outcomes.get((query.roll, query.semester))
+                if self._reusable(outcome, known_students):
+                    self.reused += 1
+                    journaled.append((query, outcome.result, True))
+                else:
+                    yield query
+
+        for query, result, answered in scraper.try_fetch_all(pending()):
+            while journaled:
+                yield journaled.popleft()
+            if not answered:
+                outcome = Outcome(FAILED)
+            elif result is None:
+                outcome = Outcome(MISSING)
+            else:
+                outcome = Outcome(FOUND, result)
+            self.journal.record(self.batch, query, outcome)
+            self._outcomes[query.roll, query.semester] = outcome
+            self.fetched += 1
+            yield query, result, answered
+        while journaled:
+            yield journaled.popleft()
+
+    def fetch_all(
+        self,
+        scraper: ResultsScraper,
+        queries: Iterable[Query],
+        known_students: bool = True,
+    ) -> Iterator[Tuple[Query, Optional[SemesterResult]]]:
+        """
+        Answer queries from the journal, fetching and journaling the rest
+
+        Failed queries are yielded with a None result, see try_fetch_all.
+
+        Args:
+            scraper: Scraper for queries that need the form
+            queries: Lookups to run
+            known_students: Whether the rolls are known to exist, so that
+                their missing semesters are re-queried in incremental mode
+
+        Returns:
+            Iterator of (query, result)
+        """
+        for query, result, _ in self.try_fetch_all(scraper, queries, known_students):
+            yield query, result
@@ -0,0 +1,336 @@
+"""
+Turn scraped grades into the final.csv files the app serves
+
+    python -m src.scraper.pipeline            # every batch, in parallel
+    python -m src.scraper.pipeline 2024 --input grades.csv
+
+Each batch streams from its grades_<batch>.csv through parse → drop
+students without grades → branch extraction → YGPA derivation → PII
+stripping → write, one row at a time and without intermediate files.
+"""
+
+import argparse
+import csv
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from models.dataset import MISSING_VALUE, is_numeric_column
+from src.scraper.batches import BATCHES
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# "First Year B.Tech in Computer Science & Engineering (CSE) ..." → the branch
+BRANCH_REGEX = re.compile(r"First Year [^ ]+ in (.+?) \([A-Z]+\)")
+
+
+@dataclass
+class Stream:
+    """A header and a lazy iterator over the rows under it"""
+
+    columns: List[str]
+    rows: Iterator[List[str]]
+
+
+# A stage maps one stream to the next without materialising it
+Stage = Callable[[Stream], Stream]
+
+
+def safe_float(value: str) -> Optional[float]:
+    """
+    Parse a grade
+
+    Args:
+        value: Cell text
+
+    Returns:
+        The number, or None for N/A and other non-numbers
+    """
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def branch_name(text: str) -> str:
+    """
+    Pull the branch out of the result page's programme line
+
+    Args:
+        text: e.g. "First Year B.Tech in Computer Science & Engineering (CSE)"
+
+    Returns:
+        The branch, or the text unchanged if it does not look like one
+    """
+    match = BRANCH_REGEX.search(text)
+    if match:
+        return match.group(1).strip()
+    # Fall back to whatever follows " in ", up to the semester
+    if " in " in text:
+        return text.split(" in ", 1)[1].split(" Second Semester")[0].strip()
+    return text
+
+
+def read_csv(path: str) -> Stream:
+    """
+    Parse a CSV file lazily
+
+    Args:
+        path: CSV path
+
+    Returns:
+        Stream over the file's rows; the file is only open while they are
+        being pulled, and closes when they run out or the stream is dropped
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        columns = next(csv.reader(f), None)
+    if columns is None:
+        return Stream([], iter(()))
+
+    def rows() -> Iterator[List[str]]:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if row:
+                    yield row
+
+    return Stream(columns, rows())
+
+
+def drop_empty() -> Stage:
+    """Drop students without a single grade"""
+
+    def stage(stream: Stream) -> Stream:
+        grades = [i for i, c in enumerate(stream.columns) if is_numeric_column(c)]
+
+        def rows():
+            for row in stream.rows:
+                if any(row[i].strip() != MISSING_VALUE for i in grades):
+                    yield row
+
+        return Stream(stream.columns, rows())
+
+    return stage
+
+
+def extract_branch(column: str, rename: Optional[str] = None) -> Stage:
+    """
+    Replace a programme description column with the branch name
+
+    Args:
+        column: Column holding the result page's programme line
+        rename: New column name, e.g. "Branch"
+    """
+
+    def stage(stream: Stream) -> Stream:
+        index = stream.columns.index(column)
+        columns = list(stream.columns)
+        columns[index] = rename or column
+
+        def rows():
+            for row in stream.rows:
+                row[index] = branch_name(row[index])
+                yield row
+
+        return Stream(columns, rows())
+
+    return stage
+
+
+def derive_ygpa(name: str, sources: Sequence[str], after: str) -> Stage:
+    """
+    Add a YGPA column averaging two semesters' grades
+
+    Args:
+        name: New column name
+        sources: Columns to average
+        after: Column to insert the new one after
+    """
+
+    def stage(stream: Stream) -> Stream:
+        indexes = [stream.columns.index(column) for column in sources]
+        position = stream.columns.index(after) + 1
+        columns = stream.columns[:position] + [name] + stream.columns[position:]
+
+        def rows():
+            for row in stream.rows:
+                values = [safe_float(row[i]) for i in indexes]
+                if None in values:
+                    ygpa = MISSING_VALUE
+                else:
+                    ygpa = f"{sum(values) / len(values):.2f}"
+                row.insert(position, ygpa)
+                yield row
+
+        return Stream(columns, rows())
+
+    return stage
+
+
+def strip_pii(columns: Sequence[str]) -> Stage:
+    """
+    Drop identifying columns that are not published
+
+    Args:
+        columns: Columns to remove
+    """
+
+    def stage(stream: Stream) -> Stream:
+        keep = [i for i, c in enumerate(stream.columns) if c not in columns]
+
+        def rows():
+            for row in stream.rows:
+                yield [row[i] for i in keep]
+
+        return Stream([stream.columns[i] for i in keep], rows())
+
+    return stage
+
+
+def write_csv(stream: Stream, path: str) -> int:
+    """
+    Write a stream, replacing the file only once it is complete
+
+    Args:
+        stream: Rows to write
+        path: Output CSV path
+
+    Returns:
+        Number of rows written
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    count = 0
+    with open(temp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(stream.columns)
+        for row in stream.rows:
+            writer.writerow(row)
+            count += 1
+    os.replace(temp_path, path)
+    return count
+
+
+def run(stream: Stream, stages: Iterable[Stage]) -> Stream:
+    """
+    Chain stages over a stream
+
+    Args:
+        stream: Source stream
+        stages: Stages in order
+
+    Returns:
+        The final stream; nothing is read until it is consumed
+    """
+    for stage in stages:
+        stream = stage(stream)
+    return stream
+
+
+# How each batch's scraped grades become its final.csv
+PIPELINES: Dict[str, List[Stage]] = {
+    "2022": [
+        drop_empty(),
+        extract_branch("Department", rename="Branch"),
+        strip_pii(["Autonomy Roll"]),
+    ],
+    "2023": [
+        drop_empty(),
+        extract_branch("Department"),
+    ],
+    "2024": [
+        drop_empty(),
+        extract_branch("Branch"),
+        derive_ygpa("yGPA 1", ["GPA Sem 1", "GPA Sem 2"], after="GPA Sem 2"),
+        strip_pii(["Autonomy Roll"]),
+    ],
+}
+
+
+def process_batch(batch: str, source: str, target: str) -> int:
+    """
+    Run a batch's pipeline from its scraped CSV to its final CSV
+
+    Args:
+        batch: Batch year
+        source: Scraped grades CSV
+        target: Output CSV
+
+    Returns:
+        Number of rows written
+    """
+    count = write_csv(run(read_csv(source), PIPELINES[batch]), target)
+    logger.debug(f"Batch {batch}: wrote {count} rows to {target}")
+    return count
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "batches",
+        nargs="*",
+        help=f"batches to process (default: {', '.join(sorted(PIPELINES))})",
+    )
+    parser.add_argument(
+        "--input", help="scraped CSV, for a single batch (default: grades_<batch>.csv)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="data",
+        help="write <dir>/<batch>/final.csv (default: data)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="processes to run batches in (default: one per batch, up to CPUs)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    batches = args.batches or sorted(PIPELINES)
+    unknown = [batch for batch in batches if batch not in PIPELINES]
+    if unknown:
+        print(f"❌ No pipeline for batch {', '.join(unknown)}")
+        sys.exit(1)
+    if args.input and len(batches) != 1:
+        print("❌ --input needs exactly one batch")
+        sys.exit(1)
+
+    jobs = {
+        batch: (
+            args.input or BATCHES[batch].output,
+            os.path.join(args.output_dir, batch, "final.csv"),
+        )
+        for batch in batches
+    }
+    missing = [source for source, _ in jobs.values() if not os.path.exists(source)]
+    if missing:
+        print(f"❌ Scraped data not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    workers = args.workers or min(len(jobs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            batch: executor.submit(process_batch, batch, source, target)
+            for batch, (source, target) in jobs.items()
+        }
+        for batch, future in futures.items():
+            print(f"📋 {batch}: {future.result()} rows → {jobs[batch][1]}")
+    print(f"\n✅ Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
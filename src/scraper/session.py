@@ -0,0 +1,261 @@
+# Connection-pooled HTTP session for posting to an ASP.NET form
+
+import gzip
+import http.client
+import logging
+import queue
+import threading
+import time
+import zlib
+from http.cookies import SimpleCookie
+from typing import Dict, Optional
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from src.scraper.forms import FormPage, parse_form
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"
+)
+
+
+class ScraperError(Exception):
+    """Raised when a page cannot be fetched after all retries"""
+
+    pass
+
+
+class FormSession:
+    """
+    Keep-alive HTTP session for one ASP.NET form page
+
+    Connections are pooled and reused across threads. Every thread keeps
+    the blank form it loaded (with its __VIEWSTATE/__EVENTVALIDATION) and
+    posts every query against it, which is what a browser does after
+    "back" and "reset" but without reloading the page each time.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 8,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        """
+        Initialize the session
+
+        Args:
+            url: Form page URL
+            pool_size: Maximum number of open connections
+            timeout: Socket timeout in seconds
+            retries: Attempts per request after the first one
+            backoff: Base delay in seconds, doubled after every failed attempt
+            user_agent: User-Agent header to send
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL: {url}")
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.user_agent = user_agent
+
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path or "/"
+        if parts.query:
+            self._path += f"?{parts.query}"
+
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._cookies: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.requests = 0
+        self.connections = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Open a new connection to the form's host"""
+        cls = (
+            http.client.HTTPSConnection
+            if self._scheme == "https"
+            else http.client.HTTPConnection
+        )
+        with self._lock:
+            self.connections += 1
+        return cls(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        """Take an idle connection from the pool or open one"""
+        self._slots.acquire()
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, connection: http.client.HTTPConnection, reuse: bool):
+        """Return a connection to the pool, or close it"""
+        if reuse:
+            self._pool.put(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def _headers(self, body: Optional[str]) -> Dict[str, str]:
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "Referer": self.url,
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        with self._lock:
+            if self._cookies:
+                headers["Cookie"] = "; ".join(
+                    f"{name}={value}" for name, value in self._cookies.items()
+                )
+        return headers
+
+    def _store_cookies(self, response: http.client.HTTPResponse):
+        for header in response.headers.get_all("Set-Cookie") or ():
+            cookie = SimpleCookie()
+            try:
+                cookie.load(header)
+            except Exception:
+                logger.debug(f"Ignoring unparsable cookie: {header}")
+                continue
+            with self._lock:
+                for name, morsel in cookie.items():
+                    self._cookies[name] = morsel.value
+
+    @staticmethod
+    def _decode(response: http.client.HTTPResponse, payload: bytes) -> str:
+        encoding = (response.getheader("Content-Encoding") or "").lower()
+        if encoding == "gzip":
+            payload = gzip.decompress(payload)
+        elif encoding == "deflate":
+            payload = zlib.decompress(payload)
+        charset = response.headers.get_content_charset() or "utf-8"
+        return payload.decode(charset, errors="replace")
+
+    def request(self, method: str, body: Optional[str] = None) -> str:
+        """
+        Send a request to the form page, retrying transient failures
+
+        Args:
+            method: "GET" or "POST"
+            body: Form-encoded body for POST
+
+        Returns:
+            Decoded response body
+
+        Raises:
+            ScraperError: If every attempt fails
+        """
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            connection = self._acquire()
+            reuse = False
+            try:
+                connection.request(
+                    method,
+                    self._path,
+                    body=body.encode("ascii") if body is not None else None,
+                    headers=self._headers(body),
+                )
+                response = connection.getresponse()
+                payload = response.read()
+                reuse = not response.will_close
+                self._store_cookies(response)
+                with self._lock:
+                    self.requests += 1
+                if response.status >= 500:
+                    last_error = ScraperError(f"{method} {self.url}: {response.status}")
+                    continue
+                if response.status != 200:
+                    raise ScraperError(f"{method} {self.url}: {response.status}")
+                return self._decode(response, payload)
+            except (OSError, http.client.HTTPException) as e:
+                last_error = e
+                logger.debug(f"{method} {self.url} failed (attempt {attempt + 1}): {e}")
+            finally:
+                self._release(connection, reuse)
+        raise ScraperError(
+            f"{method} {self.url} failed after {self.retries + 1} attempts: "
+            f"{last_error}"
+        )
+
+    def form(self) -> FormPage:
+        """
+        Get this thread's blank form, loading it on first use
+
+        Returns:
+            The parsed form page
+        """
+        page = getattr(self._local, "form", None)
+        if page is None:
+            page = parse_form(self.request("GET"))
+            if page.action:
+                # Post back to wherever the form says, like a browser would
+                action = urlsplit(urljoin(self.url, page.action))
+                self._path = action.path + (f"?{action.query}" if action.query else "")
+            self._local.form = page
+        return page
+
+    def submit(
+        self, values: Dict[str, str], button: str, page: Optional[FormPage] = None
+    ) -> FormPage:
+        """
+        Fill in the form and press a button
+
+        Args:
+            values: Field values to set, e.g. {"roll": ..., "sem": "2"}
+            button: Name of the submit button to press
+            page: Page to post back from, for multi-step forms (default: this
+                thread's blank form)
+
+        Returns:
+            The parsed response page
+        """
+        if page is not None:
+            return parse_form(self.request("POST", self._encode(page, values, button)))
+        for reload in (False, True):
+            page = self.form()
+            try:
+                return parse_form(
+                    self.request("POST", self._encode(page, values, button))
+                )
+            except ScraperError:
+                if reload:
+                    raise
+                # Persistent failures after a postback usually mean the view
+                # state expired, so load a fresh form and try once more
+                self._local.form = None
+
+    @staticmethod
+    def _encode(page: FormPage, values: Dict[str, str], button: str) -> str:
+        """Form body posting back a page's fields with values and a button"""
+        fields = {**page.fields, **values}
+        fields[button] = page.buttons.get(button, button)
+        return urlencode(fields)
+
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,103 @@
+# Roll discovery and publication probing through outages and sparse samples
+
+from dataclasses import replace
+
+from src.scraper.batches import (
+    BATCHES,
+    Semester,
+    StudentRecord,
+    discover_rolls,
+    published_semesters,
+)
+from src.scraper.forms import SemesterResult
+
+SPEC = replace(BATCHES["2023"], branches=range(1, 4), roll_numbers=range(1, 61))
+
+
+class Form:
+    """Answers from a table of results, except during outages and for broken rolls"""
+
+    def __init__(self, results, down=(), broken=()):
+        self.results = results
+        # Calls (0-based) during which every query fails
+        self.down = set(down)
+        self.broken = set(broken)
+        self.calls = 0
+
+    def try_fetch_all(self, queries):
+        down = self.calls in self.down
+        self.calls += 1
+        for query in queries:
+            if down or query.roll in self.broken:
+                yield query, None, False
+            else:
+                yield query, self.results.get((query.roll, query.semester)), True
+
+    def fetch_all(self, queries):
+        for query, result, _ in self.try_fetch_all(queries):
+            yield query, result
+
+
+def first_semester(rolls):
+    value = SPEC.semesters[0].value
+    labels = len(SPEC.semesters[0].columns)
+    return {
+        (roll, value): SemesterResult(f"Student {roll}", "CSE", ["9"] * labels)
+        for roll in rolls
+    }
+
+
+LIVE = [SPEC.roll(1, n) for n in range(1, 41)] + [
+    SPEC.roll(3, n) for n in (*range(1, 6), *range(8, 16))
+]
+
+
+def test_outage_during_the_search_does_not_end_a_branch():
+    for down in ((0,), (1, 2), (2, 3, 4), (5,)):
+        records, missing = discover_rolls(
+            SPEC, Form(first_semester(LIVE), down=down)
+        )
+
+        assert [record.roll for record in records] == LIVE
+        assert not set(missing) & set(LIVE)
+
+
+def test_rolls_that_keep_failing_are_listed_missing():
+    broken = SPEC.roll(1, 3)
+    records, missing = discover_rolls(
+        SPEC, Form(first_semester(LIVE), broken={broken})
+    )
+
+    assert [record.roll for record in records] == [r for r in LIVE if r != broken]
+    assert broken in missing
+
+
+LISTED = replace(
+    BATCHES["2024"], semesters=(Semester("2", ("GPA Sem 1",)), Semester("4", ()))
+)
+
+
+def listed_students(count):
+    return [
+        StudentRecord(ids=(f"2451{n:03}", f"1262400{n:04}"), roll=f"1262400{n:04}")
+        for n in range(1, count + 1)
+    ]
+
+
+def test_every_listed_student_is_sampled():
+    records = listed_students(3)
+    result = SemesterResult("Chandni", "IT", ["8.2"])
+    form = Form({(records[2].roll, "2"): result})
+
+    published = published_semesters(LISTED, form, records, LISTED.semesters)
+
+    assert [semester.value for semester in published] == ["2"]
+    assert records[2].name == "Chandni"
+
+
+def test_silent_samples_keep_every_semester():
+    records = listed_students(3)
+
+    published = published_semesters(LISTED, Form({}), records, LISTED.semesters)
+
+    assert published == list(LISTED.semesters)
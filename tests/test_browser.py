@@ -0,0 +1,72 @@
+# Browser pool replacing crashed and hung workers
+
+import os
+import time
+from functools import partial
+
+from src.scraper.browser import BrowserPool
+from src.scraper.engine import Query
+from src.scraper.forms import SemesterResult
+
+ROLLS = [f"126230010{n:02}" for n in range(1, 13)]
+CRASH, HANG, BROKEN = ROLLS[2], ROLLS[7], ROLLS[10]
+
+
+class FlakyBrowser:
+    """
+    Answers from the roll number, crashing or hanging once on some rolls
+
+    Runs in the worker processes, so what already happened is kept as marker
+    files rather than in memory.
+    """
+
+    def __init__(self, markers, url, headless, timeout):
+        self.markers = markers
+
+    def first_time(self, roll):
+        path = os.path.join(self.markers, roll)
+        if os.path.exists(path):
+            return False
+        open(path, "w").close()
+        return True
+
+    def query(self, query):
+        if query.roll == CRASH and self.first_time(query.roll):
+            os._exit(1)
+        if query.roll == HANG and self.first_time(query.roll):
+            time.sleep(60)
+        if query.roll == BROKEN:
+            raise RuntimeError("form error")
+        return SemesterResult(f"Student {query.roll}", "CSE", [query.roll[-2:]])
+
+    def reload(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+def test_crashed_and_hung_workers_are_replaced(tmp_path):
+    queries = [Query(roll, "2", 1) for roll in ROLLS]
+    pool = BrowserPool(
+        "http://results.invalid/",
+        workers=3,
+        rate=0,
+        job_timeout=2,
+        browser_factory=partial(FlakyBrowser, str(tmp_path)),
+    )
+    try:
+        answers = list(pool.try_fetch_all(queries))
+    finally:
+        pool.close()
+
+    # Every query is answered exactly once, whichever worker got it
+    assert sorted(query.roll for query, _, _ in answers) == ROLLS
+    assert {query.roll: (result, answered) for query, result, answered in answers} == {
+        roll: (None, False)
+        if roll == BROKEN
+        else (SemesterResult(f"Student {roll}", "CSE", [roll[-2:]]), True)
+        for roll in ROLLS
+    }
+    assert pool.failed == [Query(BROKEN, "2", 1)]
+    assert pool.restarts == 2
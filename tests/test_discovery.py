@@ -0,0 +1,77 @@
+# Galloping search for the last populated roll of each branch
+
+import pytest
+
+from src.scraper.discovery import find_ranges, last_live
+
+
+def search(start, limit, gap, live):
+    """Run last_live against a set of populated rolls, counting probes"""
+    probes = []
+    known = {}
+    generator = last_live(start, limit, gap, known)
+    try:
+        wanted = next(generator)
+        while True:
+            probes.extend(wanted)
+            wanted = generator.send({n: n in live for n in wanted})
+    except StopIteration as stop:
+        return stop.value, probes
+
+
+@pytest.mark.parametrize("end", [1, 2, 3, 7, 8, 9, 64, 100, 199, 200])
+def test_finds_the_end_of_a_full_branch(end):
+    found, probes = search(1, 200, 4, set(range(1, end + 1)))
+
+    assert found == end
+    assert len(probes) == len(set(probes))
+
+
+def test_skips_gaps_shorter_than_the_window():
+    live = set(range(1, 121)) - {1, 2, 3, 40, 41, 42, 97, 98, 99}
+
+    assert search(1, 200, 4, live)[0] == 120
+
+
+def test_finds_a_straggler_past_a_short_gap():
+    assert search(1, 200, 4, set(range(1, 51)) | {54})[0] == 54
+
+
+def test_empty_and_out_of_range_branches():
+    assert search(1, 200, 4, set()) == (0, [1, 2, 3, 4])
+    assert search(5, 4, 4, {5}) == (4, [])
+    assert search(1, 0, 4, {1}) == (0, [])
+
+
+def test_probes_grow_logarithmically():
+    _, probes = search(1, 1000, 4, set(range(1, 700)))
+
+    assert len(probes) < 40
+
+
+def test_find_ranges_batches_branches_into_rounds():
+    live = {
+        51: set(range(1, 61)),
+        52: set(),
+        53: set(range(4, 9)),
+        54: set(range(1, 201)),
+    }
+    rounds = []
+
+    def probe(pairs):
+        rounds.append(pairs)
+        return {(b, n): n in live[b] for b, n in pairs}
+
+    ends = find_ranges(live, 1, 200, 4, probe)
+
+    assert ends == {51: 60, 52: 0, 53: 8, 54: 200}
+    probed = [pair for pairs in rounds for pair in pairs]
+    assert len(probed) == len(set(probed))
+    assert len(rounds) < 20
+
+
+def test_find_ranges_with_start_past_limit():
+    def probe(pairs):
+        raise AssertionError(f"nothing to probe, got {pairs}")
+
+    assert find_ranges([51, 52], 10, 9, 4, probe) == {51: 9, 52: 9}
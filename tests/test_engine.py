@@ -0,0 +1,70 @@
+# Concurrent queries against the synthetic results form
+
+import threading
+import time
+from contextlib import contextmanager
+
+from src.scraper.batches import BATCHES
+from src.scraper.engine import Query, RateLimiter, ResultsScraper
+from src.scraper.fake_server import ServerOptions, make_server
+from src.scraper.session import FormSession
+
+SPEC = BATCHES["2023"]
+QUERIES = [
+    Query(SPEC.roll(branch, number), semester.value, len(semester.columns))
+    for branch in (1, 2)
+    for number in range(1, 26)
+    for semester in SPEC.semesters
+]
+
+
+@contextmanager
+def serve(**options):
+    server = make_server(ServerOptions(seed=2, **options))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch(url, concurrency, **session_options):
+    session = FormSession(url, pool_size=concurrency, **session_options)
+    scraper = ResultsScraper(url, concurrency=concurrency, rate=0, session=session)
+    try:
+        return {
+            (query.roll, query.semester): result
+            for query, result in scraper.fetch_all(QUERIES)
+        }
+    finally:
+        scraper.close()
+
+
+def test_concurrent_results_match_serial():
+    with serve() as server:
+        serial = fetch(server.results_url, 1)
+        concurrent = fetch(server.results_url, 16)
+
+    assert len(serial) == len(QUERIES)
+    assert any(result is not None for result in serial.values())
+    assert concurrent == serial
+
+
+def test_transient_errors_are_retried():
+    with serve() as server:
+        expected = fetch(server.results_url, 8)
+    with serve(error_rate=0.2, drop_rate=0.05) as server:
+        flaky = fetch(server.results_url, 8, retries=8, backoff=0.001)
+
+    assert flaky == expected
+
+
+def test_rate_limiter_spaces_requests_after_a_burst():
+    limiter = RateLimiter(100, burst=5)
+    started = time.monotonic()
+    for _ in range(25):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 0.19
@@ -0,0 +1,100 @@
+# Conditional requests and content negotiation on the results routes
+
+import gzip
+
+import pytest
+
+from app import app
+
+URL = "/api/v1/batch/2023?per_page=20"
+SMALL_URL = "/api/v1/batch/2023?per_page=2&fields=Name&format=ndjson"
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def get(client, url, encoding, etag=None):
+    headers = {"Accept-Encoding": encoding}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+
+def test_revalidation_matches_the_held_variant(client):
+    first = get(client, URL, "gzip")
+    etag = first.headers["ETag"]
+
+    assert first.status_code == 200
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+
+    again = get(client, URL, "gzip", etag)
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert "Accept-Encoding" in again.headers["Vary"]
+    assert again.data == b""
+
+
+def test_identity_client_never_gets_a_compressed_variant(client):
+    compressed = get(client, URL, "gzip")
+    plain = get(client, URL, "identity", compressed.headers["ETag"])
+
+    assert plain.status_code == 200
+    assert "Content-Encoding" not in plain.headers
+    assert gzip.decompress(compressed.data) == plain.data
+
+    again = get(client, URL, "identity", plain.headers["ETag"])
+    assert again.status_code == 304
+    assert "Accept-Encoding" in again.headers["Vary"]
+
+
+def test_query_changes_the_etag(client):
+    first = get(client, URL, "identity")
+    other = get(client, URL + "&page=2", "identity", first.headers["ETag"])
+
+    assert other.status_code == 200
+    assert other.headers["ETag"] != first.headers["ETag"]
+
+
+def test_if_modified_since(client):
+    first = get(client, URL, "identity")
+    response = client.get(
+        URL, headers={"If-Modified-Since": first.headers["Last-Modified"]}
+    )
+
+    assert response.status_code == 304
+
+
+def test_small_streams_stay_uncompressed(client):
+    small = get(client, SMALL_URL, "gzip")
+
+    assert small.status_code == 200
+    assert "Content-Encoding" not in small.headers
+    assert len(small.data.splitlines()) == 2
+
+    # Plain tags of bodies too small to compress still revalidate
+    again = get(client, SMALL_URL, "gzip", small.headers["ETag"])
+    assert again.status_code == 304
+
+
+def test_table_page_revalidation(client):
+    first = get(client, "/results/batch/2023", "gzip")
+    again = get(client, "/results/batch/2023", "gzip", first.headers["ETag"])
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    assert "Accept-Encoding" in again.headers["Vary"]
+
+
+def test_pages_echoing_different_parameters_have_different_tags(client):
+    lower = get(client, "/results/batch/2023?search=das", "gzip")
+    upper = get(client, "/results/batch/2023?search=DAS", "gzip")
+
+    assert lower.headers["ETag"] != upper.headers["ETag"]
+    assert 'Search: "das"' in gzip.decompress(lower.data).decode("utf-8")
+    assert 'Search: "DAS"' in gzip.decompress(upper.data).decode("utf-8")
+
+    held = get(client, "/results/batch/2023?search=DAS", "gzip", lower.headers["ETag"])
+    assert held.status_code == 200
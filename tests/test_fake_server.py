@@ -0,0 +1,103 @@
+# Discovery against the synthetic forms finds every student
+
+import threading
+from dataclasses import replace
+
+import pytest
+
+from src.scraper.autonomy import COLLEGE_ROLLS, AutonomyResolver
+from src.scraper.batches import BATCHES, discover_rolls
+from src.scraper.benchmark import expected_rolls
+from src.scraper.engine import ResultsScraper
+from src.scraper.fake_server import ServerOptions, make_server
+from src.scraper.journal import Journal
+
+
+@pytest.fixture
+def server():
+    server = make_server(ServerOptions(seed=2))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def discover(server, spec):
+    scraper = ResultsScraper(server.results_url, concurrency=16, rate=0)
+    try:
+        records, _ = discover_rolls(spec, scraper)
+    finally:
+        scraper.close()
+    return {record.roll for record in records}
+
+
+def vacancy_runs(roster, spec):
+    """Lengths of the vacancy runs inside every branch, and leading ones"""
+    runs, leading = [], 0
+    for branch in spec.branches:
+        group = spec.roll(branch, 1)[:-3]
+        size, vacant = roster.size(group), roster.vacancies(group)
+        leading += bool(size and 1 in vacant)
+        run = 0
+        for number in range(1, size + 1):
+            if number in vacant:
+                run += 1
+            elif run:
+                runs.append(run)
+                run = 0
+    return runs, leading
+
+
+def test_roster_has_long_and_leading_vacancy_runs():
+    roster = ServerOptions(seed=2).roster
+    runs, leading = [], 0
+    for spec in BATCHES.values():
+        if spec.roll_prefix is not None:
+            batch_runs, batch_leading = vacancy_runs(roster, spec)
+            runs += batch_runs
+            leading += batch_leading
+    assert max(runs) >= 4
+    assert leading >= 1
+
+
+@pytest.mark.parametrize("batch", ["2021", "2022", "2023"])
+def test_discovery_finds_every_student(server, batch):
+    spec = BATCHES[batch]
+    expected = expected_rolls(server.backend.roster, spec)
+    assert expected
+    assert discover(server, spec) == expected
+
+
+def test_short_gap_tolerance_is_caught(server):
+    # The fake must be able to expose a scraper that gives up too early
+    spec = replace(BATCHES["2021"], max_gap=1)
+    expected = expected_rolls(server.backend.roster, spec)
+    assert discover(server, spec) < expected
+
+
+def resolve(server, journal):
+    resolver = AutonomyResolver(
+        server.autonomy_url, concurrency=16, rate=0, journal=journal
+    )
+    try:
+        found = dict(resolver.resolve(COLLEGE_ROLLS["2024"]))
+    finally:
+        resolver.close()
+    return found, resolver
+
+
+def test_autonomy_resolution_finds_every_student(server, tmp_path):
+    expected = expected_rolls(server.backend.roster, BATCHES["2024"])
+    journal = Journal(str(tmp_path / "journal.db"))
+    try:
+        found, resolver = resolve(server, journal)
+        assert set(found.values()) == expected
+        assert resolver.fetched and not resolver.cached
+
+        # A re-run answers everything from the journal
+        again, resolver = resolve(server, journal)
+        assert again == found
+        assert resolver.fetched == 0
+    finally:
+        journal.close()
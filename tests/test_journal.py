@@ -0,0 +1,129 @@
+# Resuming scrapes from the checkpoint journal
+
+from itertools import islice
+
+import pytest
+
+from src.scraper.engine import Query
+from src.scraper.forms import SemesterResult
+from src.scraper.journal import FOUND, MISSING, Checkpoint, Journal, Outcome
+
+
+class Form:
+    """Answers queries from a table, failing the rolls it is told to"""
+
+    def __init__(self, results, failing=()):
+        self.results = results
+        self.failing = set(failing)
+        self.asked = []
+
+    def try_fetch_all(self, queries):
+        for query in queries:
+            self.asked.append((query.roll, query.semester))
+            if query.roll in self.failing:
+                yield query, None, False
+            else:
+                yield query, self.results.get((query.roll, query.semester)), True
+
+
+def result(name):
+    return SemesterResult(name, "CSE", ["9.1"])
+
+
+RESULTS = {
+    ("101", "1"): result("Asha"),
+    ("101", "2"): result("Asha"),
+    ("102", "1"): result("Bikram"),
+}
+QUERIES = [
+    Query(roll, semester, 1) for roll in ("101", "102", "103") for semester in "12"
+]
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.db")
+
+
+def run(journal_path, form, queries=QUERIES, incremental=False, known=True):
+    journal = Journal(journal_path)
+    try:
+        checkpoint = Checkpoint(journal, "2023", incremental=incremental)
+        answers = {
+            (query.roll, query.semester): found
+            for query, found in checkpoint.fetch_all(form, queries, known)
+        }
+    finally:
+        journal.close()
+    return answers, checkpoint
+
+
+def test_resume_retries_only_failed_queries(journal_path):
+    first, checkpoint = run(journal_path, Form(RESULTS, failing={"102"}))
+    assert checkpoint.fetched == 6
+    assert first["101", "1"].name == "Asha"
+    assert first["102", "1"] is None
+
+    form = Form(RESULTS)
+    second, checkpoint = run(journal_path, form)
+    assert sorted(form.asked) == [("102", "1"), ("102", "2")]
+    assert (checkpoint.reused, checkpoint.fetched) == (4, 2)
+    assert second["101", "2"] == RESULTS["101", "2"]
+    assert second["102", "1"] == RESULTS["102", "1"]
+    assert second["103", "1"] is None
+
+    form = Form(RESULTS)
+    run(journal_path, form)
+    assert form.asked == []
+
+
+def test_interrupted_run_keeps_what_it_answered(journal_path):
+    journal = Journal(journal_path)
+    checkpoint = Checkpoint(journal, "2023")
+    list(islice(checkpoint.fetch_all(Form(RESULTS), QUERIES), 3))
+    journal.close()
+
+    form = Form(RESULTS)
+    answers, _ = run(journal_path, form)
+    assert len(form.asked) == 3
+    assert set(answers) == {(query.roll, query.semester) for query in QUERIES}
+
+
+def test_incremental_requeries_missing_semesters_of_known_students(journal_path):
+    run(journal_path, Form(RESULTS))
+    published = dict(RESULTS)
+    published["102", "2"] = result("Bikram")
+
+    form = Form(published)
+    answers, _ = run(journal_path, form, incremental=True)
+    assert sorted(form.asked) == [("102", "2"), ("103", "1"), ("103", "2")]
+    assert answers["102", "2"].name == "Bikram"
+
+    # Probes for rolls that may not exist are not worth repeating
+    form = Form(published)
+    run(journal_path, form, incremental=True, known=False)
+    assert form.asked == []
+
+
+def test_journal_contents_survive_reopening(journal_path):
+    run(journal_path, Form(RESULTS))
+    journal = Journal(journal_path)
+    try:
+        outcomes = journal.outcomes("2023")
+        assert outcomes["101", "1"] == Outcome(FOUND, RESULTS["101", "1"])
+        assert outcomes["103", "2"] == Outcome(MISSING)
+        assert journal.outcomes("2022") == {}
+
+        journal.record_autonomy_roll("2451001", Outcome(FOUND, "12624001001"))
+        journal.forget("2023")
+        assert journal.outcomes("2023") == {}
+    finally:
+        journal.close()
+
+    journal = Journal(journal_path)
+    try:
+        assert journal.autonomy_rolls() == {
+            "2451001": Outcome(FOUND, "12624001001")
+        }
+    finally:
+        journal.close()
@@ -0,0 +1,137 @@
+# Scraped grades streaming through the pipeline into final.csv
+
+import csv
+
+import pytest
+
+from src.scraper import pipeline
+from src.scraper.pipeline import (
+    Stream,
+    branch_name,
+    derive_ygpa,
+    drop_empty,
+    extract_branch,
+    process_batch,
+    read_csv,
+    run,
+    strip_pii,
+    write_csv,
+)
+
+PROGRAMME = "First Year B.Tech in Computer Science & Engineering (CSE) Second Semester"
+
+
+def stream(columns, rows):
+    return Stream(list(columns), iter([list(row) for row in rows]))
+
+
+def test_branch_name():
+    assert branch_name(PROGRAMME) == "Computer Science & Engineering"
+    assert branch_name("B.Tech in Electrical Engineering Second Semester") == (
+        "Electrical Engineering"
+    )
+    assert branch_name("Information Technology") == "Information Technology"
+
+
+def test_stages():
+    source = stream(
+        ["Autonomy Roll", "Name", "Branch", "GPA Sem 1", "GPA Sem 2"],
+        [
+            ["1", "Asha", PROGRAMME, "9", "8.5"],
+            ["2", "Bikram", PROGRAMME, "N/A", "N/A"],
+            ["3", "Chandni", PROGRAMME, "7", "N/A"],
+        ],
+    )
+    result = run(
+        source,
+        [
+            drop_empty(),
+            extract_branch("Branch", rename="Department"),
+            derive_ygpa("YGPA 1", ["GPA Sem 1", "GPA Sem 2"], after="GPA Sem 2"),
+            strip_pii(["Autonomy Roll"]),
+        ],
+    )
+
+    assert result.columns == ["Name", "Department", "GPA Sem 1", "GPA Sem 2", "YGPA 1"]
+    assert list(result.rows) == [
+        ["Asha", "Computer Science & Engineering", "9", "8.5", "8.75"],
+        ["Chandni", "Computer Science & Engineering", "7", "N/A", "N/A"],
+    ]
+
+
+def test_rows_are_pulled_one_at_a_time():
+    pulled = []
+
+    def rows():
+        for i in range(3):
+            pulled.append(i)
+            yield [str(i), "9"]
+
+    result = run(Stream(["Name", "GPA Sem 1"], rows()), [drop_empty()])
+    assert pulled == []
+    assert next(result.rows) == ["0", "9"]
+    assert pulled == [0]
+
+
+def test_read_csv_holds_the_file_only_while_rows_are_pulled(tmp_path, monkeypatch):
+    path = tmp_path / "grades.csv"
+    path.write_text("Name,GPA Sem 1\nAsha,9\n\nBikram,8\n", encoding="utf-8")
+    opened = []
+
+    def tracked_open(*args, **kwargs):
+        opened.append(open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(pipeline, "open", tracked_open, raising=False)
+
+    dropped = read_csv(str(path))
+    assert dropped.columns == ["Name", "GPA Sem 1"]
+    assert all(f.closed for f in opened)
+    del dropped
+
+    stream = read_csv(str(path))
+    assert next(stream.rows) == ["Asha", "9"]
+    assert not opened[-1].closed
+    stream.rows.close()
+    assert all(f.closed for f in opened)
+
+    assert list(read_csv(str(path)).rows) == [["Asha", "9"], ["Bikram", "8"]]
+    assert all(f.closed for f in opened)
+
+
+def test_write_csv_replaces_only_complete_files(tmp_path):
+    path = tmp_path / "out" / "final.csv"
+    assert write_csv(stream(["Name"], [["Asha"], ["Bikram"]]), str(path)) == 2
+    assert path.read_text(encoding="utf-8").splitlines() == ["Name", "Asha", "Bikram"]
+
+    def broken():
+        yield ["Chandni"]
+        raise RuntimeError("scrape file truncated")
+
+    with pytest.raises(RuntimeError):
+        write_csv(Stream(["Name"], broken()), str(path))
+    assert path.read_text(encoding="utf-8").splitlines() == ["Name", "Asha", "Bikram"]
+
+
+def test_process_batch(tmp_path):
+    source = tmp_path / "grades_2024.csv"
+    with open(source, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Autonomy Roll", "Name", "Branch", "GPA Sem 1", "GPA Sem 2"])
+        writer.writerow(["12624001001", "Asha", PROGRAMME, "9.12", "8.5"])
+        writer.writerow(["12624001002", "Bikram", PROGRAMME, "N/A", "N/A"])
+        writer.writerow([])
+        writer.writerow(["12624001003", "Chandni", PROGRAMME, "7", "8"])
+    target = tmp_path / "2024" / "final.csv"
+
+    assert process_batch("2024", str(source), str(target)) == 2
+    with open(target, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["Name"] for row in rows] == ["Asha", "Chandni"]
+    assert rows[0] == {
+        "Name": "Asha",
+        "Branch": "Computer Science & Engineering",
+        "GPA Sem 1": "9.12",
+        "GPA Sem 2": "8.5",
+        "yGPA 1": "8.81",
+    }
@@ -0,0 +1,140 @@
+# Tie-aware ranks by average YGPA, overall and per branch
+
+from array import array
+
+import pytest
+
+from models.dataset import Dataset
+from services.data_service import DataProcessor, FilterParams
+from services.ranking import compute_ranking, parse_cursor
+
+NAN = float("nan")
+
+
+def make_dataset(batch, rows):
+    return Dataset(
+        batch,
+        [
+            {"Name": name, "YGPA 1": y1, "YGPA 2": y2, "Department": department}
+            for name, y1, y2, department in rows
+        ],
+    )
+
+
+@pytest.fixture
+def dataset():
+    # Averages: A 9, B 8, C 8, D 7, E 8, F missing
+    return make_dataset(
+        "test-ranking",
+        [
+            ("A", "9", "9", "CSE"),
+            ("B", "8", "8", "ECE"),
+            ("C", "7", "9", "CSE"),
+            ("D", "7", "7", "ECE"),
+            ("E", "8.5", "7.5", "CSE"),
+            ("F", "8", "N/A", "ECE"),
+        ],
+    )
+
+
+def test_modes_handle_ties():
+    scores = array("d", [9, 8, 8, 7, NAN, 8])
+    ranking = compute_ranking(scores, [0, 1, 2, 5, 3, 4])
+
+    assert list(ranking.ranks("ordinal")) == [1, 2, 3, 5, 0, 4]
+    assert list(ranking.ranks("competition")) == [1, 2, 2, 5, 0, 2]
+    assert list(ranking.ranks("dense")) == [1, 2, 2, 3, 0, 2]
+    assert ranking.ranks("position") is None
+
+
+def test_branch_ranks_restart_per_branch():
+    scores = array("d", [9, 8, 8, 7])
+    ranking = compute_ranking(scores, [0, 1, 2, 3], branch_codes=[0, 1, 0, 1])
+
+    assert list(ranking.ranks("ordinal", per_branch=True)) == [1, 1, 2, 2]
+    assert list(ranking.ranks("competition", per_branch=True)) == [1, 1, 2, 2]
+    assert list(ranking.ranks("dense", per_branch=True)) == [1, 1, 2, 2]
+
+
+def ranks_by_name(view):
+    return {record["Name"]: record["Rank"] for record in view}
+
+
+def test_competition_ranks_of_a_batch(dataset):
+    view = DataProcessor.process_data(
+        dataset, dataset.batch, FilterParams(), "competition"
+    )
+
+    assert [record["Name"] for record in view] == ["A", "B", "C", "E", "D", "F"]
+    assert ranks_by_name(view) == {"A": 1, "B": 2, "C": 2, "E": 2, "D": 5, "F": None}
+
+
+def test_ranks_follow_the_student_not_the_row_shown(dataset):
+    params = FilterParams(sort_by="Name", order="asc")
+    dense = DataProcessor.process_data(dataset, dataset.batch, params, "dense")
+    position = DataProcessor.process_data(dataset, dataset.batch, params, "position")
+
+    assert [record["Name"] for record in dense] == ["A", "B", "C", "D", "E", "F"]
+    assert ranks_by_name(dense) == {"A": 1, "B": 2, "C": 2, "D": 3, "E": 2, "F": None}
+    assert [record["Rank"] for record in position] == [1, 2, 3, 4, 5, 6]
+
+
+def test_branch_scope_with_a_branch_filter(dataset):
+    params = FilterParams(selected_branches=["ECE"])
+    overall = DataProcessor.process_data(dataset, dataset.batch, params, "ordinal")
+    branch = DataProcessor.process_data(
+        dataset, dataset.batch, params, "ordinal", per_branch=True
+    )
+
+    assert ranks_by_name(overall) == {"B": 2, "D": 5, "F": None}
+    assert ranks_by_name(branch) == {"B": 1, "D": 2, "F": None}
+
+
+def pages(view, per_page):
+    """Follow next_cursor through a view, collecting names page by page"""
+    result, after = [], None
+    while True:
+        page, pagination = DataProcessor.paginate(view, 1, per_page, after=after)
+        result.append([record["Name"] for record in page])
+        after = parse_cursor(pagination["next_cursor"])
+        if after is None:
+            return result
+
+
+def test_cursor_pages_cover_the_rank_order(dataset):
+    for order in ("desc", "asc"):
+        params = FilterParams(order=order)
+        view = DataProcessor.process_data(dataset, dataset.batch, params)
+        names = [record["Name"] for record in view]
+
+        assert sum(pages(view, 2), []) == names
+        assert pages(view, 4)[1] == names[4:]
+
+    # Ascending order starts with the unranked F, so one cursor holds NaN
+    assert names[0] == "F"
+
+
+def test_cursor_continues_after_the_same_record(dataset):
+    view = DataProcessor.process_data(dataset, dataset.batch, FilterParams())
+    page, pagination = DataProcessor.paginate(view, 1, 3)
+    assert [record["Name"] for record in page] == ["A", "B", "C"]
+
+    # B drops out of the result, the cursor still resumes after C
+    cse = DataProcessor.process_data(
+        dataset, dataset.batch, FilterParams(selected_branches=["CSE"])
+    )
+    after = parse_cursor(pagination["next_cursor"])
+    page, pagination = DataProcessor.paginate(cse, 1, 3, after=after)
+
+    assert [(record["Name"], record["Rank"]) for record in page] == [("E", 3)]
+    assert pagination["next_cursor"] is None
+
+
+def test_cursor_is_ignored_unless_sorted_by_rank(dataset):
+    view = DataProcessor.process_data(
+        dataset, dataset.batch, FilterParams(sort_by="Name")
+    )
+    page, pagination = DataProcessor.paginate(view, 2, 2, after=(9.0, 0))
+
+    assert [record["Name"] for record in page] == ["C", "D"]
+    assert pagination["next_cursor"] is None
@@ -0,0 +1,91 @@
+# Hot reloading of changed and newly added batch CSVs
+
+import csv
+import os
+
+import pytest
+
+from config import config
+from models.data_access import CSVDataAccess
+from models.schema import schema_registry
+
+
+def write_batch(data_dir, batch, names, mtime):
+    path = os.path.join(data_dir, batch, "final.csv")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "YGPA 1", "Department"])
+        writer.writerows([name, "8", "CSE"] for name in names)
+    # Distinct mtimes whatever the filesystem's timestamp resolution
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    write_batch(tmp_path, "2031", ["Asha", "Bikram"], 1_000_000_000)
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "CSV_FILES", {"2031": f"{tmp_path}/2031/final.csv"})
+    monkeypatch.setattr(config, "SNAPSHOTS_ENABLED", False)
+    monkeypatch.setattr(schema_registry, "data_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def loaded():
+    return []
+
+
+@pytest.fixture
+def access(data_dir, loaded):
+    access = CSVDataAccess()
+    access.add_load_hook(loaded.append)
+    return access
+
+
+def names(dataset):
+    return [row["Name"] for row in dataset]
+
+
+def test_changed_batch_is_swapped_after_two_checks(data_dir, access, loaded):
+    old = access.load_data("2031")
+    write_batch(data_dir, "2031", ["Asha", "Bikram", "Chandni"], 2_000_000_000)
+
+    # The first check only notes the new signature
+    assert access.reload_changed() == []
+    assert loaded == [old]
+
+    assert access.reload_changed() == ["2031"]
+    new = loaded[-1]
+    assert names(new) == ["Asha", "Bikram", "Chandni"]
+    assert new.version > old.version
+    assert access.load_data("2031") is new
+    # Requests that already hold the old version keep reading it
+    assert names(old) == ["Asha", "Bikram"]
+
+    assert access.reload_changed() == []
+    assert len(loaded) == 2
+
+
+def test_file_still_being_written_is_not_loaded(data_dir, access, loaded):
+    old = access.load_data("2031")
+
+    write_batch(data_dir, "2031", ["Asha"], 2_000_000_000)
+    assert access.reload_changed() == []
+    write_batch(data_dir, "2031", ["Asha", "Bikram", "Chandni"], 3_000_000_000)
+    assert access.reload_changed() == []
+    assert loaded == [old]
+
+    assert access.reload_changed() == ["2031"]
+    assert names(loaded[-1]) == ["Asha", "Bikram", "Chandni"]
+
+
+def test_new_batch_directories_are_discovered(data_dir, access, loaded):
+    write_batch(data_dir, "2032", ["Dev"], 1_000_000_000)
+
+    assert access.reload_changed() == []
+    assert access.get_available_batches() == ["2032", "2031"]
+
+    assert sorted(access.reload_changed()) == ["2031", "2032"]
+    assert {dataset.batch for dataset in loaded} == {"2031", "2032"}
+    assert names(access.load_data("2032")) == ["Dev"]
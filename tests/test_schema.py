@@ -0,0 +1,100 @@
+# Batch schemas inferred from the header and overridden by schema.json
+
+import json
+import os
+
+import pytest
+
+from models.dataset import Dataset
+from models.schema import SCHEMA_FILE, SchemaRegistry, infer_schema, schema_registry
+from services.data_service import DataProcessor, FilterParams
+
+COLUMNS = ("Name", "CGPA 1", "YGPA 2", "YGPA 1", "CGPA 2", "Department")
+
+
+def write_schema(data_dir, batch, declared, mtime):
+    path = os.path.join(data_dir, batch, SCHEMA_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(declared, f)
+    # Distinct mtimes whatever the filesystem's timestamp resolution
+    os.utime(path, (mtime, mtime))
+
+
+def test_inferred_schema():
+    schema = infer_schema("2023", COLUMNS)
+
+    assert schema.rank_columns == ("YGPA 1", "YGPA 2")
+    assert schema.rank_label == "Avg YGPA"
+    assert schema.branch_key == "Department"
+    assert [group.label for group in schema.groups] == ["CGPA", "YGPA"]
+    assert schema.groups[1].average
+    assert schema.sort_options[0] == ("Rank", "Rank (Avg YGPA)")
+
+
+def test_declared_overrides():
+    schema = infer_schema(
+        "2023", COLUMNS, {"rank_columns": ["YGPA 2"], "branch_key": "Stream"}
+    )
+
+    assert schema.rank_columns == ("YGPA 2",)
+    assert schema.rank_label == "YGPA"
+    assert schema.branch_key == "Stream"
+    assert not schema.groups[1].average
+
+
+def test_registry_reparses_only_changed_files(tmp_path, monkeypatch):
+    registry = SchemaRegistry(str(tmp_path), check_interval=0)
+    parsed = []
+    declared = registry._declared
+    monkeypatch.setattr(
+        registry, "_declared", lambda batch: parsed.append(batch) or declared(batch)
+    )
+
+    assert registry.for_columns("2023", COLUMNS).rank_columns == ("YGPA 1", "YGPA 2")
+    write_schema(tmp_path, "2023", {"rank_columns": ["YGPA 1"]}, 1_000_000)
+    assert registry.for_columns("2023", COLUMNS).rank_columns == ("YGPA 1",)
+    for _ in range(3):
+        registry.for_columns("2023", COLUMNS)
+    assert len(parsed) == 2
+
+    write_schema(tmp_path, "2023", {"rank_columns": ["YGPA 2"]}, 2_000_000)
+    assert registry.for_columns("2023", COLUMNS).rank_columns == ("YGPA 2",)
+    assert len(parsed) == 3
+
+
+def test_registry_waits_for_the_check_interval(tmp_path):
+    registry = SchemaRegistry(str(tmp_path), check_interval=3600)
+    registry.for_columns("2023", COLUMNS)
+    write_schema(tmp_path, "2023", {"rank_columns": ["YGPA 1"]}, 1_000_000)
+
+    assert registry.for_columns("2023", COLUMNS).rank_columns == ("YGPA 1", "YGPA 2")
+
+
+@pytest.fixture
+def schema_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_registry, "data_dir", str(tmp_path))
+    monkeypatch.setattr(schema_registry, "check_interval", 0)
+    return tmp_path
+
+
+def test_override_reorders_a_loaded_batch(schema_dir):
+    batch = "test-schema-override"
+    dataset = Dataset(
+        batch,
+        [
+            {"Name": "A", "YGPA 1": "9", "YGPA 2": "6"},
+            {"Name": "B", "YGPA 1": "7", "YGPA 2": "7"},
+            {"Name": "C", "YGPA 1": "6", "YGPA 2": "7.5"},
+        ],
+    )
+
+    def names():
+        view = DataProcessor.process_data(dataset, batch, FilterParams(), "dense")
+        return [(record["Name"], record["Rank"]) for record in view]
+
+    assert names() == [("A", 1), ("B", 2), ("C", 3)]
+    write_schema(schema_dir, batch, {"rank_columns": ["YGPA 2"]}, 1_000_000)
+    assert names() == [("C", 1), ("B", 2), ("A", 3)]
+    write_schema(schema_dir, batch, {"rank_columns": ["YGPA 1"]}, 2_000_000)
+    assert names() == [("A", 1), ("B", 2), ("C", 3)]
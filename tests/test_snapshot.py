@@ -0,0 +1,113 @@
+# Snapshots read back as the dataset they were compiled from
+
+import json
+import mmap
+import os
+
+import pytest
+
+from models.dataset import Dataset
+from models.schema import SCHEMA_FILE, schema_registry
+from models.snapshot import SnapshotError, read_snapshot, write_snapshot
+from services.data_service import DataProcessor
+
+ROWS = [
+    {"Name": "Asha Roy", "YGPA 1": "9.1", "YGPA 2": "6", "Department": "CSE"},
+    {"Name": "Bikram Sen", "YGPA 1": "N/A", "YGPA 2": "8", "Department": "ECE"},
+    {"Name": "Chandni Pal", "YGPA 1": "7.25", "YGPA 2": "7", "Department": "CSE"},
+    {"Name": "Dev Ghosh", "YGPA 1": "8", "YGPA 2": "", "Department": "IT"},
+]
+SIGNATURE = (1_700_000_000_000_000_000, 1234)
+
+
+def compile_snapshot(path, dataset, rank_columns=("YGPA 1", "YGPA 2")):
+    sort_orders = {
+        (column, descending): DataProcessor.sort_order(
+            dataset, dataset.batch, column, descending
+        )
+        for column in ("Rank", "YGPA 1")
+        for descending in (False, True)
+    }
+    write_snapshot(str(path), dataset, sort_orders, SIGNATURE, rank_columns)
+    return sort_orders
+
+
+def test_round_trip(tmp_path):
+    dataset = Dataset("test-snapshot", ROWS)
+    sort_orders = compile_snapshot(tmp_path / "final.snap", dataset)
+
+    loaded = read_snapshot(
+        str(tmp_path / "final.snap"), SIGNATURE, version=7, fingerprint="abc"
+    )
+
+    assert loaded.batch == "test-snapshot"
+    assert loaded.columns == dataset.columns
+    assert loaded.version == 7 and loaded.fingerprint == "abc"
+    assert [dict(row) for row in loaded] == [dict(row) for row in dataset]
+    assert loaded.floats("YGPA 2").tobytes() == dataset.floats("YGPA 2").tobytes()
+    assert loaded.branch_key == "Department"
+    assert sorted(loaded.branch_index.lookup(["CSE", "IT"])) == [0, 2, 3]
+    assert loaded.rank_columns == ("YGPA 1", "YGPA 2")
+    for key, order in sort_orders.items():
+        assert list(loaded.sort_orders[key]) == list(order)
+    assert [loaded[i]["Name"] for i in loaded.name_index.search("sen")] == [
+        "Bikram Sen"
+    ]
+
+
+def test_stale_and_corrupt_snapshots_are_rejected(tmp_path):
+    path = tmp_path / "final.snap"
+    compile_snapshot(path, Dataset("test-snapshot", ROWS))
+
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path), (SIGNATURE[0], SIGNATURE[1] + 1))
+
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 2])
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path), SIGNATURE)
+
+    path.write_bytes(b"not a snapshot" + data[14:])
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path), SIGNATURE)
+
+
+def test_rejected_snapshots_are_unmapped(tmp_path, monkeypatch):
+    path = tmp_path / "final.snap"
+    compile_snapshot(path, Dataset("test-snapshot", ROWS))
+    real_mmap, mapped = mmap.mmap, []
+
+    def tracked_mmap(*args, **kwargs):
+        mapped.append(real_mmap(*args, **kwargs))
+        return mapped[-1]
+
+    monkeypatch.setattr(mmap, "mmap", tracked_mmap)
+
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path), (SIGNATURE[0], SIGNATURE[1] + 1))
+    path.write_bytes(b"not a snapshot" + path.read_bytes()[14:])
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path), SIGNATURE)
+
+    assert len(mapped) == 2
+    assert all(m.closed for m in mapped)
+
+
+def test_stored_rank_order_follows_the_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_registry, "data_dir", str(tmp_path))
+    monkeypatch.setattr(schema_registry, "check_interval", 0)
+    batch = "test-snapshot-schema"
+    path = tmp_path / "final.snap"
+    compile_snapshot(path, Dataset(batch, ROWS))
+
+    loaded = read_snapshot(str(path), SIGNATURE)
+    stored = loaded.sort_orders[("Rank", True)]
+    assert DataProcessor.sort_order(loaded, batch, "Rank", True) is stored
+
+    os.makedirs(tmp_path / batch)
+    with open(tmp_path / batch / SCHEMA_FILE, "w", encoding="utf-8") as f:
+        json.dump({"rank_columns": ["YGPA 2"]}, f)
+    names = [
+        loaded[i]["Name"] for i in DataProcessor.sort_order(loaded, batch, "Rank", True)
+    ]
+    assert names == ["Bikram Sen", "Chandni Pal", "Asha Roy", "Dev Ghosh"]
@@ -0,0 +1,163 @@
+# SQLite backend answering queries exactly like the in-memory path
+
+import itertools
+
+import pytest
+
+from models.dataset import Dataset
+from models.schema import schema_registry
+from models.sqlite_access import SQLiteDataAccess, import_batches
+from services.data_service import DataProcessor, FilterParams
+from services.ranking import parse_cursor
+from test_schema import write_schema
+
+BATCH = "test-sqlite"
+
+# Ties on both YGPAs, missing grades and two branches
+ROWS = [
+    ("12623001001", "Ankit Das", "8.5", "9", "CSE"),
+    ("12623001002", "Anita Kumar", "9", "8.5", "IT"),
+    ("12623001010", "Priya Das", "N/A", "7", "CSE"),
+    ("12623001003", "Kumar Sanu", "7.5", "7.5", "IT"),
+    ("12623001004", "Das Gupta", "8", "N/A", "CSE"),
+    ("12623001005", "Riya Sen", "9", "8.5", "CSE"),
+    ("12623001006", "Arjun Kumar Das", "6", "9", "IT"),
+    ("12623001007", "Meera", "7.5", "7.5", "CSE"),
+    ("12623001008", "Sanjay Dutta", "N/A", "N/A", "IT"),
+    ("12623001009", "Andrea Dsouza", "8.75", "8.75", "IT"),
+]
+
+SEARCHES = (None, "an", "KUMAR", " das ", "zz")
+BRANCHES = (None, ["CSE"], ["IT", "CSE"])
+SORTS = ("Rank", "YGPA 1", "YGPA 2", "Name")
+PAGES = ((0, 4), (4, 4), (8, 100))
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    # Rank formula overrides are read from the test's own directory
+    monkeypatch.setattr(schema_registry, "data_dir", str(tmp_path))
+    monkeypatch.setattr(schema_registry, "check_interval", 0)
+    return Dataset(
+        BATCH,
+        [
+            {
+                "Autonomy Roll": roll,
+                "Name": name,
+                "YGPA 1": y1,
+                "YGPA 2": y2,
+                "Department": department,
+            }
+            for roll, name, y1, y2, department in ROWS
+        ],
+        fingerprint="test",
+    )
+
+
+@pytest.fixture
+def sqlite_access(dataset, tmp_path):
+    # Imported the way import_sqlite.py does it
+    ranking = DataProcessor.ranking(dataset)
+    ranks = {
+        **ranking.overall,
+        **{f"{mode}_branch": r for mode, r in ranking.by_branch.items()},
+    }
+    db_path = str(tmp_path / "results.db")
+    import_batches(
+        db_path,
+        [dataset],
+        {BATCH: DataProcessor.rank_scores(dataset, BATCH)},
+        {BATCH: ranks},
+    )
+    return SQLiteDataAccess(db_path)
+
+
+def assert_same_results(dataset, sqlite_access, rank_modes=("position",)):
+    for search, branches, sort_by, order, rank_mode, per_branch in itertools.product(
+        SEARCHES, BRANCHES, SORTS, ("desc", "asc"), rank_modes, (False, True)
+    ):
+        params = FilterParams(search, branches, sort_by, order)
+        view = DataProcessor.process_data(
+            dataset, BATCH, params, rank_mode, per_branch
+        )
+        case = (params, rank_mode, per_branch)
+
+        assert sqlite_access.count(BATCH, params) == len(view), case
+        for offset, limit in PAGES:
+            expected = [dict(record) for record in view[offset : offset + limit]]
+            page = sqlite_access.query(
+                BATCH, params, offset, limit, rank_mode, per_branch
+            )
+            assert page == expected, (case, offset)
+
+
+def test_queries_match_the_in_memory_path(dataset, sqlite_access):
+    assert_same_results(dataset, sqlite_access)
+
+
+def test_rank_modes_match_the_in_memory_path(dataset, sqlite_access):
+    assert_same_results(
+        dataset, sqlite_access, rank_modes=("ordinal", "competition", "dense")
+    )
+
+
+def test_unlimited_query_returns_every_match(dataset, sqlite_access):
+    params = FilterParams(search_query="da")
+    view = DataProcessor.process_data(dataset, BATCH, params)
+
+    rows = sqlite_access.query(BATCH, params, 0, None)
+    assert rows == [dict(record) for record in view]
+    assert len(rows) == 4
+
+
+def test_suggestions_match_the_in_memory_path(dataset, sqlite_access):
+    for prefix in ("da", "KU", "an", " s", "a", "meera", "x", "", "  "):
+        for limit in (1, 3, 10):
+            expected = DataProcessor.suggest_names(dataset, prefix, limit)
+            assert sqlite_access.suggest_names(BATCH, prefix, limit) == expected
+
+    assert sqlite_access.suggest_names(BATCH, "das", 10) == [
+        "Ankit Das",
+        "Priya Das",
+        "Arjun Kumar Das",
+        "Das Gupta",
+    ]
+
+
+def test_rank_override_applies_without_reimport(dataset, sqlite_access, tmp_path):
+    params = FilterParams()
+    imported = sqlite_access.query(BATCH, params, 0, 3, "dense")
+
+    write_schema(tmp_path, BATCH, {"rank_columns": ["YGPA 2"]}, 1_000_000)
+    reranked = sqlite_access.query(BATCH, params, 0, 3, "dense")
+
+    assert [row["Name"] for row in imported] == ["Ankit Das", "Anita Kumar", "Riya Sen"]
+    assert [(row["Name"], row["Rank"]) for row in reranked] == [
+        ("Ankit Das", 1),
+        ("Arjun Kumar Das", 1),
+        ("Andrea Dsouza", 2),
+    ]
+    assert_same_results(dataset, sqlite_access, rank_modes=("ordinal", "dense"))
+
+    write_schema(tmp_path, BATCH, {"rank_columns": ["YGPA 1", "Missing 3"]}, 2_000_000)
+    assert_same_results(dataset, sqlite_access, rank_modes=("competition",))
+
+
+def test_cursor_pages_match_the_in_memory_path(dataset, sqlite_access):
+    for search, branches, order in itertools.product(
+        SEARCHES, BRANCHES, ("desc", "asc")
+    ):
+        params = FilterParams(search, branches, "Rank", order)
+        view = DataProcessor.process_data(dataset, BATCH, params)
+        after = None
+        while True:
+            page, expected = DataProcessor.paginate(view, 1, 3, after=after)
+            rows, pagination = DataProcessor.query_page(
+                sqlite_access, BATCH, params, 1, 3, after=after
+            )
+
+            assert rows == [dict(record) for record in page], (params, after)
+            assert pagination == expected, (params, after)
+            after = parse_cursor(pagination["next_cursor"])
+            if after is None:
+                break
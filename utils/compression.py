@@ -0,0 +1,247 @@
+# Response compression with gzip/brotli negotiation
+
+import gzip
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from flask import request
+
+from config import config
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """
+    Get the content codings this server can produce, most preferred first
+
+    Returns:
+        Tuple of encoding names
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiated_encoding() -> Optional[str]:
+    """
+    Get the content coding this request's response will be sent with
+
+    Returns:
+        Encoding name, or None for an uncompressed response
+    """
+    if not config.COMPRESS_ENABLED:
+        return None
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Derive the entity tag of a compressed variant
+
+    Each representation needs its own strong validator.
+
+    Args:
+        etag: Entity tag of the uncompressed response
+        encoding: Content coding applied
+
+    Returns:
+        Entity tag for the compressed response
+    """
+    return f"{etag}-{encoding}"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress a complete response body
+
+    Args:
+        data: Uncompressed body
+        encoding: "br" or "gzip"
+
+    Returns:
+        Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=config.COMPRESS_LEVEL, mtime=0)
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed response body chunk by chunk
+
+    Args:
+        chunks: Body chunks (str or bytes)
+        encoding: "br" or "gzip"
+
+    Yields:
+        Compressed chunks
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config.COMPRESS_BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(config.COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        compressed = process(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
+
+
+class CompressedCache:
+    """Byte-bounded LRU of compressed bodies keyed by entity tag and encoding"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        """Get a compressed body, or None on a miss"""
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is not None:
+                self._entries.move_to_end((etag, encoding))
+            return body
+
+    def put(self, etag: str, encoding: str, body: bytes) -> None:
+        """Store a compressed body, evicting the least recently used ones"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((etag, encoding), None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[(etag, encoding)] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+def _peek(chunks: Iterable, size: int) -> Tuple[List, Iterator, bool]:
+    """
+    Read the start of a streamed body
+
+    Args:
+        chunks: Body chunks (str or bytes)
+        size: Number of bytes wanted
+
+    Returns:
+        (chunks read, iterator over the rest, whether the body ended first)
+    """
+    iterator = iter(chunks)
+    head, length = [], 0
+    for chunk in iterator:
+        head.append(chunk)
+        length += len(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        if length >= size:
+            return head, iterator, False
+    return head, iterator, True
+
+
+compressed_cache = CompressedCache(config.COMPRESS_CACHE_MAX_BYTES)
+
+
+def compress_response(response):
+    """
+    Compress a response according to the request's Accept-Encoding
+
+    Responses with a strong ETag (rendered pages, static files) are
+    compressed once and served from the cache afterwards.
+
+    Args:
+        response: Outgoing Flask response
+
+    Returns:
+        The (possibly compressed) response
+    """
+    if response.status_code == 304:
+        # Revalidations answer for one variant, so caches must key on it too
+        response.vary.add("Accept-Encoding")
+        return response
+    if (
+        response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or "Content-Range" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiated_encoding()
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    if etag and request.if_none_match.contains(encoded_etag(etag, encoding)):
+        # Client already holds this compressed variant
+        response.response = []
+        response.status_code = 304
+        response.set_etag(encoded_etag(etag, encoding), weak)
+        response.headers.pop("Content-Length", None)
+        return response
+
+    if response.is_streamed and not response.direct_passthrough:
+        head, rest, ended = _peek(response.response, config.COMPRESS_MIN_SIZE)
+        if ended:
+            # Too small to be worth compressing
+            response.response = head
+            return response
+        response.response = compress_stream(chain(head, rest), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = compressed_cache.get(etag, encoding) if etag else None
+        if body is None:
+            response.direct_passthrough = False
+            data = response.get_data()
+            if len(data) < config.COMPRESS_MIN_SIZE:
+                return response
+            body = compress(data, encoding)
+            if etag:
+                compressed_cache.put(etag, encoding, body)
+        response.set_data(body)
+
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+
+def init_compression(app) -> None:
+    """
+    Register response compression on the application
+
+    Args:
+        app: Flask application instance
+    """
+    if not config.COMPRESS_ENABLED:
+        return
+    app.after_request(compress_response)
+    logger.info(f"Response compression enabled ({', '.join(supported_encodings())})")
@@ -1,9 +1,16 @@
 # Utility functions and helpers
 
+import hashlib
+import json
 import logging
-from typing import Any, List, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, List, Dict, Optional, Iterable, Iterator
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, Response
+
+from config import config
+from services.ranking import RANK_MODES, RANK_SCOPES, parse_cursor
+from utils.compression import encoded_etag, negotiated_encoding
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -56,16 +63,111 @@ def get_request_params() -> Dict[str, Any]:
     Returns:
         Dictionary of validated request parameters
     """
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", config.DEFAULT_PAGE_SIZE, type=int)
+    offset = request.args.get("offset", type=int)
+    rank_mode = request.args.get("rank_mode", config.RANK_MODE)
+    rank_scope = request.args.get("rank_scope", "overall")
+
     return {
         "search_query": request.args.get("search", "").strip(),
         "selected_branches": request.args.getlist("branch"),
         "sort_by": request.args.get("sort_by"),
         "order": request.args.get("order", "desc"),
-        "page": int(request.args.get("page", 1)),
-        "per_page": int(request.args.get("per_page", 50)),
+        "page": max(page, 1),
+        "per_page": min(max(per_page, 1), config.MAX_PAGE_SIZE),
+        "offset": max(offset, 0) if offset is not None else None,
+        "after": parse_cursor(request.args.get("after")),
+        "rank_mode": rank_mode if rank_mode in RANK_MODES else "position",
+        "rank_scope": rank_scope if rank_scope in RANK_SCOPES else "overall",
     }
 
 
+def compute_etag(*parts: Any) -> str:
+    """
+    Build a strong entity tag from the values a response depends on
+
+    Args:
+        parts: Hashable description of the response (dataset, query, ...)
+
+    Returns:
+        Hex digest usable as an ETag value
+    """
+    payload = repr((config.ETAG_SALT,) + parts).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def not_modified(
+    etag: str, last_modified: Optional[float], cache_control: str
+) -> Optional[Response]:
+    """
+    Answer a conditional request without building the response body
+
+    Args:
+        etag: Entity tag of the response that would be sent
+        last_modified: Modification time (epoch seconds) of the source data
+        cache_control: Cache-Control header value
+
+    Returns:
+        A 304 response if the client copy is current, otherwise None
+    """
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since; clients may
+        # hold the variant compressed with the coding negotiated now, or the
+        # plain one (small bodies are sent uncompressed)
+        candidates = [etag]
+        encoding = negotiated_encoding()
+        if encoding is not None:
+            candidates.insert(0, encoded_etag(etag, encoding))
+        matched = [tag for tag in candidates if request.if_none_match.contains(tag)]
+        is_current = bool(matched)
+        if matched:
+            etag = matched[0]
+    elif request.if_modified_since and last_modified is not None:
+        modified = datetime.fromtimestamp(int(last_modified), tz=timezone.utc)
+        is_current = request.if_modified_since >= modified
+    else:
+        is_current = False
+
+    if not is_current:
+        return None
+
+    response = Response(status=304)
+    set_cache_headers(response, etag, last_modified, cache_control)
+    if config.COMPRESS_ENABLED:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def set_cache_headers(
+    response: Response,
+    etag: Optional[str] = None,
+    last_modified: Optional[float] = None,
+    cache_control: Optional[str] = None,
+) -> Response:
+    """
+    Attach validators and caching policy to a response
+
+    Args:
+        response: Response to update
+        etag: Strong entity tag
+        last_modified: Modification time (epoch seconds) of the source data
+        cache_control: Cache-Control header value
+
+    Returns:
+        The same response
+    """
+    if etag:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = datetime.fromtimestamp(
+            int(last_modified), tz=timezone.utc
+        )
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
 def validate_batch(batch: str, available_batches: List[str]) -> bool:
     """
     Validate if the batch parameter is valid
@@ -150,3 +252,35 @@ class ResponseHelper:
                 "pages": (total + per_page - 1) // per_page,
             },
         }
+
+    @staticmethod
+    def stream_json(envelope: Dict[str, Any], items: Iterable[Any]) -> Iterator[str]:
+        """
+        Serialize a response envelope whose "data" list is produced lazily
+
+        Args:
+            envelope: Response dictionary; its "data" entry is replaced by items
+            items: JSON-serializable records to emit one at a time
+
+        Yields:
+            Chunks of the JSON document
+        """
+        head = {key: value for key, value in envelope.items() if key != "data"}
+        yield json.dumps(head)[:-1] + (', "data": [' if head else '{"data": [')
+        for i, item in enumerate(items):
+            yield ("," if i else "") + json.dumps(item)
+        yield "]}"
+
+    @staticmethod
+    def stream_ndjson(items: Iterable[Any]) -> Iterator[str]:
+        """
+        Serialize records as newline-delimited JSON
+
+        Args:
+            items: JSON-serializable records to emit one at a time
+
+        Yields:
+            One JSON document per line
+        """
+        for item in items:
+            yield json.dumps(item) + "\n"